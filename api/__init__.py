@@ -4,6 +4,7 @@ from .location import router as location_router
 from .event import event_router
 from .event import session_router
 from .category import router as category_router
+from .admin import router as admin_router
 
 # Create the main API router for the application
 api_router = APIRouter()
@@ -42,3 +43,10 @@ api_router.include_router(category_router, prefix="/category", tags=["Category"]
 Includes routes related to category operations under the "/category" prefix.
 Tagged as "Category" for better documentation and organization.
 """
+
+# Include the Admin router
+api_router.include_router(admin_router, prefix="/admin", tags=["Admin"])
+"""
+Includes the administration routes, such as the profiles, under the "/admin" prefix.
+Tagged as "Admin" for better documentation and organization.
+"""
@@ -0,0 +1,47 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from models.user import UserModel
+from utils.auths import get_current_user_with_role
+from utils.profiling import profile_store
+
+# Create an API router specifically for administration endpoints
+router = APIRouter()
+
+
+@router.get("/profiles", response_model=List[str])
+def list_profiles(
+    current_user: UserModel = Depends(get_current_user_with_role(["admin"])),
+):
+    """
+    List the stored profiles: the windows of the always-on sampler
+    (`sampler-<pid>-<time>.collapsed`) and the profiled requests
+    (`request-<id>.collapsed`).
+
+    Args:
+        current_user (UserModel): Current authenticated user with the role "admin".
+
+    Returns:
+        List[str]: The names of the profiles, the most recent first.
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def get_profile(
+    name: str,
+    current_user: UserModel = Depends(get_current_user_with_role(["admin"])),
+):
+    """
+    Download a profile in the collapsed stacks format, ready for flamegraph.pl
+    or speedscope.
+
+    Args:
+        name (str): The name of the profile, as listed or returned in `X-Profile-Name`.
+        current_user (UserModel): Current authenticated user with the role "admin".
+
+    Returns:
+        str: One `frame;frame;... count` line per sampled stack.
+    """
+    return profile_store.read(name)
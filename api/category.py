@@ -1,34 +1,35 @@
 from typing import List
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.config import get_db
+from db.config import get_async_read_db, get_db
 from models.user import UserModel
 from schemas.category import CategoryCreate, CategoryResponse
-from services.category_services import CategoryServiceHandler
-from utils.auths import get_current_user_with_role
+from services.category_services import AsyncCategoryServiceHandler, CategoryServiceHandler
+from utils.auths import get_current_user_with_role, get_current_user_with_role_async
 
 # Create an API router specifically for category-related endpoints
 router = APIRouter()
 
 
 @router.get("", response_model=List[CategoryResponse])
-def list_categories(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user_with_role(["admin", "owner"])),
+async def list_categories(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(get_current_user_with_role_async(["admin", "owner"])),
 ):
     """
     Retrieve a list of all categories.
 
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin" or "owner".
 
     Returns:
         List[CategoryResponse]: A list of category objects.
     """
-    service = CategoryServiceHandler(db)
-    return service.list_categories()
+    service = AsyncCategoryServiceHandler(db)
+    return await service.list_categories()
 
 
 @router.post("", response_model=CategoryResponse)
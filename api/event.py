@@ -1,10 +1,18 @@
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from celery_worker.tasks import process_ticket
-from db.config import get_db
+from celery_worker.tasks import (
+    persist_ticket,
+    process_ticket,
+    process_ticket_batch,
+    promote_waitlist,
+)
+from db.config import get_async_read_db, get_db
+from db.redis import get_redis
 from models.event import EventModel
 from models.user import UserModel
 from schemas.event import (
@@ -14,12 +22,28 @@ from schemas.event import (
     EventTicketResponse,
     EventUpdate,
     SessionCreate,
+    SessionRegistrationCreate,
+    SessionRegistrationResponse,
     SessionResponse,
+    TicketHoldResponse,
+    TicketRequestResponse,
+    WaitlistPositionResponse,
 )
+from services.capacity_services import capacity_broadcaster, publish_remaining_capacity
 from services.elasticsearch_services import index_event_with_relations, search_events
-from services.event_services import EventServiceHandler
-from utils.auths import get_current_user, get_current_user_with_role
-from utils.enums import StatusEnum
+from services.event_services import AsyncEventServiceHandler, EventServiceHandler
+from services.inventory_services import TicketInventoryHandler
+from services.ticket_services import TicketRequestHandler
+from services.waitlist_services import WaitlistHandler
+from utils.auths import (
+    get_current_user,
+    get_current_user_with_role,
+    get_current_user_with_role_async,
+)
+from utils.constants import TICKET_BATCH_ENABLED, TICKET_INVENTORY_ENABLED
+from utils.enums import StatusEnum, TicketRequestStatusEnum
+from utils.pagination import set_next_cursor
+from utils.rate_limit import ticket_rate_limit
 
 
 event_router = APIRouter()
@@ -27,10 +51,11 @@ session_router = APIRouter()
 
 
 @event_router.get("", response_model=List[EventResponse])
-def list_events(
-    db: Session = Depends(get_db),
+async def list_events(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: UserModel = Depends(
-        get_current_user_with_role(["admin", "owner", "assistant"])
+        get_current_user_with_role_async(["admin", "owner", "assistant"])
     ),
     name: Optional[str] = Query(None, description="Filter by event name"),
     min_date: Optional[datetime] = Query(None, description="Filter by minimum date"),
@@ -38,8 +63,9 @@ def list_events(
     status: Optional[StatusEnum] = Query(None, description="Filter by status"),
     location_id: Optional[int] = Query(None, description="Filter by location ID"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    offset: int = Query(0, ge=0, description="Number of records to skip (prefer cursor, not both)"),
     limit: int = Query(10, gt=0, description="Maximum number of records to retrieve"),
+    cursor: Optional[str] = Query(None, description="Cursor of the page, from the X-Next-Cursor header"),
     location_name: Optional[str] = Query(None, description="Filter by location name"),
     category_name: Optional[str] = Query(None, description="Filter by category name"),
 ):
@@ -47,21 +73,23 @@ def list_events(
     Retrieve a list of all events.
     
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin", "owner", or "assistant".
         min_date (Optional[datetime], optional): Filter by minimum date. Defaults to None.
         max_date (Optional[datetime], optional): Filter by maximum date. Defaults to None.
         status (Optional[StatusEnum], optional): Filter by status. Defaults to None.
         location_id (Optional[int], optional): Filter by location ID. Defaults to None.
         category_id (Optional[int], optional): Filter by category ID. Defaults to None.
-        offset (int, optional): Number of records to skip. Defaults to 0.
+        offset (int, optional): Number of records to skip, 400 if combined with a cursor. Defaults to 0.
         limit (int, optional): Maximum number of records to retrieve. Defaults to 10.
+        cursor (Optional[str], optional): Cursor of the requested page. Defaults to None (first page).
 
     Returns:
-        List[EventResponse]: A list of event objects.
+        List[EventResponse]: A list of event objects, ordered by date. The cursor of
+            the next page, if any, is returned in the `X-Next-Cursor` header.
     """
-    service = EventServiceHandler(db)
-    return service.filter_events_with_related_names(
+    service = AsyncEventServiceHandler(db)
+    events, next_cursor = await service.filter_events_with_related_names(
         name=name,
         min_date=min_date,
         max_date=max_date,
@@ -70,9 +98,12 @@ def list_events(
         category_id=category_id,
         offset=offset,
         limit=limit,
+        cursor=cursor,
         location_name=location_name,
         category_name=category_name,
     )
+    set_next_cursor(response, next_cursor)
+    return events
 
 
 @event_router.post("", response_model=EventResponse)
@@ -97,11 +128,11 @@ def create_event(
 
 
 @event_router.get("/{event_id}", response_model=EventResponse)
-def get_event(
+async def get_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: UserModel = Depends(
-        get_current_user_with_role(["admin", "owner", "assistant"])
+        get_current_user_with_role_async(["admin", "owner", "assistant"])
     ),
 ):
     """
@@ -109,14 +140,46 @@ def get_event(
 
     Args:
         event_id (int): ID of the event to retrieve.
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin", "owner", or "assistant".
 
     Returns:
         EventResponse: The event object with the given ID.
     """
+    service = AsyncEventServiceHandler(db)
+    return await service.get_event_by_id(event_id)
+
+
+@event_router.get("/{event_id}/capacity/stream")
+def stream_event_capacity(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(
+        get_current_user_with_role(["admin", "owner", "assistant"])
+    ),
+):
+    """
+    Stream the remaining capacity of an event as Server-Sent Events.
+
+    The current value is sent on connection and every ticket issued afterwards pushes
+    an update, so clients do not need to poll `GET /{event_id}`. All watchers of an
+    event on a worker share a single Redis subscription.
+
+    Args:
+        event_id (int): ID of the event to watch.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the roles "admin", "owner", or "assistant".
+
+    Returns:
+        StreamingResponse: A `text/event-stream` response with `capacity` events.
+    """
     service = EventServiceHandler(db)
-    return service.get_event_by_id(event_id)
+    db_event = service.get_event_by_id(event_id)
+    return StreamingResponse(
+        capacity_broadcaster.stream(event_id, db_event.capacity - db_event.tickets_sold),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @event_router.patch("/{event_id}", response_model=EventResponse)
@@ -129,6 +192,8 @@ def update_event(
     """
     Update an existing event.
 
+    Raising the capacity hands the new seats to the event waitlist.
+
     Args:
         event_id (int): ID of the event to update.
         event (EventUpdate): The updated data for the event.
@@ -139,11 +204,15 @@ def update_event(
         EventResponse: The updated event object.
     """
     service = EventServiceHandler(db)
-    return service.update_event(
+    db_event = service.update_event(
         event_id=event_id,
         event=event,
         current_user=current_user,
     )
+    if event.capacity is not None:
+        publish_remaining_capacity(get_redis(), event_id, db_event.capacity - db_event.tickets_sold)
+        promote_waitlist.delay(event_id)
+    return db_event
 
 
 @event_router.delete("/{event_id}", response_model=EventResponse)
@@ -170,35 +239,266 @@ def delete_event(
     )
 
 
-@event_router.post("/ticket/{event_id}")
+@event_router.post("/ticket/{event_id}", dependencies=[Depends(ticket_rate_limit)])
 def create_ticket(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+    idempotency_key: Optional[str] = Header(
+        None, description="Client key that deduplicates retried requests"
+    ),
 ):
     """
-    Create a ticket for a specific event.
+    Request a ticket for a specific event.
+
+    The ticket is issued asynchronously. The returned request ID can be used with
+    `GET /ticket/status/{request_id}` to find out whether the ticket was created.
+    Retries sent with the same `Idempotency-Key` header return the original request
+    instead of queueing a new one. Each user may send `TICKET_RATE_LIMIT` requests per
+    `TICKET_RATE_LIMIT_WINDOW_SECONDS`; more get a 429 before anything is queued.
 
     Args:
         event_id (int): ID of the event for which to create a ticket.
         db (Session): Database session dependency.
         current_user (UserModel): Current authenticated user with the role "assistant".
+        idempotency_key (Optional[str]): Client key that deduplicates retried requests.
 
     Returns:
-        EventTicketResponse: The created ticket object.
+        dict: A message describing the request and its request ID.
     """
-    process_ticket.delay(event_id, current_user.id)
+    ticket_requests = TicketRequestHandler(get_redis())
+    request_id = ticket_requests.new_request_id()
+
+    if idempotency_key:
+        original = ticket_requests.claim_idempotency_key(
+            event_id, current_user.id, idempotency_key, request_id
+        )
+        if original:
+            return {"message": "Ticket request already received.", **original}
+
+    try:
+        if TICKET_INVENTORY_ENABLED:
+            # Decide synchronously against the Redis inventory, persist asynchronously
+            inventory = TicketInventoryHandler(get_redis(), db)
+            inventory.reserve(event_id)
+            try:
+                ticket_requests.register(
+                    event_id,
+                    current_user.id,
+                    TicketRequestStatusEnum.RESERVED,
+                    request_id,
+                    idempotency_key,
+                )
+                persist_ticket.apply_async((event_id, current_user.id), task_id=request_id)
+            except Exception:
+                inventory.release(event_id)
+                raise
+            return {"message": "Ticket reserved.", "request_id": request_id}
+
+        if TICKET_BATCH_ENABLED:
+            # Queue the request; only the first request of a burst schedules a drain task
+            _, schedule_drain = ticket_requests.enqueue(
+                event_id, current_user.id, request_id, idempotency_key
+            )
+            if schedule_drain:
+                try:
+                    process_ticket_batch.delay(event_id)
+                except Exception:
+                    # Without a drain task the queue would never be emptied
+                    ticket_requests.dequeue(event_id, current_user.id, request_id)
+                    raise
+            return {"message": "Ticket creation process started.", "request_id": request_id}
+
+        # Register the status before enqueueing so it can never overwrite the worker outcome
+        ticket_requests.register(
+            event_id, current_user.id, request_id=request_id, idempotency_key=idempotency_key
+        )
+        process_ticket.apply_async((event_id, current_user.id), task_id=request_id)
+    except Exception:
+        # The request was rejected or never queued: let the client retry with the same key
+        if idempotency_key:
+            ticket_requests.release_idempotency_key(current_user.id, idempotency_key)
+        raise
     # service = EventServiceHandler(db)
     # return service.create_ticket(event_id, current_user)
-    return {"message": "Ticket creation process started."}
+    return {"message": "Ticket creation process started.", "request_id": request_id}
 
 
-@session_router.get("/{event_id}", response_model=List[SessionResponse])
-def list_sessions_by_event(
+@event_router.get("/ticket/status/{request_id}", response_model=TicketRequestResponse)
+def get_ticket_request_status(
+    request_id: str,
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Retrieve the status of a ticket request.
+
+    The status is read from a short-lived Redis hash, without querying the
+    database for the ticket itself.
+
+    Args:
+        request_id (str): ID returned when the ticket was requested.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        TicketRequestResponse: The current status of the request.
+    """
+    ticket_requests = TicketRequestHandler(get_redis())
+    return ticket_requests.get_status(request_id, current_user.id)
+
+
+@event_router.post("/ticket/{event_id}/hold", response_model=TicketHoldResponse)
+def create_ticket_hold(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Hold a seat of an event while the user completes the checkout.
+
+    The seat is counted against the event capacity until the hold is confirmed,
+    released, or expires after `TICKET_HOLD_MINUTES`.
+
+    Args:
+        event_id (int): ID of the event to hold a seat for.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        TicketHoldResponse: The created hold and its expiration time.
+    """
+    service = EventServiceHandler(db)
+    hold, remaining = service.create_hold(event_id, current_user)
+    publish_remaining_capacity(get_redis(), event_id, remaining)
+    return hold
+
+
+@event_router.post("/ticket/hold/{hold_id}/confirm", response_model=EventTicketResponse)
+def confirm_ticket_hold(
+    hold_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Turn an unexpired hold into a ticket.
+
+    Args:
+        hold_id (int): ID of the hold to confirm.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        EventTicketResponse: The created ticket.
+    """
+    service = EventServiceHandler(db)
+    return service.confirm_hold(hold_id, current_user)
+
+
+@event_router.delete("/ticket/hold/{hold_id}")
+def release_ticket_hold(
+    hold_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Release a hold and give its seat back to the event.
+
+    Args:
+        hold_id (int): ID of the hold to release.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        dict: A message confirming the release.
+    """
+    service = EventServiceHandler(db)
+    event_id, remaining = service.release_hold(hold_id, current_user)
+    publish_remaining_capacity(get_redis(), event_id, remaining)
+    promote_waitlist.delay(event_id)
+    return {"message": "Hold released."}
+
+
+@event_router.delete("/ticket/{event_id}")
+def cancel_ticket(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Cancel the ticket of the current user and give its seat to the event waitlist.
+
+    Args:
+        event_id (int): ID of the event the ticket belongs to.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        dict: A message confirming the cancellation.
+    """
+    waitlist = WaitlistHandler(get_redis(), db)
+    successor_id, remaining = waitlist.cancel_ticket(event_id, current_user)
+    if successor_id is None:
+        publish_remaining_capacity(get_redis(), event_id, remaining)
+        # Users that joined the waitlist meanwhile get the freed seat
+        promote_waitlist.delay(event_id)
+    return {"message": "Ticket cancelled."}
+
+
+@event_router.get("/ticket/{event_id}/waitlist", response_model=WaitlistPositionResponse)
+def get_waitlist_position(
     event_id: int,
     db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Retrieve the position of the current user in the waitlist of a sold-out event.
+
+    Args:
+        event_id (int): ID of the event.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        WaitlistPositionResponse: The position of the user and the size of the waitlist.
+    """
+    waitlist = WaitlistHandler(get_redis(), db)
+    return waitlist.position(event_id, current_user.id)
+
+
+@session_router.get("", response_model=List[SessionResponse])
+async def list_all_sessions(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: UserModel = Depends(
-        get_current_user_with_role(["admin", "owner", "assistant"])
+        get_current_user_with_role_async(["admin", "owner", "assistant"])
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor of the page, from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, gt=0, description="Maximum number of records to retrieve"),
+):
+    """
+    List the sessions of every event, ordered by ID.
+
+    Args:
+        db (AsyncSession): Read replica session dependency.
+        current_user (UserModel): Current authenticated user with the roles "admin", "owner", or "assistant".
+        cursor (Optional[str], optional): Cursor of the requested page. Defaults to None (first page).
+        limit (Optional[int], optional): Maximum number of records to retrieve. Defaults to None (all).
+
+    Returns:
+        List[SessionResponse]: A page of sessions. The cursor of the next page, if
+            any, is returned in the `X-Next-Cursor` header.
+    """
+    service = AsyncEventServiceHandler(db)
+    sessions, next_cursor = await service.list_all_sessions(cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return sessions
+
+
+@session_router.get("/{event_id}", response_model=List[SessionResponse])
+async def list_sessions_by_event(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(
+        get_current_user_with_role_async(["admin", "owner", "assistant"])
     ),
 ):
     """
@@ -206,14 +506,14 @@ def list_sessions_by_event(
 
     Args:
         event_id (int): ID of the event whose sessions to retrieve.
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin", "owner", or "assistant".
 
     Returns:
         List[SessionResponse]: A list of sessions for the given event.
     """
-    service = EventServiceHandler(db)
-    return service.list_sessions_by_event(event_id)
+    service = AsyncEventServiceHandler(db)
+    return await service.list_sessions_by_event(event_id)
 
 
 @session_router.post("/{event_id}", response_model=SessionResponse)
@@ -240,3 +540,52 @@ def create_session(
         event_id=event_id,
         current_user=current_user,
     )
+
+
+@session_router.post("/register/event/{event_id}", response_model=SessionRegistrationResponse)
+def register_sessions(
+    registration: SessionRegistrationCreate,
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Register the current user for one or more sessions of an event.
+
+    All sessions are registered in a single transaction: if any of them is full
+    or unknown, no registration is made.
+
+    Args:
+        registration (SessionRegistrationCreate): The IDs of the sessions to register for.
+        event_id (int): ID of the event the sessions belong to.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        SessionRegistrationResponse: The sessions the user was registered for.
+    """
+    service = EventServiceHandler(db)
+    session_ids = service.register_sessions(event_id, registration.session_ids, current_user)
+    return {"event_id": event_id, "session_ids": session_ids}
+
+
+@session_router.delete("/register/session/{session_id}")
+def unregister_session(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_with_role(["assistant"])),
+):
+    """
+    Cancel the registration of the current user for a session.
+
+    Args:
+        session_id (int): ID of the session.
+        db (Session): Database session dependency.
+        current_user (UserModel): Current authenticated user with the role "assistant".
+
+    Returns:
+        dict: A message confirming the cancellation.
+    """
+    service = EventServiceHandler(db)
+    service.unregister_session(session_id, current_user)
+    return {"message": "Registration cancelled."}
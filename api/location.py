@@ -1,34 +1,43 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.config import get_db
+from db.config import get_async_read_db, get_db
 from models.user import UserModel
 from schemas.location import CityCreate, CityResponse, CountryCreate, CountryResponse
-from services.location_services import LocationServiceHandler
-from utils.auths import get_current_user_with_role
+from services.location_services import AsyncLocationServiceHandler, LocationServiceHandler
+from utils.auths import get_current_user_with_role, get_current_user_with_role_async
+from utils.pagination import set_next_cursor
 
 # Create a router for location-related endpoints
 router = APIRouter()
 
 
 @router.get("/country", response_model=List[CountryResponse])
-def list_countries(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user_with_role(["admin", "owner"])),
+async def list_countries(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(get_current_user_with_role_async(["admin", "owner"])),
+    cursor: Optional[str] = Query(None, description="Cursor of the page, from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, gt=0, description="Maximum number of records to retrieve"),
 ):
     """
     Retrieve a list of all countries.
 
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin" or "owner".
+        cursor (Optional[str], optional): Cursor of the requested page. Defaults to None (first page).
+        limit (Optional[int], optional): Maximum number of records to retrieve. Defaults to None (all).
 
     Returns:
         List[CountryResponse]: A list of country objects.
     """
-    service = LocationServiceHandler(db)
-    return service.list_countries()
+    service = AsyncLocationServiceHandler(db)
+    countries, next_cursor = await service.list_countries(cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return countries
 
 
 @router.post("/country", response_model=CountryResponse)
@@ -53,22 +62,29 @@ def create_country(
 
 
 @router.get("/city", response_model=List[CityResponse])
-def list_cities(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user_with_role(["admin", "owner"])),
+async def list_cities(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserModel = Depends(get_current_user_with_role_async(["admin", "owner"])),
+    cursor: Optional[str] = Query(None, description="Cursor of the page, from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, gt=0, description="Maximum number of records to retrieve"),
 ):
     """
     Retrieve a list of all cities.
 
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Read replica session dependency.
         current_user (UserModel): Current authenticated user with the roles "admin" or "owner".
+        cursor (Optional[str], optional): Cursor of the requested page. Defaults to None (first page).
+        limit (Optional[int], optional): Maximum number of records to retrieve. Defaults to None (all).
 
     Returns:
         List[CityResponse]: A list of city objects.
     """
-    service = LocationServiceHandler(db)
-    return service.list_cities()  # Fixed the missing return statement
+    service = AsyncLocationServiceHandler(db)
+    cities, next_cursor = await service.list_cities(cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return cities
 
 
 @router.post("/city", response_model=CityResponse)
@@ -1,34 +1,43 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.config import get_db
+from db.config import get_async_db, get_db
 from models.user import UserModel
 from schemas.user import UserCreate, UserResponse, UserUpdate, UserUpdateAdmin
-from services.user_services import UserServiceHandler
-from utils.auths import get_current_user_with_role
+from services.user_services import AsyncUserServiceHandler, UserServiceHandler
+from utils.auths import get_current_user_with_role, get_current_user_with_role_async
+from utils.pagination import set_next_cursor
 
 # Create a router for user-related endpoints
 router = APIRouter()
 
 
 @router.get("", response_model=List[UserResponse])
-def list_users(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user_with_role(["admin"])),
+async def list_users(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_with_role_async(["admin"])),
+    cursor: Optional[str] = Query(None, description="Cursor of the page, from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, gt=0, description="Maximum number of records to retrieve"),
 ):
     """
     Retrieve a list of all users.
 
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Async database session dependency.
         current_user (UserModel): Current authenticated user with the role "admin".
+        cursor (Optional[str], optional): Cursor of the requested page. Defaults to None (first page).
+        limit (Optional[int], optional): Maximum number of records to retrieve. Defaults to None (all).
 
     Returns:
         List[UserResponse]: A list of user objects.
     """
-    service = UserServiceHandler(db)
-    return service.list_users()
+    service = AsyncUserServiceHandler(db)
+    users, next_cursor = await service.list_users(cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return users
 
 
 @router.post("", response_model=UserResponse)
@@ -48,24 +57,24 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user_with_role(["admin"])),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_with_role_async(["admin"])),
 ):
     """
     Retrieve details of a specific user by ID.
 
     Args:
         user_id (int): The ID of the user to retrieve.
-        db (Session): Database session dependency.
+        db (AsyncSession): Async database session dependency.
         current_user (UserModel): Current authenticated user with the role "admin".
 
     Returns:
         UserResponse: The user object with the specified ID.
     """
-    service = UserServiceHandler(db)
-    return service.get_user_by_id(user_id)
+    service = AsyncUserServiceHandler(db)
+    return await service.get_user_by_id(user_id)
 
 
 @router.patch("/{user_id}", response_model=UserResponse)
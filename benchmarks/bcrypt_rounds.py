@@ -0,0 +1,103 @@
+"""
+bcrypt cost benchmark.
+
+Times the bcrypt hash of a password on this host for a range of costs and
+recommends the highest `BCRYPT_ROUNDS` whose hash stays under a latency
+target. A login verifies one hash, so the same time is spent per login, on one
+of the `PASSWORD_POOL_WORKERS` processes; the estimated logins per second of
+the pool are reported for each cost.
+
+Usage:
+    python -m benchmarks.bcrypt_rounds --target-ms 250
+    python -m benchmarks.bcrypt_rounds --min-rounds 10 --max-rounds 14 --samples 5 --workers 4
+
+Each cost doubles the time of the previous one; costs are no longer timed once
+one of them takes four times the target.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+
+# Minimum cost recommended for bcrypt by OWASP
+MIN_SAFE_ROUNDS = 10
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250, help="Latency target of a hash, in milliseconds")
+    parser.add_argument("--min-rounds", type=int, default=8, help="Lowest cost timed (bcrypt allows 4 to 31)")
+    parser.add_argument("--max-rounds", type=int, default=16, help="Highest cost timed")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes timed per cost")
+    parser.add_argument(
+        "--workers", type=int, help="Processes of the password pool. Defaults to PASSWORD_POOL_WORKERS"
+    )
+    return parser.parse_args(argv)
+
+
+def time_hash(rounds: int, samples: int):
+    """
+    Times the bcrypt hash of a password at a cost.
+
+    Args:
+        rounds (int): The bcrypt cost.
+        samples (int): The number of hashes timed.
+
+    Returns:
+        float: The median time of a hash, in milliseconds.
+    """
+    from passlib.hash import bcrypt
+
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("benchmark-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def recommend(timings: dict, target_ms: float):
+    """
+    Picks the highest cost whose hash stays under the target.
+
+    Args:
+        timings (dict): The median hash time, in milliseconds, of each cost timed.
+        target_ms (float): The latency target of a hash, in milliseconds.
+
+    Returns:
+        int | None: The recommended cost, or None if even the lowest one is too slow.
+    """
+    within = [rounds for rounds, ms in timings.items() if ms <= target_ms]
+    return max(within) if within else None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers is None:
+        from utils.constants import PASSWORD_POOL_WORKERS
+
+        args.workers = PASSWORD_POOL_WORKERS
+
+    print(f"bcrypt cost: target {args.target_ms:.0f} ms per hash, {args.workers} pool workers")
+    timings = {}
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        timings[rounds] = ms = time_hash(rounds, args.samples)
+        print(f"  rounds {rounds:2d}   {ms:8.1f} ms   {args.workers * 1000 / ms:8.1f} logins/s")
+        if ms > 4 * args.target_ms:
+            break
+
+    rounds = recommend(timings, args.target_ms)
+    if rounds is None:
+        print(f"No cost from {args.min_rounds} hashes within {args.target_ms:.0f} ms")
+        return 1
+
+    print(f"Recommended: BCRYPT_ROUNDS={rounds}")
+    if rounds < MIN_SAFE_ROUNDS:
+        print(f"  below the minimum of {MIN_SAFE_ROUNDS} rounds: raise the target or add pool workers instead")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
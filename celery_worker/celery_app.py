@@ -1,11 +1,33 @@
 from celery import Celery
-from celery_worker import tasks 
+from celery_worker import metrics, tasks
+from utils.constants import (
+    CELERY_BACKEND_URL,
+    CELERY_BROKER_URL,
+    TICKET_HOLD_SWEEP_SECONDS,
+    TICKET_INVENTORY_ENABLED,
+    TICKET_INVENTORY_RECONCILE_SECONDS,
+    TICKET_REQUEST_TTL,
+)
 
 
 app = Celery(__name__)
 
-app.conf.broker_url = "redis://redis:6379/0"
-app.conf.result_backend = "redis://redis:6379/0"
+app.conf.broker_url = CELERY_BROKER_URL
+app.conf.result_backend = CELERY_BACKEND_URL
 app.conf.task_serializer = "json"
+# Ticket outcomes are tracked in short-lived status hashes; expire stored results alike
+app.conf.result_expires = TICKET_REQUEST_TTL
+app.conf.beat_schedule = {
+    "release-expired-ticket-holds": {
+        "task": "celery_worker.tasks.release_expired_holds",
+        "schedule": TICKET_HOLD_SWEEP_SECONDS,
+    },
+}
+
+if TICKET_INVENTORY_ENABLED:
+    app.conf.beat_schedule["reconcile-ticket-inventory"] = {
+        "task": "celery_worker.tasks.reconcile_ticket_inventory",
+        "schedule": TICKET_INVENTORY_RECONCILE_SECONDS,
+    }
 # app.config_from_object('celery_worker.celery_app')
 # app.autodiscover_tasks(["celery_worker.tasks"])
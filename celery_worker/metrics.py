@@ -0,0 +1,44 @@
+import os
+import time
+
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown, worker_ready
+from prometheus_client import Histogram
+
+from utils.constants import CELERY_METRICS_PORT
+from utils.metrics import build_registry, mark_process_dead, start_metrics_server
+
+# Recorded by the prefork children, merged by the main worker process in multiprocess mode
+task_duration_seconds = Histogram(
+    "celery_task_duration_seconds",
+    "Duration of the Celery tasks, by task and final state.",
+    ["task", "state"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Start time of the tasks running in this process, by task ID
+_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is None:
+        return
+
+    task_duration_seconds.labels(task=task.name, state=state).observe(time.perf_counter() - started)
+
+
+@worker_process_shutdown.connect
+def release_process_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+
+@worker_ready.connect
+def start_worker_metrics_server(**kwargs):
+    if CELERY_METRICS_PORT:
+        start_metrics_server(build_registry(), CELERY_METRICS_PORT)
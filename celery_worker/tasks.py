@@ -1,45 +1,228 @@
+from collections import Counter
 from celery import shared_task
+from celery.signals import worker_ready
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 from db.config import engine
+from db.redis import get_redis
 from models.event import EventModel, EventTicketModel
 from models.location import CityModel
 from models.category import CategoryModel
 from models.user import UserModel
+from services.capacity_services import publish_remaining_capacity
+from services.event_services import EventServiceHandler
+from services.inventory_services import TicketInventoryHandler
+from services.ticket_services import TicketRequestHandler
+from services.waitlist_services import WaitlistHandler
+from utils.constants import TICKET_BATCH_SIZE
+from utils.enums import TicketRequestStatusEnum
 
 # Crear una sesión directamente usando el motor
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-@shared_task
-def process_ticket(event_id: int, user_id: int):
+@shared_task(bind=True)
+def process_ticket(self, event_id: int, user_id: int):
     db: Session = SessionLocal()  # Obtén la sesión de la base de datos
+    redis_client = get_redis()
+    ticket_requests = TicketRequestHandler(redis_client)
     try:
-        # Obtén el evento y cuenta los tickets existentes
-        event = db.query(EventModel).filter(EventModel.id == event_id).first()
-        ticket_count = db.query(EventTicketModel).filter(EventTicketModel.event_id == event_id).count()
-
-        if ticket_count < event.capacity:
-            # Crear el ticket
-            ticket = EventTicketModel(event_id=event_id, user_id=user_id)
-            db.add(ticket)
-            db.commit()
-            db.refresh(ticket)
-            return "Created ticket"
-            # Enviar correo de confirmación
+        # Reserva un cupo de forma atómica: un único UPDATE condicional sobre
+        # el contador `tickets_sold`, sin COUNT(*) y sin posibilidad de sobreventa
+        service = EventServiceHandler(db)
+        remaining = service.reserve_seats(event_id)
+        if remaining is None:
+            db.rollback()
+            event_exists = db.query(EventModel.id).filter(EventModel.id == event_id).first()
+            if not event_exists:
+                ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.NOT_FOUND)
+                return "Event not found"
+
+            # Sin cupo: el usuario pasa a la lista de espera del evento
+            WaitlistHandler(redis_client, db).join(event_id, [(user_id, self.request.id)])
+            ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.WAITLISTED)
+            return "Event sold out, added to waitlist"
+            # Enviar correo de cupo agotado
             # send_email(
             #     to_user_id=user_id,
-            #     subject="Ticket confirmado",
-            #     body=f"Tu ticket para el evento '{event.name}' ha sido confirmado.",
+            #     subject="Cupo agotado",
+            #     body=f"Lo sentimos, no hay más cupos disponibles para el evento '{event.name}'.",
             # )
-        
-        return "Event sold out"
-        # Enviar correo de cupo agotado
-        # send_email(
-        #     to_user_id=user_id,
-        #     subject="Cupo agotado",
-        #     body=f"Lo sentimos, no hay más cupos disponibles para el evento '{event.name}'.",
-        # )
+
+        # Crear el ticket en la misma transacción que la reserva
+        ticket = service.new_ticket(event_id, user_id)
+        db.add(ticket)
+        try:
+            db.commit()
+        except IntegrityError:
+            # El usuario ya tiene ticket de un evento de uno por usuario: el rollback también libera el cupo
+            db.rollback()
+            ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.ALREADY_ISSUED)
+            return "Ticket already issued"
+    except Exception as e:
+        db.rollback()
+        ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.ERROR)
+        raise e
+    finally:
+        db.close()
+
+    # El ticket ya está confirmado: un fallo a partir de aquí no lo marca como error
+    ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.CREATED)
+    publish_remaining_capacity(redis_client, event_id, remaining)
+    return "Created ticket"
+    # Enviar correo de confirmación
+    # send_email(
+    #     to_user_id=user_id,
+    #     subject="Ticket confirmado",
+    #     body=f"Tu ticket para el evento '{event.name}' ha sido confirmado.",
+    # )
+
+
+@shared_task(bind=True)
+def process_ticket_batch(self, event_id: int):
+    # Drena la cola de solicitudes del evento por lotes: una transacción y un
+    # INSERT multi-fila por lote en lugar de una transacción por ticket
+    redis_client = get_redis()
+    ticket_requests = TicketRequestHandler(redis_client)
+    summary = {"created": 0, "waitlisted": 0, "already_issued": 0}
+    # Cada lote queda en la lista de procesamiento de esta tarea hasta guardar su resultado
+    consumer = f"{self.request.hostname}:{self.request.id}"
+
+    while batch := ticket_requests.pop_batch(event_id, TICKET_BATCH_SIZE, consumer):
+        db: Session = SessionLocal()
+        try:
+            service = EventServiceHandler(db)
+            winners, already_issued, remaining = service.issue_tickets(
+                event_id, [r["user_id"] for r in batch]
+            )
+        except Exception as e:
+            db.rollback()
+            ticket_requests.record_outcomes({r["request_id"]: TicketRequestStatusEnum.ERROR for r in batch})
+            ticket_requests.ack_batch(event_id, consumer)
+            # Las solicitudes restantes siguen en cola; otra tarea las procesa
+            process_ticket_batch.delay(event_id)
+            raise e
+        finally:
+            db.close()
+
+        # Cada ticket concedido corresponde a la primera solicitud pendiente de su
+        # usuario; el resto de solicitudes sin cupo pasa a la lista de espera
+        pending_winners = Counter(winners)
+        outcomes = {}
+        waitlisted = []
+        for r in batch:
+            if pending_winners[r["user_id"]]:
+                pending_winners[r["user_id"]] -= 1
+                outcomes[r["request_id"]] = TicketRequestStatusEnum.CREATED
+            elif r["user_id"] in already_issued:
+                outcomes[r["request_id"]] = TicketRequestStatusEnum.ALREADY_ISSUED
+            else:
+                outcomes[r["request_id"]] = TicketRequestStatusEnum.WAITLISTED
+                waitlisted.append((r["user_id"], r["request_id"]))
+
+        WaitlistHandler(redis_client, db).join(event_id, waitlisted)
+        ticket_requests.record_outcomes(outcomes)
+        ticket_requests.ack_batch(event_id, consumer)
+        if winners:
+            publish_remaining_capacity(redis_client, event_id, remaining)
+        for outcome in outcomes.values():
+            summary[outcome.value] += 1
+
+    return summary
+
+
+@worker_ready.connect
+def requeue_interrupted_batches(sender=None, **kwargs):
+    # Devuelve a la cola los lotes que este worker no terminó antes de morir
+    requeued = TicketRequestHandler(get_redis()).requeue(sender.hostname)
+    for event_id in requeued:
+        process_ticket_batch.delay(event_id)
+
+
+@shared_task(bind=True)
+def persist_ticket(self, event_id: int, user_id: int):
+    # Persiste un ticket ya reservado en el inventario de Redis
+    db: Session = SessionLocal()
+    redis_client = get_redis()
+    inventory = TicketInventoryHandler(redis_client, db)
+    ticket_requests = TicketRequestHandler(redis_client)
+    try:
+        service = EventServiceHandler(db)
+        remaining = service.reserve_seats(event_id)
+        if remaining is None:
+            # Desfase entre Redis y Postgres: la reconciliación lo corrige. El cupo
+            # reservado en Redis no existe, así que el usuario pasa a la lista de espera
+            db.rollback()
+            event_exists = db.query(EventModel.id).filter(EventModel.id == event_id).first()
+            if not event_exists:
+                ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.NOT_FOUND)
+                inventory.confirm(event_id)
+                return "Event not found"
+
+            WaitlistHandler(redis_client, db).join(event_id, [(user_id, self.request.id)])
+            ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.WAITLISTED)
+            # Se confirma al final: si algo falla antes, el except devuelve la reserva una sola vez
+            inventory.confirm(event_id)
+            return "Event sold out, added to waitlist"
+
+        ticket = service.new_ticket(event_id, user_id)
+        db.add(ticket)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            inventory.release(event_id)
+            ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.ALREADY_ISSUED)
+            return "Ticket already issued"
     except Exception as e:
         db.rollback()
+        inventory.release(event_id)
+        ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.ERROR)
         raise e
     finally:
         db.close()
+
+    # El ticket ya está confirmado: un fallo a partir de aquí no devuelve su cupo
+    inventory.confirm(event_id)
+    ticket_requests.record_outcome(self.request.id, TicketRequestStatusEnum.CREATED)
+    publish_remaining_capacity(redis_client, event_id, remaining)
+    return "Created ticket"
+
+
+@shared_task
+def reconcile_ticket_inventory():
+    # Corrige el desfase del inventario de Redis contra los tickets en Postgres
+    db: Session = SessionLocal()
+    try:
+        inventory = TicketInventoryHandler(get_redis(), db)
+        return inventory.reconcile()
+    finally:
+        db.close()
+
+
+@shared_task
+def release_expired_holds():
+    # Libera en bloque los cupos retenidos que ya vencieron
+    db: Session = SessionLocal()
+    redis_client = get_redis()
+    try:
+        released = EventServiceHandler(db).release_expired_holds()
+        for event_id, remaining in released.items():
+            publish_remaining_capacity(redis_client, event_id, remaining)
+            promote_waitlist.delay(event_id)
+        return released
+    finally:
+        db.close()
+
+
+@shared_task
+def promote_waitlist(event_id: int):
+    # Entrega los cupos liberados a los siguientes usuarios de la lista de espera
+    db: Session = SessionLocal()
+    redis_client = get_redis()
+    try:
+        promoted, remaining = WaitlistHandler(redis_client, db).promote(event_id)
+        if promoted:
+            publish_remaining_capacity(redis_client, event_id, remaining)
+        return promoted
+    finally:
+        db.close()
@@ -1,20 +1,153 @@
+import itertools
 import os
-from sqlalchemy import create_engine
+from typing import Optional
+
+from fastapi import Header
+from sqlalchemy import Delete, Insert, Update, create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 
-from utils.constants import DATABASE_URL
+from db.instrumentation import PoolMetrics, install_query_counter, install_slow_query_log
+from utils.constants import (
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_QUERY_STATS_ENABLED,
+    DB_SLOW_QUERY_MS,
+    DB_SLOW_QUERY_SAMPLE_RATE,
+)
 
 # Load environment variables from a .env file
 load_dotenv()
 
+
+def pool_options(url):
+    """
+    Builds the pool settings of an engine.
+
+    Checkouts fail after `DB_POOL_TIMEOUT` seconds instead of hanging when the
+    pool is exhausted. SQLite keeps the pool its dialect picks, e.g. the single
+    connection an in-memory database must share across sessions, and those pools
+    reject the size, overflow and timeout settings of a queue pool.
+
+    Args:
+        url (str | URL): The database URL.
+
+    Returns:
+        dict: The pool keyword arguments for `create_engine` or `create_async_engine`.
+    """
+    options = {"pool_recycle": DB_POOL_RECYCLE, "pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+
 # Configure the SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, **pool_options(DATABASE_URL))
+
+if DB_SLOW_QUERY_MS > 0:
+    install_slow_query_log(engine, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_SAMPLE_RATE)
 
 # Create a session factory bound to the engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers of the supported sync URLs, used when no async URL is configured
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def to_async_url(url: str):
+    """
+    Derives the URL of the async engine from a sync database URL.
+
+    Args:
+        url (str): A sync database URL, e.g. `postgresql://...` or `postgresql+psycopg2://...`.
+
+    Returns:
+        URL: The same database with its async driver, e.g. `postgresql+asyncpg://...`.
+    """
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def create_pooled_async_engine(url):
+    """
+    Creates an async engine with the pool settings of the sync engine.
+
+    Each uvicorn worker holds its own pool of `DB_POOL_SIZE` connections per
+    engine, except on SQLite (see `pool_options`).
+
+    Args:
+        url (str | URL): The async database URL.
+
+    Returns:
+        AsyncEngine: The async engine.
+    """
+    return create_async_engine(url, echo=DB_ECHO, **pool_options(url))
+
+
+# Async engine for the hot read endpoints; the Celery worker keeps the sync engine
+async_engine = create_pooled_async_engine(ASYNC_DATABASE_URL or to_async_url(DATABASE_URL))
+
+# Optional read replicas, rotated round-robin by the read-only endpoints
+replica_engines = [create_pooled_async_engine(to_async_url(url)) for url in DATABASE_REPLICA_URLS]
+_next_replica = itertools.cycle(replica_engines)
+
+if DB_SLOW_QUERY_MS > 0:
+    for slow_engine in [async_engine, *replica_engines]:
+        install_slow_query_log(slow_engine.sync_engine, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_SAMPLE_RATE)
+
+if DB_QUERY_STATS_ENABLED:
+    for counted_engine in [engine, async_engine.sync_engine, *(replica.sync_engine for replica in replica_engines)]:
+        install_query_counter(counted_engine)
+
+# Pool gauges of every engine of the process, exposed on /metrics
+pool_metrics = PoolMetrics({
+    "sync": engine,
+    "async": async_engine,
+    **{f"replica-{i}": replica for i, replica in enumerate(replica_engines)},
+})
+
+# Loaded attributes stay readable after commit, since async sessions cannot lazy load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary.
+
+    The replica is picked once per session and kept in `info["replica"]`, so all
+    the reads of a request see the same snapshot. Flushes and INSERT, UPDATE and
+    DELETE statements always go to the primary. Without a replica it behaves as a
+    regular session on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is None or self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        return replica.sync_engine
+
+
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Define the base class for declarative models
 Base = declarative_base()
 
@@ -46,3 +179,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Provide an async session for database operations.
+
+    This is the async counterpart of `get_db`, meant for `async def` endpoints so
+    they do not occupy a thread of the pool while waiting on the database.
+    Relationships are not lazy loaded on these sessions: the services load every
+    relationship they return up front.
+
+    Yields:
+        AsyncSession: An SQLAlchemy async session for interacting with the database.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(x_read_consistency: Optional[str] = Header(None)):
+    """
+    Provide an async session that reads from the next read replica.
+
+    Meant for read-only endpoints. Replicas lag behind the primary, so a client
+    that must see its own writes (e.g. right after creating an event) sends the
+    header `X-Read-Consistency: primary` to read from the primary instead. When
+    no replica is configured every session reads from the primary.
+
+    Args:
+        x_read_consistency (Optional[str]): "primary" to skip the replicas.
+
+    Yields:
+        AsyncSession: An SQLAlchemy async session routed by `RoutingSession`.
+    """
+    info = {}
+    if replica_engines and (x_read_consistency or "").lower() != "primary":
+        info["replica"] = next(_next_replica)
+
+    async with AsyncReadSessionLocal(info=info) as db:
+        yield db
@@ -0,0 +1,164 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from prometheus_client.core import GaugeMetricFamily
+
+# Dedicated logger, so slow queries can be routed independently of the app logs
+slow_query_logger = logging.getLogger("db.slow_query")
+
+# Longest statement text kept in a log record
+MAX_STATEMENT_LENGTH = 2000
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, sample_rate: float = 1.0):
+    """
+    Logs the statements of an engine that take longer than a threshold.
+
+    Only the duration of each statement is measured, so the cost on fast
+    statements is a couple of clock reads. Slow statements are logged as
+    structured records (duration, row count and statement, without parameters)
+    for a `sample_rate` fraction of them, to bound the log volume under load.
+
+    Args:
+        engine (Engine): The engine to instrument.
+        threshold_ms (float): The minimum duration, in milliseconds, of a logged statement.
+        sample_rate (float): The fraction of slow statements that are logged. Defaults to 1.0.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context._query_started_at) * 1000
+        if duration_ms < threshold_ms or random.random() >= sample_rate:
+            return
+
+        statement = " ".join(statement.split())[:MAX_STATEMENT_LENGTH]
+        slow_query_logger.warning(
+            "Slow query (%.1f ms): %s",
+            duration_ms,
+            statement,
+            extra={
+                "duration_ms": round(duration_ms, 1),
+                "rowcount": cursor.rowcount,
+                "executemany": executemany,
+                "statement": statement,
+            },
+        )
+
+
+# Longest list of statements kept per request for the query budget log
+MAX_TRACKED_STATEMENTS = 100
+
+# Queries of the request being served, None outside of `QueryStatsMiddleware`
+request_query_stats: ContextVar[Optional["QueryStats"]] = ContextVar("request_query_stats", default=None)
+
+
+class QueryStats:
+    """
+    Number and total duration of the statements issued while serving a request.
+
+    Attributes:
+        count (int): The number of statements executed.
+        duration_ms (float): Their total duration, in milliseconds.
+        statements (Optional[list]): Their text, when tracked, up to `MAX_TRACKED_STATEMENTS`.
+    """
+
+    def __init__(self, track_statements: bool = False):
+        """
+        Initializes empty statistics.
+
+        Args:
+            track_statements (bool): Whether to keep the text of the statements. Defaults to False.
+        """
+        self.count = 0
+        self.duration_ms = 0.0
+        self.statements = [] if track_statements else None
+
+    def server_timing(self):
+        """
+        Formats the statistics as a `Server-Timing` header value.
+
+        Returns:
+            str: e.g. `db;dur=12.3;desc="4 queries"`.
+        """
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+
+def install_query_counter(engine: Engine):
+    """
+    Counts the statements of an engine into the `QueryStats` of the current request.
+
+    Statements issued outside of a request (Celery tasks, scripts) are ignored
+    after a single context variable lookup.
+
+    Args:
+        engine (Engine): The engine to instrument.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if request_query_stats.get() is not None:
+            context._request_query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        stats = request_query_stats.get()
+        if stats is None:
+            return
+
+        stats.count += 1
+        stats.duration_ms += (time.perf_counter() - context._request_query_started_at) * 1000
+        if stats.statements is not None and len(stats.statements) < MAX_TRACKED_STATEMENTS:
+            stats.statements.append(" ".join(statement.split())[:MAX_STATEMENT_LENGTH])
+
+
+class PoolMetrics:
+    """
+    Exposes the state of the connection pools of several engines as gauges.
+
+    The pools are read at scrape time, so there is no cost per checkout.
+
+    Attributes:
+        engines (Dict[str, Engine]): The engines to expose, by name.
+    """
+
+    # (metric, pool method, documentation) of each gauge
+    GAUGES = [
+        ("db_pool_size", "size", "Connections kept open by the pool."),
+        ("db_pool_checked_out", "checkedout", "Connections currently checked out of the pool."),
+        ("db_pool_overflow", "overflow", "Connections open above the pool size (negative while the pool fills up)."),
+    ]
+
+    def __init__(self, engines: Dict[str, Engine]):
+        """
+        Initializes the collector.
+
+        Args:
+            engines (Dict[str, Engine]): The engines to expose, by name. Async
+                engines are read through their `sync_engine`.
+        """
+        self.engines = {name: getattr(engine, "sync_engine", engine) for name, engine in engines.items()}
+
+    def collect(self):
+        """
+        Reads the gauges of every pool that keeps connections, when scraped.
+
+        Yields:
+            GaugeMetricFamily: Each gauge, labelled by engine.
+        """
+        for metric, method, documentation in self.GAUGES:
+            gauge = GaugeMetricFamily(metric, documentation, labels=["engine"])
+            for name, engine in self.engines.items():
+                # Pools without a fixed size, like NullPool, have nothing to report
+                if hasattr(engine.pool, method):
+                    gauge.add_metric([name], getattr(engine.pool, method)())
+            yield gauge
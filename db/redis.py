@@ -0,0 +1,35 @@
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from utils.constants import REDIS_URL
+
+# Configure the shared Redis client (the same instance used as Celery broker).
+# Connections are opened lazily from the client's internal pool.
+redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
+
+
+def get_redis():
+    """
+    Provide the shared Redis client.
+
+    This function can be used as a FastAPI dependency or called directly from
+    services and Celery tasks that need to talk to Redis.
+
+    Returns:
+        Redis: The shared Redis client.
+    """
+    return redis_client
+
+
+# Client for the coroutines of the async endpoints, so they do not block the event loop on Redis
+async_redis_client = AsyncRedis.from_url(REDIS_URL, decode_responses=True)
+
+
+def get_async_redis():
+    """
+    Provide the shared async Redis client.
+
+    Returns:
+        redis.asyncio.Redis: The shared async Redis client.
+    """
+    return async_redis_client
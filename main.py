@@ -1,24 +1,115 @@
-from fastapi import Depends, FastAPI
+from contextlib import asynccontextmanager
+
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from api import api_router
-from db.config import get_db
-from services.user_services import UserServiceHandler
+from db.config import get_async_db, get_db, pool_metrics
+from models.user import UserModel
+from schemas.user import RefreshTokenRequest
+from services.user_services import AsyncUserServiceHandler, UserServiceHandler
+from utils.auths import get_current_user, oauth2_scheme
+from utils.constants import DB_QUERY_BUDGET, DB_QUERY_STATS_ENABLED, PROFILER_ENABLED
+from utils.metrics import build_registry
+from utils.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    route_query_stats,
+)
+from utils.password_pool import password_pool
+from utils.profiling import continuous_profiler
+from utils.rate_limit import login_rate_limit
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the always-on sampler for the lifetime of the app when PROFILER_ENABLED is set,
+    and stop the password hashing processes on shutdown.
+    """
+    if PROFILER_ENABLED:
+        continuous_profiler.start()
+    try:
+        yield
+    finally:
+        if PROFILER_ENABLED:
+            continuous_profiler.stop()
+        password_pool.shutdown()
+
 
+app = FastAPI(title="My Event App", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="My Event App", version="0.1.0")
+if DB_QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, budget=DB_QUERY_BUDGET)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# The counters, gauges and histograms of the app, plus the state of this process
+metrics_registry = build_registry(route_query_stats, pool_metrics)
 
 app.include_router(api_router, prefix="/api")
 
-@app.post("/login", tags=["Authentication"])
-def login(
+@app.post("/login", tags=["Authentication"], dependencies=[Depends(login_rate_limit)])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """"""
-    service = UserServiceHandler(db)
-    return service.login(
+    service = AsyncUserServiceHandler(db)
+    return await service.login(
         email=form_data.username,
         password=form_data.password
     )
+
+
+@app.post("/refresh", tags=["Authentication"])
+def refresh(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    Args:
+        body (RefreshTokenRequest): The refresh token returned by the login or the last refresh.
+        db (Session): Database session dependency.
+
+    Returns:
+        dict: The new access token, refresh token and token type.
+    """
+    service = UserServiceHandler(db)
+    return service.refresh(body.refresh_token)
+
+
+@app.post("/logout", tags=["Authentication"], status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    body: Optional[RefreshTokenRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Revoke the access token of the request and, if given, its refresh token.
+
+    Args:
+        body (Optional[RefreshTokenRequest]): The refresh token issued with the access token.
+        token (str): The access token of the request.
+        db (Session): Database session dependency.
+        current_user (UserModel): The currently authenticated user.
+    """
+    service = UserServiceHandler(db)
+    service.logout(token, body.refresh_token if body else None)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Expose the metrics of this worker process in the Prometheus text format.
+
+    Returns:
+        Response: The exposition of `metrics_registry`.
+    """
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
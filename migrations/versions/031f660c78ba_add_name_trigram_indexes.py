@@ -0,0 +1,49 @@
+"""add name trigram indexes
+
+Revision ID: 031f660c78ba
+Revises: 6c51fcb04fd1
+Create Date: 2026-10-17 19:24:37.501926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '031f660c78ba'
+down_revision: Union[str, None] = '6c51fcb04fd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, column) of the GIN indexes serving the ILIKE '%term%' filters
+INDEXES = [
+    ('ix_event_name_trgm', 'event', 'name'),
+    ('ix_city_name_trgm', 'city', 'name'),
+    ('ix_category_name_trgm', 'category', 'name'),
+]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name, table, [column], unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    # The pg_trgm extension is left installed, other objects may depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
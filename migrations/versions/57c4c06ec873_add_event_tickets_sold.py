@@ -0,0 +1,38 @@
+"""add event tickets_sold counter
+
+Revision ID: 57c4c06ec873
+Revises: f47674df85d5
+Create Date: 2026-10-17 09:12:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57c4c06ec873'
+down_revision: Union[str, None] = 'f47674df85d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event',
+        sa.Column('tickets_sold', sa.Integer(), server_default='0', nullable=False)
+    )
+    # Backfill the counter from the tickets already issued
+    op.execute(
+        """
+        UPDATE event
+        SET tickets_sold = (
+            SELECT COUNT(*) FROM event_ticket WHERE event_ticket.event_id = event.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'tickets_sold')
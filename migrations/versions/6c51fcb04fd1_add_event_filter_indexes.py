@@ -0,0 +1,46 @@
+"""add event filter indexes
+
+Revision ID: 6c51fcb04fd1
+Revises: d52e0c1f3a8b
+Create Date: 2026-10-17 18:02:11.845310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c51fcb04fd1'
+down_revision: Union[str, None] = 'd52e0c1f3a8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns). event_ticket.event_id is already the leading column of
+# ix_event_ticket_event_id_user_id, so it needs no index of its own.
+INDEXES = [
+    ('ix_event_date', 'event', ['date']),
+    ('ix_event_owner_id', 'event', ['owner_id']),
+    ('ix_event_status_date', 'event', ['status', 'date']),
+    ('ix_event_category_id_date', 'event', ['category_id', 'date']),
+    ('ix_event_location_id_date', 'event', ['location_id', 'date']),
+    ('ix_session_event_id', 'session', ['event_id']),
+    ('ix_event_ticket_user_id', 'event_ticket', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently on Postgres so ticket sales are not blocked meanwhile,
+    # which has to happen outside of the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
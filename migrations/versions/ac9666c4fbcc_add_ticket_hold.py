@@ -0,0 +1,41 @@
+"""add ticket_hold
+
+Revision ID: ac9666c4fbcc
+Revises: b1af3655b607
+Create Date: 2026-10-17 13:05:52.114093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac9666c4fbcc'
+down_revision: Union[str, None] = 'b1af3655b607'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_hold',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'user_id', name='uq_ticket_hold_event_user')
+    )
+    op.create_index(op.f('ix_ticket_hold_id'), 'ticket_hold', ['id'], unique=False)
+    op.create_index(op.f('ix_ticket_hold_expires_at'), 'ticket_hold', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ticket_hold_expires_at'), table_name='ticket_hold')
+    op.drop_index(op.f('ix_ticket_hold_id'), table_name='ticket_hold')
+    op.drop_table('ticket_hold')
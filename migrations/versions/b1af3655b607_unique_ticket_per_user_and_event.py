@@ -0,0 +1,50 @@
+"""one ticket per user events
+
+Revision ID: b1af3655b607
+Revises: 57c4c06ec873
+Create Date: 2026-10-17 11:40:08.518734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1af3655b607'
+down_revision: Union[str, None] = '57c4c06ec873'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event',
+        sa.Column('one_ticket_per_user', sa.Boolean(), server_default=sa.false(), nullable=False)
+    )
+    # Copied from the event when a ticket is issued. Existing tickets keep false:
+    # they were bought when a user could hold several, so none is removed
+    op.add_column(
+        'event_ticket',
+        sa.Column('one_per_user', sa.Boolean(), server_default=sa.false(), nullable=False)
+    )
+    # Serves the ticket lookups by event and by event and user on every event;
+    # the unique index below only covers the tickets of one-ticket-per-user events
+    op.create_index(
+        'ix_event_ticket_event_id_user_id', 'event_ticket', ['event_id', 'user_id'], unique=False
+    )
+    op.create_index(
+        'uq_event_ticket_event_user',
+        'event_ticket',
+        ['event_id', 'user_id'],
+        unique=True,
+        postgresql_where=sa.text('one_per_user'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_event_ticket_event_user', table_name='event_ticket')
+    op.drop_index('ix_event_ticket_event_id_user_id', table_name='event_ticket')
+    op.drop_column('event_ticket', 'one_per_user')
+    op.drop_column('event', 'one_ticket_per_user')
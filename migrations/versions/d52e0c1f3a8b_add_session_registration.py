@@ -0,0 +1,40 @@
+"""add session registration
+
+Revision ID: d52e0c1f3a8b
+Revises: ac9666c4fbcc
+Create Date: 2026-10-17 15:12:40.327118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52e0c1f3a8b'
+down_revision: Union[str, None] = 'ac9666c4fbcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('session', sa.Column('registrations_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('session_registration',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'user_id', name='uq_session_registration_session_user')
+    )
+    op.create_index(op.f('ix_session_registration_id'), 'session_registration', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_session_registration_id'), table_name='session_registration')
+    op.drop_table('session_registration')
+    op.drop_column('session', 'registrations_count')
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime
+from sqlalchemy import DDL, Column, DateTime, Index, event
+
+from db.config import Base
 
 
 class DatetimeModel:
@@ -27,3 +29,33 @@ class DatetimeModel:
         onupdate=datetime.now(timezone.utc),
         doc="The datetime when the record was last updated, in UTC."
     )
+
+
+# `create_all` needs the extension of the trigram indexes on Postgres
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def trigram_index(name: str, column: str):
+    """
+    Declares a pg_trgm GIN index, which serves `ILIKE '%term%'` filters on the column.
+
+    The index only exists on Postgres (it needs the `pg_trgm` extension); other
+    databases skip it.
+
+    Args:
+        name (str): The name of the index.
+        column (str): The name of the text column to index.
+
+    Returns:
+        Index: The index, to be listed in the `__table_args__` of the model.
+    """
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String
 from db.config import Base
 from sqlalchemy.orm import relationship
 
-from models.base import DatetimeModel
+from models.base import DatetimeModel, trigram_index
 
 
 class CategoryModel(Base, DatetimeModel):
@@ -19,6 +19,7 @@ class CategoryModel(Base, DatetimeModel):
             associated with this category.
     """
     __tablename__ = "category"
+    __table_args__ = (trigram_index("ix_category_name_trgm", "name"),)
 
     id = Column(
         Integer, 
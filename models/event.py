@@ -1,16 +1,21 @@
 from db.config import Base
 from sqlalchemy import (
+    Boolean,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
     DateTime,
     Text,
+    UniqueConstraint,
     Enum as SQLAlchemyEnum,
+    false,
+    text,
 )
 from sqlalchemy.orm import relationship
 
-from models.base import DatetimeModel
+from models.base import DatetimeModel, trigram_index
 from utils.enums import StatusEnum
 
 
@@ -28,6 +33,8 @@ class EventModel(Base, DatetimeModel):
         description (Column): A detailed description of the event.
         date (Column): The date and time when the event occurs.
         capacity (Column): The maximum number of attendees allowed.
+        tickets_sold (Column): The number of tickets issued so far, kept in sync with `event_ticket`.
+        one_ticket_per_user (Column): Whether a user can hold at most one ticket for the event.
         status (Column): The current status of the event, defined by `StatusEnum`.
         location_id (Column): The ID of the associated city where the event takes place.
         category_id (Column): The ID of the category to which the event belongs.
@@ -40,6 +47,14 @@ class EventModel(Base, DatetimeModel):
     """
 
     __tablename__ = "event"
+    # The listing filters by status, category or location within a date range;
+    # the leading columns also serve the plain foreign-key lookups
+    __table_args__ = (
+        Index("ix_event_status_date", "status", "date"),
+        Index("ix_event_category_id_date", "category_id", "date"),
+        Index("ix_event_location_id_date", "location_id", "date"),
+        trigram_index("ix_event_name_trgm", "name"),
+    )
 
     id = Column(
         Integer,
@@ -52,11 +67,25 @@ class EventModel(Base, DatetimeModel):
         Text, nullable=True, doc="A detailed description of the event."
     )
     date = Column(
-        DateTime, nullable=False, doc="The date and time when the event occurs."
+        DateTime, nullable=False, index=True, doc="The date and time when the event occurs."
     )
     capacity = Column(
         Integer, nullable=False, doc="The maximum number of attendees allowed."
     )
+    tickets_sold = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="The number of tickets issued so far for the event.",
+    )
+    one_ticket_per_user = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+        doc="Whether a user can hold at most one ticket for the event.",
+    )
     status = Column(
         SQLAlchemyEnum(StatusEnum),
         nullable=False,
@@ -78,32 +107,41 @@ class EventModel(Base, DatetimeModel):
         Integer,
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
         doc="The ID of the user who owns the event.",
     )
 
-    # Relationships to other models
+    # Relationships to other models. They raise instead of lazy loading, so every
+    # query has to load the relationships its response serializes (no N+1)
     location = relationship(
         "CityModel",
+        lazy="raise",
         back_populates="events",
         doc="Relationship to the CityModel representing the event's location.",
     )
     category = relationship(
         "CategoryModel",
+        lazy="raise",
         # back_populates="events",
         doc="Relationship to the CategoryModel for event categorization.",
     )
     tickets = relationship(
         "EventTicketModel",
+        lazy="raise",
+        passive_deletes=True,
         back_populates="event",
         doc="Relationship to the EventTicketModel to track event tickets.",
     )
     sessions = relationship(
         "SessionModel",
+        lazy="raise",
+        passive_deletes=True,
         back_populates="event",
         doc="Relationship to the SessionModel for event sessions.",
     )
     owner = relationship(
         "UserModel",
+        lazy="raise",
         back_populates="events",
         doc="Relationship to the UserModel representing the event owner.",
     )
@@ -124,6 +162,7 @@ class SessionModel(Base, DatetimeModel):
         start_time (Column): The start time of the session.
         end_time (Column): The end time of the session.
         capacity (Column): The maximum number of attendees allowed for the session.
+        registrations_count (Column): The number of registrations so far, kept in sync with `session_registration`.
         speaker (Column): The name of the speaker for the session.
         event (relationship): A relationship to the `EventModel` for the associated event.
     """
@@ -140,6 +179,7 @@ class SessionModel(Base, DatetimeModel):
         Integer,
         ForeignKey("event.id"),
         nullable=False,
+        index=True,
         doc="The ID of the associated event.",
     )
     name = Column(String, doc="The name of the session.")
@@ -149,31 +189,106 @@ class SessionModel(Base, DatetimeModel):
     capacity = Column(
         Integer, doc="The maximum number of attendees allowed for the session."
     )
+    registrations_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="The number of registrations so far for the session.",
+    )
     speaker = Column(String, doc="The name of the speaker for the session.")
 
     event = relationship(
         "EventModel",
+        lazy="raise",
         back_populates="sessions",
         doc="Relationship to the EventModel for the associated event.",
     )
 
 
+class SessionRegistrationModel(Base, DatetimeModel):
+    """
+    Represents the registration of a user for a session.
+
+    This model extends the `DatetimeModel` and counts against the session capacity
+    through `SessionModel.registrations_count`. A user can register at most once
+    per session.
+
+    Attributes:
+        id (Column): The unique identifier for the registration.
+        session_id (Column): The ID of the session the user registered for.
+        user_id (Column): The ID of the registered user.
+        session (relationship): A relationship to the `SessionModel` for the associated session.
+        user (relationship): A relationship to the `UserModel` for the registered user.
+    """
+
+    __tablename__ = "session_registration"
+    __table_args__ = (
+        UniqueConstraint("session_id", "user_id", name="uq_session_registration_session_user"),
+    )
+
+    id = Column(
+        Integer,
+        primary_key=True,
+        index=True,
+        doc="The unique identifier for the registration.",
+    )
+    session_id = Column(
+        Integer,
+        ForeignKey("session.id"),
+        nullable=False,
+        doc="The ID of the session the user registered for.",
+    )
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id"),
+        nullable=False,
+        doc="The ID of the registered user.",
+    )
+
+    # Relationships to other models
+    session = relationship(
+        "SessionModel",
+        lazy="raise",
+        doc="Relationship to the SessionModel for the associated session.",
+    )
+    user = relationship(
+        "UserModel",
+        lazy="raise",
+        doc="Relationship to the UserModel for the registered user.",
+    )
+
+
 class EventTicketModel(Base, DatetimeModel):
     """
     Represents a ticket for an event.
 
     This model extends the `DatetimeModel` and defines attributes for tracking tickets
-    issued for an event, associating a user with a specific event.
+    issued for an event, associating a user with a specific event. On events with
+    `one_ticket_per_user`, a user can hold at most one ticket: the flag is copied to
+    the ticket so a partial unique index can enforce it.
 
     Attributes:
         id (Column): The unique identifier for the event ticket.
         event_id (Column): The ID of the event for which the ticket is issued.
         user_id (Column): The ID of the user who owns the ticket.
+        one_per_user (Column): Whether the ticket belongs to a one-ticket-per-user event.
         event (relationship): A relationship to the `EventModel` for the associated event.
         user (relationship): A relationship to the `UserModel` for the user who owns the ticket.
     """
 
     __tablename__ = "event_ticket"
+    __table_args__ = (
+        Index("ix_event_ticket_event_id_user_id", "event_id", "user_id"),
+        Index(
+            "uq_event_ticket_event_user",
+            "event_id",
+            "user_id",
+            unique=True,
+            postgresql_where=text("one_per_user"),
+            sqlite_where=text("one_per_user"),
+        ),
+    )
 
     id = Column(
         Integer,
@@ -191,16 +306,87 @@ class EventTicketModel(Base, DatetimeModel):
         Integer,
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
         doc="The ID of the user who owns the ticket.",
     )
+    one_per_user = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+        doc="Whether the ticket belongs to a one-ticket-per-user event.",
+    )
 
     # Relationships to other models
     event = relationship(
         "EventModel",
+        lazy="raise",
         back_populates="tickets",
         doc="Relationship to the EventModel for the associated event.",
     )
     user = relationship(
         "UserModel",
+        lazy="raise",
         doc="Relationship to the UserModel for the user who owns the ticket.",
     )
+
+
+class TicketHoldModel(Base, DatetimeModel):
+    """
+    Represents a seat temporarily held for a user during checkout.
+
+    A hold counts against the event capacity through `EventModel.tickets_sold` until
+    it is confirmed into an `EventTicketModel`, released by the user, or reclaimed
+    in bulk once `expires_at` has passed. A user can hold at most one seat per event.
+
+    Attributes:
+        id (Column): The unique identifier for the hold.
+        event_id (Column): The ID of the event the seat is held for.
+        user_id (Column): The ID of the user holding the seat.
+        expires_at (Column): The datetime after which the hold is released, timezone-aware
+            as it is compared with the current UTC time.
+        event (relationship): A relationship to the `EventModel` for the associated event.
+        user (relationship): A relationship to the `UserModel` for the user holding the seat.
+    """
+
+    __tablename__ = "ticket_hold"
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="uq_ticket_hold_event_user"),
+    )
+
+    id = Column(
+        Integer,
+        primary_key=True,
+        index=True,
+        doc="The unique identifier for the hold.",
+    )
+    event_id = Column(
+        Integer,
+        ForeignKey("event.id"),
+        nullable=False,
+        doc="The ID of the event the seat is held for.",
+    )
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id"),
+        nullable=False,
+        doc="The ID of the user holding the seat.",
+    )
+    expires_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        doc="The datetime after which the hold is released.",
+    )
+
+    # Relationships to other models
+    event = relationship(
+        "EventModel",
+        lazy="raise",
+        doc="Relationship to the EventModel for the associated event.",
+    )
+    user = relationship(
+        "UserModel",
+        lazy="raise",
+        doc="Relationship to the UserModel for the user holding the seat.",
+    )
@@ -2,7 +2,7 @@ from db.config import Base
 from sqlalchemy import Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
-from models.base import DatetimeModel
+from models.base import DatetimeModel, trigram_index
 
 
 class CountryModel(Base, DatetimeModel):
@@ -26,7 +26,7 @@ class CountryModel(Base, DatetimeModel):
     code = Column(String, index=True, doc="A unique code for the country (e.g., country code).")
     
     # Relationship to the CityModel for cities in the country
-    cities = relationship("CityModel", back_populates="country", doc="Relationship to the CityModel for the cities within this country.")
+    cities = relationship("CityModel", lazy="raise", passive_deletes=True, back_populates="country", doc="Relationship to the CityModel for the cities within this country.")
 
 
 class CityModel(Base, DatetimeModel):
@@ -44,11 +44,12 @@ class CityModel(Base, DatetimeModel):
         country (relationship): A relationship to the `CountryModel` to associate the city with a country.
     """
     __tablename__ = "city"
+    __table_args__ = (trigram_index("ix_city_name_trgm", "name"),)
 
     id = Column(Integer, primary_key=True, index=True, doc="The unique identifier for the city.")
     name = Column(String, index=True, doc="The name of the city.")
     country_id = Column(Integer, ForeignKey("country.id"), nullable=False, doc="The ID of the country to which the city belongs.")
     
     # Relationship to the CountryModel for the associated country
-    country = relationship("CountryModel", back_populates="cities", doc="Relationship to the CountryModel to link the city to its country.")
-    events = relationship("EventModel", back_populates="location", doc="Relationship to the EventModel for events in the city.")
+    country = relationship("CountryModel", lazy="raise", back_populates="cities", doc="Relationship to the CountryModel to link the city to its country.")
+    events = relationship("EventModel", lazy="raise", passive_deletes=True, back_populates="location", doc="Relationship to the EventModel for events in the city.")
@@ -33,4 +33,4 @@ class UserModel(Base, DatetimeModel):
     hashed_password = Column(String, nullable=False, doc="The hashed password for user authentication.")
 
     # Relationship to the EventModel for events owned by this user
-    events = relationship("EventModel", back_populates="owner", doc="Relationship to the EventModel for events owned by the user.")
+    events = relationship("EventModel", lazy="raise", passive_deletes=True, back_populates="owner", doc="Relationship to the EventModel for events owned by the user.")
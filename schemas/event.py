@@ -1,11 +1,11 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 from schemas import DatetimeSchema
 from schemas.location import CityResponse
-from utils.enums import StatusEnum
+from utils.enums import StatusEnum, TicketRequestStatusEnum
 
 
 class EventFilter(BaseModel):
@@ -33,6 +33,7 @@ class EventBase(BaseModel):
         location_id (int): The ID of the location where the event is held.
         category_id (int): The ID of the category to which the event belongs.
         owner_id (int): The ID of the user who owns the event.
+        one_ticket_per_user (bool): Whether a user can hold at most one ticket for the event.
     """
     name: str
     description: str
@@ -42,6 +43,7 @@ class EventBase(BaseModel):
     location_id: int
     category_id: int
     owner_id: int
+    one_ticket_per_user: bool = False
 
 
 class EventUpdate(BaseModel):
@@ -56,11 +58,13 @@ class EventUpdate(BaseModel):
         description (Optional[str]): A description of the event (optional).
         date (Optional[str]): The date and time of the event (optional).
         status (Optional[StatusEnum]): The status of the event (optional).
+        capacity (Optional[int]): The number of attendees the event can accommodate (optional).
     """
     name: Optional[str] = None
     description: Optional[str] = None
     date: Optional[str] = None
     status: Optional[StatusEnum] = None
+    capacity: Optional[int] = None
    
 
 class EventCreate(EventBase):
@@ -79,6 +83,7 @@ class EventCreate(EventBase):
         location_id (int): The ID of the location (inherited from EventBase).
         category_id (int): The ID of the category (inherited from EventBase).
         owner_id (int): The ID of the owner (inherited from EventBase).
+        one_ticket_per_user (bool): Whether a user can hold at most one ticket (inherited from EventBase).
     """
     pass
 
@@ -100,11 +105,14 @@ class EventResponse(EventBase, DatetimeSchema):
         location_id (int): The ID of the event's location (inherited from EventBase).
         category_id (int): The ID of the event's category (inherited from EventBase).
         owner_id (int): The ID of the event owner (inherited from EventBase).
+        one_ticket_per_user (bool): Whether a user can hold at most one ticket (inherited from EventBase).
+        tickets_sold (int): The number of tickets issued for the event.
         created_at (datetime): The timestamp when the event was created (inherited from DatetimeSchema).
         updated_at (datetime): The timestamp when the event was last updated (inherited from DatetimeSchema).
         location (CityResponse): The location of the event as a nested response.
     """
     id: int
+    tickets_sold: int
     location: CityResponse
 
     class Config:
@@ -171,6 +179,63 @@ class EventTicketResponse(EventTicketBase, DatetimeSchema):
         orm_mode = True
 
 
+class TicketRequestResponse(BaseModel):
+    """
+    A schema for representing the status of a ticket purchase request.
+
+    Ticket purchases are processed asynchronously; this schema lets clients follow
+    a request by the ID returned when it was made.
+
+    Attributes:
+        request_id (str): The unique identifier for the ticket request.
+        event_id (int): The ID of the event the ticket was requested for.
+        status (TicketRequestStatusEnum): The current status of the request.
+    """
+    request_id: str
+    event_id: int
+    status: TicketRequestStatusEnum
+
+
+class TicketHoldResponse(EventTicketBase):
+    """
+    A schema for representing a seat temporarily held for a user.
+
+    The seat is counted against the event capacity until the hold is confirmed,
+    released, or expires.
+
+    Attributes:
+        id (int): The unique identifier for the hold.
+        event_id (int): The ID of the event the seat is held for (inherited from EventTicketBase).
+        user_id (int): The ID of the user holding the seat (inherited from EventTicketBase).
+        expires_at (datetime): The timestamp when the hold expires.
+    """
+    id: int
+    expires_at: datetime
+
+    class Config:
+        """
+        Configurations for the schema, allowing ORM models to be used directly.
+
+        The `orm_mode = True` setting allows Pydantic to read data from ORM models and 
+        convert them into Pydantic models.
+        """
+        orm_mode = True
+
+
+class WaitlistPositionResponse(BaseModel):
+    """
+    A schema for representing the place of a user in the waitlist of a sold-out event.
+
+    Attributes:
+        event_id (int): The ID of the event.
+        position (int): The 1-based position of the user in the waitlist.
+        size (int): The number of users waiting for the event.
+    """
+    event_id: int
+    position: int
+    size: int
+
+
 class SessionBase(BaseModel):
     """
     A base schema for session-related operations.
@@ -249,11 +314,13 @@ class SessionResponse(SessionBase, DatetimeSchema):
         end_time (datetime): The end date and time of the session (inherited from SessionBase).
         capacity (int): The capacity of the session (inherited from SessionBase).
         speaker (str): The speaker of the session (inherited from SessionBase).
+        registrations_count (int): The number of users registered for the session.
         created_at (datetime): The timestamp when the session was created (inherited from DatetimeSchema).
         updated_at (datetime): The timestamp when the session was last updated (inherited from DatetimeSchema).
     """
     id: int
     event_id: int
+    registrations_count: int
     
     class Config:
         """
@@ -263,3 +330,25 @@ class SessionResponse(SessionBase, DatetimeSchema):
         convert them into Pydantic models.
         """
         orm_mode = True
+
+
+class SessionRegistrationCreate(BaseModel):
+    """
+    A schema for registering the current user for several sessions of an event.
+
+    Attributes:
+        session_ids (List[int]): The IDs of the sessions to register for.
+    """
+    session_ids: List[int]
+
+
+class SessionRegistrationResponse(BaseModel):
+    """
+    A schema for representing the sessions a user was registered for.
+
+    Attributes:
+        event_id (int): The ID of the event the sessions belong to.
+        session_ids (List[int]): The IDs of the sessions the user was registered for.
+    """
+    event_id: int
+    session_ids: List[int]
@@ -125,3 +125,13 @@ class UserResponse(UserBase, DatetimeSchema):
         convert them into Pydantic models.
         """
         orm_mode = True
+
+
+class RefreshTokenRequest(BaseModel):
+    """
+    A schema for the refresh token sent to renew or end a session.
+
+    Attributes:
+        refresh_token (str): The refresh token returned by the login.
+    """
+    refresh_token: str
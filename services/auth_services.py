@@ -1,15 +1,29 @@
+import time
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from jose import JWTError, jwt
+from redis import Redis
 
-from utils.constants import ALGORITHM, SECRET_KEY
+from models.user import UserModel
+from utils.constants import (
+    ALGORITHM,
+    CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    SECRET_KEY,
+)
+from utils.enums import RoleEnumInDB
+from utils.password_pool import hash_password, password_pool, pwd_context, verify_and_update_password
 # from utils.auths import oauth2_scheme
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# `type` claim of the self-contained tokens; tokens with a subject only have none
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 
 class AuthServiceHandler:
     """
@@ -19,7 +33,7 @@ class AuthServiceHandler:
     creating JWT tokens for access, and verifying authentication based on tokens.
 
     Attributes:
-        _pwd_context (CryptContext): The password hashing context using bcrypt.
+        _pwd_context (CryptContext): The password hashing context using bcrypt, with `BCRYPT_ROUNDS`.
         _invalid_credentials (HTTPException): The exception raised when credentials are incorrect.
     """
     def __init__(self):
@@ -29,7 +43,7 @@ class AuthServiceHandler:
         Sets up the CryptContext for password hashing and initializes the 
         invalid credentials exception.
         """
-        self._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._pwd_context = pwd_context
         self._invalid_credentials = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -48,7 +62,40 @@ class AuthServiceHandler:
             bool: True if the password matches, False otherwise.
         """
         return self._pwd_context.verify(plain_password, hashed_password)
-    
+
+    def verify_and_update_password(self, plain_password, hashed_password):
+        """
+        Verifies a password and, if it matches, rehashes it when its cost is not `BCRYPT_ROUNDS`.
+
+        Stored hashes follow a change of `BCRYPT_ROUNDS` as users log in,
+        without resetting any password.
+
+        Args:
+            plain_password (str): The plain password entered by the user.
+            hashed_password (str): The hashed password stored in the database.
+
+        Returns:
+            tuple: Whether the password matches, and the new hash to store or None.
+        """
+        return self._pwd_context.verify_and_update(plain_password, hashed_password)
+
+    async def verify_and_update_password_async(self, plain_password, hashed_password):
+        """
+        Async counterpart of `verify_and_update_password`, run on `password_pool`
+        without holding a thread or the event loop.
+
+        Args:
+            plain_password (str): The plain password entered by the user.
+            hashed_password (str): The hashed password stored in the database.
+
+        Returns:
+            tuple: Whether the password matches, and the new hash to store or None.
+
+        Raises:
+            HTTPException: If the pool is saturated.
+        """
+        return await password_pool.run_async(verify_and_update_password, plain_password, hashed_password)
+
     def get_password_hash(self, password):
         """
         Hashes a plain password for storage.
@@ -60,6 +107,24 @@ class AuthServiceHandler:
             str: The hashed password.
         """
         return self._pwd_context.hash(password)
+
+    def get_password_hash_pooled(self, password):
+        """
+        Hashes a password on `password_pool`, for the sync endpoints.
+
+        The calling thread waits for the result, but the hash runs in another
+        process, outside of the GIL.
+
+        Args:
+            password (str): The plain password to be hashed.
+
+        Returns:
+            str: The hashed password.
+
+        Raises:
+            HTTPException: If the pool is saturated.
+        """
+        return password_pool.run(hash_password, password)
     
     def is_authenticated(self, token: str = Depends(oauth2_scheme)):
         """
@@ -101,3 +166,127 @@ class AuthServiceHandler:
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY)
         return encoded_jwt
+
+    def create_token_pair(self, user: UserModel):
+        """
+        Creates a self-contained access token and the refresh token to renew it.
+
+        The access token carries the user id, role and active flag, so it is
+        authorized without loading the user, and expires after
+        `CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES`. The refresh token only identifies
+        the user; the claims are read again from the database on renewal.
+
+        Args:
+            user (UserModel): The user the tokens are issued to.
+
+        Returns:
+            dict: The access token, the refresh token and the token type.
+        """
+        claims = {"sub": user.email, "uid": user.id, "iat": time.time()}
+        access_token = self.create_access_token(
+            data={
+                **claims,
+                "type": ACCESS_TOKEN_TYPE,
+                "jti": uuid4().hex,
+                "role": RoleEnumInDB(user.role).value,
+                "active": user.active,
+            },
+            expires_delta=timedelta(minutes=CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+        refresh_token = self.create_access_token(
+            data={**claims, "type": REFRESH_TOKEN_TYPE, "jti": uuid4().hex},
+            expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+class TokenRevocationHandler:
+    """
+    Handles the revocation list of the self-contained tokens, kept in Redis.
+
+    A revoked token is a key named after its `jti` that expires with the
+    token, so the list only holds tokens that would otherwise still be valid.
+    Revoking a user stores the time of the revocation, and the tokens of the
+    user issued before it are rejected until the last of them expires. A
+    check is a single `MGET`.
+
+    Attributes:
+        redis (Redis): The Redis client holding the revocation list, async for `is_revoked_async`.
+    """
+
+    def __init__(self, redis_client: Redis):
+        """
+        Initializes the revocation handler.
+
+        Args:
+            redis_client (Redis): The Redis client holding the revocation list.
+        """
+        self.redis = redis_client
+
+    def revoke(self, claims: dict):
+        """
+        Revokes a token until it expires.
+
+        The key is only set if the token is not revoked yet (`SET NX`), so of
+        concurrent revocations of the same token exactly one succeeds; `refresh`
+        relies on it to consume a refresh token once.
+
+        Args:
+            claims (dict): The verified claims of the token.
+
+        Returns:
+            bool: True if this call revoked the token, False if it was already revoked or expired.
+        """
+        remaining = int(claims["exp"] - time.time()) + 1
+        if remaining <= 0:
+            return False
+        return bool(self.redis.set(self._token_key(claims["jti"]), 1, nx=True, ex=remaining))
+
+    def revoke_user(self, user_id: int):
+        """
+        Revokes every token issued to a user so far, e.g. when its role changes.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        self.redis.set(self._user_key(user_id), time.time(), ex=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60 + 1)
+
+    def is_revoked(self, claims: dict):
+        """
+        Checks whether a token was revoked.
+
+        Args:
+            claims (dict): The verified claims of the token.
+
+        Returns:
+            bool: True if the token or every token of its user issued before it was revoked.
+        """
+        return self._is_revoked(claims, self.redis.mget(self._keys(claims)))
+
+    async def is_revoked_async(self, claims: dict):
+        """
+        Async counterpart of `is_revoked`, on an async Redis client.
+
+        Args:
+            claims (dict): The verified claims of the token.
+
+        Returns:
+            bool: True if the token or every token of its user issued before it was revoked.
+        """
+        return self._is_revoked(claims, await self.redis.mget(self._keys(claims)))
+
+    def _keys(self, claims: dict):
+        return [self._token_key(claims["jti"]), self._user_key(claims["uid"])]
+
+    @staticmethod
+    def _is_revoked(claims: dict, values: list):
+        token_revoked, user_revoked_at = values
+        return token_revoked is not None or (user_revoked_at is not None and claims["iat"] <= float(user_revoked_at))
+
+    @staticmethod
+    def _token_key(jti: str):
+        return f"auth:revoked:{jti}"
+
+    @staticmethod
+    def _user_key(user_id: int):
+        return f"auth:revoked-before:{user_id}"
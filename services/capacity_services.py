@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from utils.constants import CAPACITY_STREAM_HEARTBEAT_SECONDS, REDIS_URL
+
+capacity_logger = logging.getLogger("capacity")
+
+# Delay before reconnecting the pub/sub connection after a Redis error, doubled on
+# each failed attempt up to the maximum
+RECONNECT_INITIAL_DELAY_SECONDS = 0.5
+RECONNECT_MAX_DELAY_SECONDS = 30.0
+
+
+def capacity_channel(event_id: int):
+    """
+    Builds the Redis pub/sub channel used for the remaining capacity of an event.
+
+    Args:
+        event_id (int): The ID of the event.
+
+    Returns:
+        str: The channel name.
+    """
+    return f"event:capacity:{event_id}"
+
+
+def publish_remaining_capacity(redis_client: Redis, event_id: int, remaining: int):
+    """
+    Publishes the remaining capacity of an event to every connected watcher.
+
+    Callers publish after committing, so a Redis error is logged instead of
+    raised: watchers miss one update, but the committed change is not reported
+    as failed.
+
+    Args:
+        redis_client (Redis): The Redis client used to publish.
+        event_id (int): The ID of the event whose capacity changed.
+        remaining (int): The number of seats left.
+    """
+    payload = json.dumps({"event_id": event_id, "remaining": remaining})
+    try:
+        redis_client.publish(capacity_channel(event_id), payload)
+    except RedisError:
+        capacity_logger.warning("Could not publish the capacity of event %s", event_id, exc_info=True)
+
+
+def _format_event(data: str):
+    return f"event: capacity\ndata: {data}\n\n"
+
+
+class CapacityBroadcaster:
+    """
+    Fans out remaining capacity updates from Redis to Server-Sent Events clients.
+
+    Each worker process holds a single Redis pub/sub connection and subscribes to
+    an event's channel once, no matter how many clients watch that event. Every
+    client gets a queue that only keeps the latest value, so slow clients skip
+    intermediate updates instead of buffering them.
+
+    Attributes:
+        redis_url (str): The URL of the Redis server to subscribe to.
+    """
+
+    def __init__(self, redis_url: str):
+        """
+        Initializes the broadcaster. Connections are opened on first subscription.
+
+        Args:
+            redis_url (str): The URL of the Redis server to subscribe to.
+        """
+        self.redis_url = redis_url
+        self._pubsub = None
+        self._listener = None
+        self._lock = None
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+
+    async def subscribe(self, event_id: int):
+        """
+        Registers a new watcher for an event.
+
+        Args:
+            event_id (int): The ID of the event to watch.
+
+        Returns:
+            asyncio.Queue: The queue that receives the capacity updates.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        channel = capacity_channel(event_id)
+        queue = asyncio.Queue(maxsize=1)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = AsyncRedis.from_url(self.redis_url, decode_responses=True).pubsub()
+
+            if channel not in self._queues:
+                self._queues[channel] = set()
+                await self._pubsub.subscribe(channel)
+            self._queues[channel].add(queue)
+
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+
+        return queue
+
+    def unsubscribe(self, event_id: int, queue: asyncio.Queue):
+        """
+        Removes a watcher. The channel is released once its last watcher leaves.
+
+        This method does not await, so it is safe to call while the client's
+        request is being cancelled.
+
+        Args:
+            event_id (int): The ID of the watched event.
+            queue (asyncio.Queue): The queue returned by `subscribe`.
+        """
+        channel = capacity_channel(event_id)
+        queues = self._queues.get(channel)
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            asyncio.get_running_loop().create_task(self._release(channel))
+
+    async def _release(self, channel: str):
+        async with self._lock:
+            if not self._queues.get(channel):
+                self._queues.pop(channel, None)
+                await self._pubsub.unsubscribe(channel)
+
+    async def _listen(self):
+        delay = RECONNECT_INITIAL_DELAY_SECONDS
+        reconnect = False
+        while True:
+            try:
+                if reconnect:
+                    await self._reconnect()
+                    reconnect = False
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except RedisError:
+                capacity_logger.warning(
+                    "Capacity updates interrupted, reconnecting in %.1f s", delay, exc_info=True
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+                reconnect = True
+                continue
+
+            delay = RECONNECT_INITIAL_DELAY_SECONDS
+            if message is None:
+                continue
+
+            for queue in self._queues.get(message["channel"], ()):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message["data"])
+
+    async def _reconnect(self):
+        """
+        Replaces the pub/sub connection and subscribes again to every watched channel.
+
+        Raises:
+            RedisError: If Redis is still unreachable.
+        """
+        async with self._lock:
+            previous = self._pubsub
+            self._pubsub = AsyncRedis.from_url(self.redis_url, decode_responses=True).pubsub()
+            try:
+                await previous.aclose()
+            except RedisError:
+                pass
+
+            if self._queues:
+                await self._pubsub.subscribe(*self._queues)
+
+    async def stream(self, event_id: int, remaining: int):
+        """
+        Produces the Server-Sent Events stream of an event's remaining capacity.
+
+        The stream starts with the current value and then sends every update, with
+        a comment line as heartbeat when the event is quiet.
+
+        Args:
+            event_id (int): The ID of the event to watch.
+            remaining (int): The remaining capacity when the client connected.
+
+        Yields:
+            str: Server-Sent Events frames.
+        """
+        queue = await self.subscribe(event_id)
+        try:
+            yield _format_event(json.dumps({"event_id": event_id, "remaining": remaining}))
+            while True:
+                try:
+                    data = await asyncio.wait_for(
+                        queue.get(), timeout=CAPACITY_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield _format_event(data)
+        finally:
+            self.unsubscribe(event_id, queue)
+
+
+# Shared broadcaster for the current worker process
+capacity_broadcaster = CapacityBroadcaster(REDIS_URL)
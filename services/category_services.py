@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models.category import CategoryModel
 from schemas.category import CategoryCreate
@@ -47,3 +49,31 @@ class CategoryServiceHandler:
         self.db.commit()
         self.db.refresh(db_category)
         return db_category
+
+
+class AsyncCategoryServiceHandler:
+    """
+    A handler for the read-only category services on an async database session.
+
+    Attributes:
+        db (AsyncSession): The SQLAlchemy async session used for database operations.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initializes the AsyncCategoryServiceHandler with the given async database session.
+
+        Args:
+            db (AsyncSession): The SQLAlchemy async session used to interact with the database.
+        """
+        self.db = db
+
+    async def list_categories(self):
+        """
+        Retrieves a list of all categories from the database.
+
+        Returns:
+            list: A list of CategoryModel instances representing all categories.
+        """
+        categories = await self.db.scalars(select(CategoryModel).order_by(CategoryModel.id))
+        return categories.all()
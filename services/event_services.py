@@ -1,15 +1,47 @@
-from datetime import datetime
-from typing import Optional
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from fastapi import HTTPException, status
 from models.category import CategoryModel
-from models.event import EventModel, EventTicketModel, SessionModel
+from models.event import (
+    EventModel,
+    EventTicketModel,
+    SessionModel,
+    SessionRegistrationModel,
+    TicketHoldModel,
+)
 from models.location import CityModel
 from models.user import UserModel
 from schemas.event import EventCreate, EventUpdate, SessionCreate
+from utils.constants import TICKET_HOLD_MINUTES
+from utils.pagination import KeysetPage
 
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 
+def _one_per_user_flag(event_id: int):
+    """
+    Reads the `one_ticket_per_user` flag of an event inside another statement.
+
+    Tickets copy it into `EventTicketModel.one_per_user` from a subquery of their
+    own `INSERT`, so issuing a ticket takes no extra round trip.
+
+    Args:
+        event_id (int): The ID of the event.
+
+    Returns:
+        ScalarSelect: The flag of the event, as a scalar subquery.
+    """
+    return (
+        select(EventModel.one_ticket_per_user)
+        .where(EventModel.id == event_id)
+        .scalar_subquery()
+    )
+
+
 class EventServiceHandler:
     """
     Handles all event-related operations, including event management and session management.
@@ -19,6 +51,15 @@ class EventServiceHandler:
         _event_not_found (HTTPException): Exception raised when an event is not found.
         _session_not_found (HTTPException): Exception raised when a session is not found.
         _forbidden_by_no_owner (HTTPException): Exception raised when the user is not the owner of the event.
+        _event_sold_out (HTTPException): Exception raised when the event has no capacity left.
+        _ticket_already_issued (HTTPException): Exception raised when the user already holds a ticket.
+        _hold_already_exists (HTTPException): Exception raised when the user already holds a seat.
+        _hold_not_found (HTTPException): Exception raised when a hold is not found or has expired.
+        _ticket_not_found (HTTPException): Exception raised when the user holds no ticket for the event.
+        _capacity_below_sold (HTTPException): Exception raised when the capacity is set below the tickets sold.
+        _session_full (HTTPException): Exception raised when a session has no seats left.
+        _session_already_registered (HTTPException): Exception raised when the user is already registered.
+        _registration_not_found (HTTPException): Exception raised when the user is not registered for a session.
     """
     
     def __init__(self, db: Session):
@@ -41,6 +82,42 @@ class EventServiceHandler:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not owner of this event"
         )
+        self._event_sold_out = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event sold out"
+        )
+        self._ticket_already_issued = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ticket already issued for this event"
+        )
+        self._hold_already_exists = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You already hold a seat for this event"
+        )
+        self._hold_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found or expired"
+        )
+        self._ticket_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+        self._capacity_below_sold = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Capacity cannot be lower than the tickets already sold"
+        )
+        self._session_full = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more sessions are full"
+        )
+        self._session_already_registered = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Already registered for one or more sessions"
+        )
+        self._registration_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registration not found"
+        )
 
     def list_events(self):
         """
@@ -49,7 +126,11 @@ class EventServiceHandler:
         Returns:
             list: A list of all events from the database.
         """
-        return self.db.query(EventModel).all()
+        return (
+            self.db.query(EventModel)
+            .options(joinedload(EventModel.location).joinedload(CityModel.country))
+            .all()
+        )
 
     def create_event(self, event: EventCreate):
         """
@@ -63,9 +144,27 @@ class EventServiceHandler:
         """
         event = EventModel(**event.model_dump())
         self.db.add(event)
+        self.db.flush()
+        event_id = event.id
         self.db.commit()
-        self.db.refresh(event)
-        return event
+        return self._load_event(event_id)
+
+    def _load_event(self, event_id: int):
+        """
+        Reloads an event with the relationships serialized by `EventResponse`.
+
+        Relationships are declared with `lazy="raise"`, so the location and its
+        country have to be loaded with the event instead of one query each.
+
+        Args:
+            event_id (int): The ID of the event to load.
+
+        Returns:
+            EventModel: The event, with its location and country loaded.
+        """
+        return self.db.scalars(
+            select_event_with_location(event_id).execution_options(populate_existing=True)
+        ).first()
     
     def get_event_by_id(self, event_id: int):
         """
@@ -99,7 +198,8 @@ class EventServiceHandler:
             EventModel: The updated event.
 
         Raises:
-            HTTPException: If the event is not found or if the current user is not the owner.
+            HTTPException: If the event is not found, if the current user is not the owner,
+                or if the new capacity is lower than the tickets already sold.
         """
         db_event = self.db.query(EventModel).filter(EventModel.id == event_id).first()
         if not db_event:
@@ -108,14 +208,29 @@ class EventServiceHandler:
         if db_event.owner_id != current_user.id:
             raise self._forbidden_by_no_owner
         
-        event = event.model_dump()
+        event = event.model_dump(exclude_unset=True)
+
+        if "capacity" in event:
+            # Conditional update, so concurrent purchases can never end up above the new capacity
+            updated = self.db.execute(
+                update(EventModel)
+                .where(
+                    EventModel.id == event_id,
+                    EventModel.tickets_sold <= event["capacity"],
+                )
+                .values(capacity=event.pop("capacity"))
+                .returning(EventModel.id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if updated is None:
+                self.db.rollback()
+                raise self._capacity_below_sold
         
         for key, value in event.items():
             setattr(db_event, key, value)
         
         self.db.commit()
-        self.db.refresh(db_event)
-        return db_event
+        return self._load_event(event_id)
 
     def delete_event(self, event_id: int, current_user: UserModel):
         """
@@ -131,7 +246,7 @@ class EventServiceHandler:
         Raises:
             HTTPException: If the event is not found or if the current user is not the owner.
         """
-        db_event = self.db.query(EventModel).filter(EventModel.id == event_id).first()
+        db_event = self.db.scalars(select_event_with_location(event_id)).first()
         if not db_event:
             raise self._event_not_found
         
@@ -142,6 +257,128 @@ class EventServiceHandler:
         self.db.commit()
         return db_event
     
+    def reserve_seats(self, event_id: int, quantity: int = 1):
+        """
+        Atomically reserves seats of an event against its capacity.
+
+        The reservation is a single conditional `UPDATE ... RETURNING` on the
+        `tickets_sold` counter, so its cost does not depend on how many tickets
+        were already sold and concurrent callers can never oversell the event.
+        The change is not committed; it belongs to the caller's transaction.
+
+        Args:
+            event_id (int): The ID of the event to reserve seats for.
+            quantity (int): The number of seats to reserve. Defaults to 1.
+
+        Returns:
+            Optional[int]: The seats left after the reservation, or None if the event
+                is sold out or does not exist.
+        """
+        stmt = (
+            update(EventModel)
+            .where(
+                EventModel.id == event_id,
+                EventModel.tickets_sold + quantity <= EventModel.capacity,
+            )
+            .values(tickets_sold=EventModel.tickets_sold + quantity)
+            .returning(EventModel.capacity - EventModel.tickets_sold)
+        )
+        row = self.db.execute(stmt).first()
+        return row[0] if row else None
+
+    def reserve_available_seats(self, event_id: int, quantity: int):
+        """
+        Reserves as many of the requested seats as the event still has available.
+
+        The event row is locked for the duration of the caller's transaction, so
+        concurrent batches for the same event are serialized and never oversell.
+        The counter update is also conditional on the capacity, so databases that
+        ignore row locks (such as SQLite) retry with a fresh count instead of
+        overselling. The change is not committed; it belongs to the caller's transaction.
+
+        Args:
+            event_id (int): The ID of the event to reserve seats for.
+            quantity (int): The number of seats requested.
+
+        Returns:
+            tuple: The number of seats actually reserved (0 if sold out or not found)
+                and the number of seats left afterwards.
+        """
+        while True:
+            available = self.db.execute(
+                select(EventModel.capacity - EventModel.tickets_sold)
+                .where(EventModel.id == event_id)
+                .with_for_update()
+            ).scalar()
+            if not available or available <= 0:
+                return 0, 0
+
+            granted = min(quantity, available)
+            remaining = self.db.execute(
+                update(EventModel)
+                .where(
+                    EventModel.id == event_id,
+                    EventModel.tickets_sold + granted <= EventModel.capacity,
+                )
+                .values(tickets_sold=EventModel.tickets_sold + granted)
+                .returning(EventModel.capacity - EventModel.tickets_sold)
+            ).scalar()
+            if remaining is not None:
+                return granted, remaining
+
+    def issue_tickets(self, event_id: int, user_ids: list[int]):
+        """
+        Issues tickets for several users of an event in a single transaction.
+
+        Every entry of `user_ids` is a request for one ticket. On events with
+        `one_ticket_per_user`, users who already hold a ticket are skipped and
+        repeated users only count once. Seats are granted in the order of
+        `user_ids` until the event is full, and all granted tickets are written
+        with one multi-row `INSERT`.
+
+        Args:
+            event_id (int): The ID of the event to issue tickets for.
+            user_ids (list[int]): The IDs of the users requesting a ticket, in arrival order.
+
+        Returns:
+            tuple: The IDs of the users who were granted a ticket, once per ticket; the
+                IDs of the users who cannot get another ticket of a one-ticket-per-user
+                event, because they already held one or were just granted it; and the
+                number of seats left afterwards.
+        """
+        one_per_user = self.db.execute(
+            select(EventModel.one_ticket_per_user).where(EventModel.id == event_id)
+        ).scalar()
+        already_issued = set()
+        candidates = list(user_ids)
+        if one_per_user:
+            already_issued = set(
+                self.db.execute(
+                    select(EventTicketModel.user_id).where(
+                        EventTicketModel.event_id == event_id,
+                        EventTicketModel.user_id.in_(user_ids),
+                    )
+                ).scalars()
+            )
+            candidates = [
+                user_id for user_id in dict.fromkeys(user_ids) if user_id not in already_issued
+            ]
+
+        granted, remaining = self.reserve_available_seats(event_id, len(candidates))
+        winners = candidates[:granted]
+        if winners:
+            self.db.execute(
+                insert(EventTicketModel),
+                [
+                    {"event_id": event_id, "user_id": user_id, "one_per_user": one_per_user}
+                    for user_id in winners
+                ],
+            )
+        self.db.commit()
+        if one_per_user:
+            already_issued.update(winners)
+        return winners, already_issued, remaining
+
     def create_ticket(self, event_id: int, current_user: UserModel):
         """
         Creates a ticket for an event for a given user.
@@ -152,16 +389,271 @@ class EventServiceHandler:
 
         Returns:
             EventTicketModel: The created event ticket.
+
+        Raises:
+            HTTPException: If the event is sold out or the user already holds a ticket
+                of a one-ticket-per-user event.
+        """
+        if self.reserve_seats(event_id) is None:
+            self.db.rollback()
+            raise self._event_sold_out
+
+        event_ticket = self.new_ticket(event_id, current_user.id)
+        self.db.add(event_ticket)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Rolling back also gives the reserved seat back
+            self.db.rollback()
+            raise self._ticket_already_issued
+
+        self.db.refresh(event_ticket)
+        return event_ticket
+
+    @staticmethod
+    def new_ticket(event_id: int, user_id: int):
+        """
+        Builds a ticket that copies the `one_ticket_per_user` flag of its event.
+
+        Args:
+            event_id (int): The ID of the event.
+            user_id (int): The ID of the user who will receive the ticket.
+
+        Returns:
+            EventTicketModel: The ticket, to be added to the session.
+        """
+        return EventTicketModel(
+            event_id=event_id, user_id=user_id, one_per_user=_one_per_user_flag(event_id)
+        )
+    
+    def cancel_ticket(self, event_id: int, current_user: UserModel, successor_id: Optional[int] = None):
+        """
+        Cancels a ticket of a user and gives its seat back to the event.
+
+        Users holding several tickets of the event cancel the oldest one.
+
+        When a successor is given, the seat is handed to them in the same
+        transaction instead, so it is never free for a new request to take.
+
+        Args:
+            event_id (int): The ID of the event the ticket belongs to.
+            current_user (UserModel): The user who owns the ticket.
+            successor_id (Optional[int]): The ID of the user who receives the seat,
+                usually the head of the event waitlist. Defaults to None.
+
+        Returns:
+            int: The number of seats left afterwards.
+
+        Raises:
+            HTTPException: If the user holds no ticket for the event.
+            IntegrityError: If the successor already holds a ticket of a one-ticket-per-user event.
         """
-        event_ticket = EventTicketModel(
+        deleted = self.db.execute(
+            delete(EventTicketModel)
+            .where(
+                EventTicketModel.id == select(func.min(EventTicketModel.id))
+                .where(
+                    EventTicketModel.event_id == event_id,
+                    EventTicketModel.user_id == current_user.id,
+                )
+                .scalar_subquery()
+            )
+            .returning(EventTicketModel.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if deleted is None:
+            self.db.rollback()
+            raise self._ticket_not_found
+
+        if successor_id is None:
+            remaining = self.db.execute(
+                update(EventModel)
+                .where(EventModel.id == event_id)
+                .values(tickets_sold=EventModel.tickets_sold - 1)
+                .returning(EventModel.capacity - EventModel.tickets_sold)
+            ).scalar()
+            self.db.commit()
+            return remaining
+
+        try:
+            self.db.execute(
+                insert(EventTicketModel).values(
+                    event_id=event_id,
+                    user_id=successor_id,
+                    one_per_user=_one_per_user_flag(event_id),
+                )
+            )
+            remaining = self.db.execute(
+                select(EventModel.capacity - EventModel.tickets_sold).where(EventModel.id == event_id)
+            ).scalar()
+            self.db.commit()
+        except IntegrityError:
+            # Rolling back also restores the cancelled ticket
+            self.db.rollback()
+            raise
+        return remaining
+
+    def create_hold(self, event_id: int, current_user: UserModel):
+        """
+        Holds a seat of an event for a user during `TICKET_HOLD_MINUTES`.
+
+        The seat is taken from the capacity with the same atomic reservation used
+        for tickets, so holds never oversell and require no row locks.
+
+        Args:
+            event_id (int): The ID of the event to hold a seat for.
+            current_user (UserModel): The user who will hold the seat.
+
+        Returns:
+            tuple: The created hold and the number of seats left afterwards.
+
+        Raises:
+            HTTPException: If the event is sold out, or the user already holds a seat
+                for the event or a ticket of a one-ticket-per-user event.
+        """
+        has_ticket = self.db.execute(
+            select(EventTicketModel.id).where(
+                EventTicketModel.event_id == event_id,
+                EventTicketModel.user_id == current_user.id,
+                EventTicketModel.one_per_user,
+            )
+        ).first()
+        if has_ticket:
+            raise self._ticket_already_issued
+
+        remaining = self.reserve_seats(event_id)
+        if remaining is None:
+            self.db.rollback()
+            raise self._event_sold_out
+
+        db_hold = TicketHoldModel(
             event_id=event_id,
-            user_id=current_user.id
+            user_id=current_user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=TICKET_HOLD_MINUTES),
         )
+        self.db.add(db_hold)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise self._hold_already_exists
+
+        self.db.refresh(db_hold)
+        return db_hold, remaining
+
+    def confirm_hold(self, hold_id: int, current_user: UserModel):
+        """
+        Turns an unexpired hold into a ticket.
+
+        The seat was already counted when the hold was created, so the capacity
+        counter is left untouched.
+
+        Args:
+            hold_id (int): The ID of the hold to confirm.
+            current_user (UserModel): The user who owns the hold.
+
+        Returns:
+            EventTicketModel: The created event ticket.
+
+        Raises:
+            HTTPException: If the hold is not found, has expired, or the user already
+                holds a ticket of a one-ticket-per-user event.
+        """
+        event_id = self.db.execute(
+            delete(TicketHoldModel)
+            .where(
+                TicketHoldModel.id == hold_id,
+                TicketHoldModel.user_id == current_user.id,
+                TicketHoldModel.expires_at > datetime.now(timezone.utc),
+            )
+            .returning(TicketHoldModel.event_id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if event_id is None:
+            self.db.rollback()
+            raise self._hold_not_found
+
+        event_ticket = self.new_ticket(event_id, current_user.id)
         self.db.add(event_ticket)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise self._ticket_already_issued
+
         self.db.refresh(event_ticket)
         return event_ticket
-    
+
+    def release_hold(self, hold_id: int, current_user: UserModel):
+        """
+        Releases a hold and gives its seat back to the event.
+
+        Args:
+            hold_id (int): The ID of the hold to release.
+            current_user (UserModel): The user who owns the hold.
+
+        Returns:
+            tuple: The ID of the event and the number of seats left afterwards.
+
+        Raises:
+            HTTPException: If the hold is not found or has already expired.
+        """
+        event_id = self.db.execute(
+            delete(TicketHoldModel)
+            .where(
+                TicketHoldModel.id == hold_id,
+                TicketHoldModel.user_id == current_user.id,
+            )
+            .returning(TicketHoldModel.event_id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if event_id is None:
+            self.db.rollback()
+            raise self._hold_not_found
+
+        remaining = self.db.execute(
+            update(EventModel)
+            .where(EventModel.id == event_id)
+            .values(tickets_sold=EventModel.tickets_sold - 1)
+            .returning(EventModel.capacity - EventModel.tickets_sold)
+        ).scalar()
+        self.db.commit()
+        return event_id, remaining
+
+    def release_expired_holds(self):
+        """
+        Releases every expired hold in bulk.
+
+        Expired holds are removed with one set-based `DELETE ... RETURNING`, and their
+        seats are given back with one `UPDATE` over all affected events.
+
+        Returns:
+            dict: A mapping of event ID to the number of seats left afterwards.
+        """
+        released = Counter(
+            self.db.execute(
+                delete(TicketHoldModel)
+                .where(TicketHoldModel.expires_at <= datetime.now(timezone.utc))
+                .returning(TicketHoldModel.event_id)
+                .execution_options(synchronize_session=False)
+            ).scalars()
+        )
+        if not released:
+            self.db.rollback()
+            return {}
+
+        rows = self.db.execute(
+            update(EventModel)
+            .where(EventModel.id.in_(released))
+            .values(
+                tickets_sold=EventModel.tickets_sold - case(released, value=EventModel.id)
+            )
+            .returning(EventModel.id, EventModel.capacity - EventModel.tickets_sold)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        return dict(rows)
+
     def list_sessions_by_event(self, event_id: int):
         """
         Retrieves all sessions related to a specific event.
@@ -175,20 +667,24 @@ class EventServiceHandler:
         Raises:
             HTTPException: If the event is not found.
         """
-        db_event = self.db.query(EventModel).filter(EventModel.id == event_id).first()
-        if not db_event:
-            raise self._event_not_found
-        
-        return db_event.sessions
+        self.get_event_by_id(event_id)
+        return self.db.scalars(
+            select(SessionModel).where(SessionModel.event_id == event_id).order_by(SessionModel.id)
+        ).all()
     
-    def list_all_sessions(self):
+    def list_all_sessions(self, cursor: Optional[str] = None, limit: Optional[int] = None):
         """
-        Retrieves a list of all sessions.
+        Retrieves a page of all sessions, ordered by ID.
+
+        Args:
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every session.
 
         Returns:
-            list: A list of all sessions from the database.
+            tuple: The sessions of the page and the cursor of the next page.
         """
-        return self.db.query(SessionModel).all()
+        page = KeysetPage([SessionModel.id], cursor, limit)
+        return page.split(self.db.scalars(page.apply(select(SessionModel))).all())
     
     def create_session(self, event_id: int, session: SessionCreate, current_user: UserModel):
         """
@@ -298,6 +794,101 @@ class EventServiceHandler:
         self.db.commit()
         return db_session
 
+    def register_sessions(self, event_id: int, session_ids: List[int], current_user: UserModel):
+        """
+        Registers a user for several sessions of an event in a single transaction.
+
+        Seats are taken with one conditional `UPDATE ... WHERE id IN (...)` on the
+        `registrations_count` counters, and the registrations are stored with one
+        multi-row insert. Either every session is registered or none is.
+
+        Args:
+            event_id (int): The ID of the event the sessions belong to.
+            session_ids (List[int]): The IDs of the sessions to register for.
+            current_user (UserModel): The user to register.
+
+        Returns:
+            List[int]: The IDs of the sessions the user was registered for.
+
+        Raises:
+            HTTPException: If a session is not found in the event, is full, or the user
+                is already registered for it.
+        """
+        session_ids = list(dict.fromkeys(session_ids))
+        if not session_ids:
+            return []
+
+        reserved = self.db.execute(
+            update(SessionModel)
+            .where(
+                SessionModel.id.in_(session_ids),
+                SessionModel.event_id == event_id,
+                or_(
+                    SessionModel.capacity.is_(None),
+                    SessionModel.registrations_count < SessionModel.capacity,
+                ),
+            )
+            .values(registrations_count=SessionModel.registrations_count + 1)
+            .returning(SessionModel.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        if len(reserved) != len(session_ids):
+            self.db.rollback()
+            found = self.db.execute(
+                select(func.count(SessionModel.id)).where(
+                    SessionModel.id.in_(session_ids),
+                    SessionModel.event_id == event_id,
+                )
+            ).scalar()
+            if found != len(session_ids):
+                raise self._session_not_found
+            raise self._session_full
+
+        try:
+            self.db.execute(
+                insert(SessionRegistrationModel),
+                [{"session_id": session_id, "user_id": current_user.id} for session_id in session_ids],
+            )
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise self._session_already_registered
+
+        return session_ids
+
+    def unregister_session(self, session_id: int, current_user: UserModel):
+        """
+        Cancels the registration of a user for a session and frees its seat.
+
+        Args:
+            session_id (int): The ID of the session.
+            current_user (UserModel): The registered user.
+
+        Raises:
+            HTTPException: If the user is not registered for the session.
+        """
+        deleted = self.db.execute(
+            delete(SessionRegistrationModel)
+            .where(
+                SessionRegistrationModel.session_id == session_id,
+                SessionRegistrationModel.user_id == current_user.id,
+            )
+            .returning(SessionRegistrationModel.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if deleted is None:
+            self.db.rollback()
+            raise self._registration_not_found
+
+        self.db.execute(
+            update(SessionModel)
+            .where(SessionModel.id == session_id)
+            .values(registrations_count=SessionModel.registrations_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
     def filter_events(
         self,
         offset: int,
@@ -309,11 +900,13 @@ class EventServiceHandler:
         location_id: Optional[int] = None,
         category_id: Optional[int] = None,
     ):
-        query = self.db.query(EventModel)
+        query = self.db.query(EventModel).options(
+            joinedload(EventModel.location).joinedload(CityModel.country)
+        )
         
         # Agregar filtros dinámicos
         if name:
-            query = query.filter(EventModel.name.ilike(f"%{name}%"))
+            query = query.filter(contains(EventModel.name, name))
         if min_date:
             query = query.filter(EventModel.date >= min_date)
         if max_date:
@@ -332,25 +925,225 @@ class EventServiceHandler:
         self,
         location_name: Optional[str] = None,
         category_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        **filters
+    ):
+        page = KeysetPage(EVENT_SORT_KEY, cursor, limit, offset)
+        query = select_events_with_related_names(
+            location_name=location_name, category_name=category_name, **filters
+        )
+        return page.split(self.db.scalars(page.apply(query)).all())
+
+
+# Unique sort key of the event listings; the date indexes serve its ordering
+EVENT_SORT_KEY = (EventModel.date, EventModel.id)
+
+
+def select_event_with_location(event_id: int):
+    """
+    Builds the query of an event with its location and country loaded.
+
+    Args:
+        event_id (int): The ID of the event.
+
+    Returns:
+        Select: The query of the event.
+    """
+    return (
+        select(EventModel)
+        .where(EventModel.id == event_id)
+        .options(joinedload(EventModel.location).joinedload(CityModel.country))
+    )
+
+
+def contains(column, term: str):
+    """
+    Builds a case-insensitive substring filter, served by the trigram index of the column.
+
+    The LIKE wildcards of the term are escaped, so `%` or `_` typed by a user
+    match themselves instead of turning the filter into a full scan pattern.
+
+    Args:
+        column (Column): The text column to filter.
+        term (str): The substring to look for.
+
+    Returns:
+        BinaryExpression: The `ILIKE '%term%'` condition.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def select_events_with_related_names(
+    name: Optional[str] = None,
+    location_name: Optional[str] = None,
+    category_name: Optional[str] = None,
+    **filters
+):
+    """
+    Builds the filtered event listing shared by the sync and async handlers.
+
+    The location (with its country) and the category are joined in the same
+    query, so the events can be serialized without further lazy loads.
+
+    The name filters are substring matches; on Postgres they are served by the
+    pg_trgm GIN indexes of migration `031f660c78ba`.
+
+    The query is not ordered nor paginated; callers page it through `KeysetPage`
+    on `EVENT_SORT_KEY`.
+
+    Args:
+        name (Optional[str]): Filter by a part of the event name.
+        location_name (Optional[str]): Filter by a part of the city name.
+        category_name (Optional[str]): Filter by a part of the category name.
+        **filters: A `min_date`/`max_date` range and equality filters on `EventModel` columns.
+
+    Returns:
+        Select: The query of the events.
+    """
+    query = select(EventModel).join(EventModel.location).join(EventModel.category)
+
+    if name:
+        query = query.where(contains(EventModel.name, name))
+
+    # Filtros relacionados
+    if location_name:
+        query = query.where(contains(CityModel.name, location_name))
+    if category_name:
+        query = query.where(contains(CategoryModel.name, category_name))
+
+    # Rango de fechas, servido por los índices compuestos (status|category_id|location_id, date)
+    min_date = filters.pop("min_date", None)
+    max_date = filters.pop("max_date", None)
+    if min_date:
+        query = query.where(EventModel.date >= min_date)
+    if max_date:
+        query = query.where(EventModel.date <= max_date)
+
+    # Filtros adicionales (usando los filtros dinámicos mencionados antes)
+    for field, value in filters.items():
+        if value is not None:
+            query = query.where(getattr(EventModel, field) == value)
+
+    return query.options(
+        joinedload(EventModel.location).joinedload(CityModel.country),
+        joinedload(EventModel.category)
+    )
+
+
+class AsyncEventServiceHandler:
+    """
+    Handles the read-only event operations on an async database session.
+
+    It backs the hot read endpoints, which run on the event loop instead of the
+    thread pool. Writes stay on `EventServiceHandler`, which is also used by the
+    Celery worker. Async sessions cannot lazy load, so every relationship that is
+    serialized is loaded in the same query.
+
+    Attributes:
+        db (AsyncSession): The async database session used to interact with the database.
+        _event_not_found (HTTPException): Exception raised when an event is not found.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initializes the service handler with an async database session.
+
+        Args:
+            db (AsyncSession): The async database session used to interact with the database.
+        """
+        self.db = db
+        self._event_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    async def get_event_by_id(self, event_id: int):
+        """
+        Retrieves an event by its ID, with its location loaded.
+
+        Args:
+            event_id (int): The ID of the event to retrieve.
+
+        Returns:
+            EventModel: The event with the specified ID.
+
+        Raises:
+            HTTPException: If the event is not found.
+        """
+        db_event = await self.db.scalar(select_event_with_location(event_id))
+        if not db_event:
+            raise self._event_not_found
+
+        return db_event
+
+    async def list_sessions_by_event(self, event_id: int):
+        """
+        Retrieves all sessions related to a specific event.
+
+        Args:
+            event_id (int): The ID of the event to retrieve sessions for.
+
+        Returns:
+            list: A list of sessions associated with the event.
+
+        Raises:
+            HTTPException: If the event is not found.
+        """
+        event_exists = await self.db.scalar(select(EventModel.id).where(EventModel.id == event_id))
+        if not event_exists:
+            raise self._event_not_found
+
+        sessions = await self.db.scalars(
+            select(SessionModel).where(SessionModel.event_id == event_id).order_by(SessionModel.id)
+        )
+        return sessions.all()
+
+    async def filter_events_with_related_names(
+        self,
+        location_name: Optional[str] = None,
+        category_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
         **filters
     ):
-        query = self.db.query(EventModel).join(EventModel.location).join(EventModel.category)
-
-        # Filtros relacionados
-        if location_name:
-            query = query.filter(CityModel.name.ilike(f"%{location_name}%"))
-        if category_name:
-            query = query.filter(CategoryModel.name.ilike(f"%{category_name}%"))
-
-        # Filtros adicionales (usando los filtros dinámicos mencionados antes)
-        for field, value in filters.items():
-            if field == "offset" or field == "limit":
-                continue
-            
-            if value is not None:
-                query = query.filter(getattr(EventModel, field) == value)
-
-        return query.options(
-            joinedload(EventModel.location),
-            joinedload(EventModel.category)
-        ).offset(filters["offset"]).limit(filters["limit"]).all()
+        """
+        Retrieves a page of events matching the given filters, ordered by date and ID.
+
+        Args:
+            location_name (Optional[str]): Filter by a part of the city name.
+            category_name (Optional[str]): Filter by a part of the category name.
+            offset (int): Number of events to skip. Prefer `cursor`, whose cost does not grow
+                with the page; the two cannot be combined.
+            limit (int): Maximum number of events to retrieve.
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            **filters: A `min_date`/`max_date` range and equality filters on `EventModel` columns.
+
+        Returns:
+            tuple: The events of the page, with their location and category loaded,
+                and the cursor of the next page.
+        """
+        page = KeysetPage(EVENT_SORT_KEY, cursor, limit, offset)
+        query = select_events_with_related_names(
+            location_name=location_name, category_name=category_name, **filters
+        )
+        events = await self.db.scalars(page.apply(query))
+        return page.split(events.all())
+
+    async def list_all_sessions(self, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """
+        Retrieves a page of all sessions, ordered by ID.
+
+        Args:
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every session.
+
+        Returns:
+            tuple: The sessions of the page and the cursor of the next page.
+        """
+        page = KeysetPage([SessionModel.id], cursor, limit)
+        sessions = await self.db.scalars(page.apply(select(SessionModel)))
+        return page.split(sessions.all())
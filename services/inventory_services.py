@@ -0,0 +1,205 @@
+from fastapi import HTTPException, status
+from redis import Redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.event import EventModel
+from services.event_services import EventServiceHandler
+
+
+# Decrements the remaining seats and counts the reservation as pending persistence.
+# Returns -1 when the inventory is not loaded, 0 when sold out and 1 when reserved.
+RESERVE_SCRIPT = """
+local remaining = redis.call('GET', KEYS[1])
+if not remaining then
+    return -1
+end
+if tonumber(remaining) <= 0 then
+    return 0
+end
+redis.call('DECR', KEYS[1])
+redis.call('INCR', KEYS[2])
+return 1
+"""
+
+# Gives a reserved seat back when its persistence failed.
+RELEASE_SCRIPT = """
+redis.call('DECR', KEYS[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('INCR', KEYS[1])
+end
+return 1
+"""
+
+# Marks a reservation as persisted and counts it, so `reconcile` can tell whether
+# tickets were persisted while it was reading the database.
+CONFIRM_SCRIPT = """
+redis.call('DECR', KEYS[2])
+redis.call('INCR', KEYS[3])
+return 1
+"""
+
+# Sets the remaining seats from the seats left in the database minus reservations
+# still in flight. ARGV[2] is the confirmed count read before the database: if a
+# reservation was confirmed since, it is in neither count and the remaining seats
+# may only be lowered.
+RECONCILE_SCRIPT = """
+local pending = tonumber(redis.call('GET', KEYS[2]) or '0')
+local remaining = tonumber(ARGV[1]) - pending
+if remaining < 0 then
+    remaining = 0
+end
+local previous = redis.call('GET', KEYS[1])
+local confirmed = redis.call('GET', KEYS[3]) or '0'
+if previous and confirmed ~= ARGV[2] and remaining > tonumber(previous) then
+    remaining = tonumber(previous)
+end
+redis.call('SET', KEYS[1], remaining)
+return {remaining, previous or false}
+"""
+
+
+class TicketInventoryHandler:
+    """
+    Handles the in-memory ticket inventory kept in Redis.
+
+    Each event has a counter of remaining seats that is decremented atomically by a
+    Lua script, so the sold-out decision is taken without touching Postgres. Ticket
+    rows are persisted asynchronously, and `reconcile` periodically realigns the
+    counters with the `tickets_sold` counters of the events.
+
+    Attributes:
+        redis (Redis): The Redis client holding the inventory counters.
+        db (Session): The database session used to load and reconcile the inventory.
+        _event_sold_out (HTTPException): Exception raised when the event has no seats left.
+    """
+
+    EVENTS_KEY = "ticket:inventory:events"
+
+    def __init__(self, redis_client: Redis, db: Session):
+        """
+        Initializes the inventory handler.
+
+        Args:
+            redis_client (Redis): The Redis client holding the inventory counters.
+            db (Session): The database session used to load and reconcile the inventory.
+        """
+        self.redis = redis_client
+        self.db = db
+        self._reserve = self.redis.register_script(RESERVE_SCRIPT)
+        self._release = self.redis.register_script(RELEASE_SCRIPT)
+        self._confirm = self.redis.register_script(CONFIRM_SCRIPT)
+        self._reconcile = self.redis.register_script(RECONCILE_SCRIPT)
+        self._event_sold_out = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event sold out"
+        )
+
+    @staticmethod
+    def _keys(event_id: int):
+        return [
+            f"ticket:inventory:{event_id}",
+            f"ticket:inventory:pending:{event_id}",
+            f"ticket:inventory:confirmed:{event_id}",
+        ]
+
+    def load(self, event_id: int):
+        """
+        Loads the remaining seats of an event from the database into Redis.
+
+        The counter is only written if it does not exist yet, so concurrent loads
+        cannot reset a counter that is already in use.
+
+        Args:
+            event_id (int): The ID of the event to load.
+
+        Raises:
+            HTTPException: If the event is not found.
+        """
+        db_event = EventServiceHandler(self.db).get_event_by_id(event_id)
+        remaining_key = self._keys(event_id)[0]
+
+        pipe = self.redis.pipeline()
+        pipe.set(remaining_key, max(db_event.capacity - db_event.tickets_sold, 0), nx=True)
+        pipe.sadd(self.EVENTS_KEY, event_id)
+        pipe.execute()
+
+    def reserve(self, event_id: int):
+        """
+        Atomically reserves a seat of an event, loading its inventory on first use.
+
+        Args:
+            event_id (int): The ID of the event to reserve a seat for.
+
+        Raises:
+            HTTPException: If the event is not found or is sold out.
+        """
+        result = self._reserve(keys=self._keys(event_id))
+        if result == -1:
+            self.load(event_id)
+            result = self._reserve(keys=self._keys(event_id))
+
+        if result != 1:
+            raise self._event_sold_out
+
+    def confirm(self, event_id: int):
+        """
+        Marks a reservation as persisted, removing it from the pending count.
+
+        Args:
+            event_id (int): The ID of the event the reservation belongs to.
+        """
+        self._confirm(keys=self._keys(event_id))
+
+    def release(self, event_id: int):
+        """
+        Gives back a reserved seat whose persistence failed.
+
+        Args:
+            event_id (int): The ID of the event the reservation belongs to.
+        """
+        self._release(keys=self._keys(event_id))
+
+    def reconcile(self):
+        """
+        Realigns every loaded inventory counter with the seats left in the database.
+
+        The remaining seats are recomputed as `capacity - tickets_sold`, which
+        already counts the holds (expired or not), minus the reservations that are
+        still waiting to be persisted. A reservation persisted between the database
+        read and the update is in neither count, so while that happens the counter
+        is only lowered; the next run corrects it. Counters of events that no
+        longer exist are dropped.
+
+        Returns:
+            dict: A mapping of event ID to the drift that was corrected.
+        """
+        event_ids = [int(event_id) for event_id in self.redis.smembers(self.EVENTS_KEY)]
+        if not event_ids:
+            return {}
+
+        # Read before the database, so later confirmations can be detected
+        confirmed = self.redis.mget([self._keys(event_id)[2] for event_id in event_ids])
+        confirmed = dict(zip(event_ids, confirmed))
+        rows = self.db.execute(
+            select(EventModel.id, EventModel.capacity - EventModel.tickets_sold)
+            .where(EventModel.id.in_(event_ids))
+        ).all()
+
+        drift = {}
+        for event_id, available in rows:
+            remaining, previous = self._reconcile(
+                keys=self._keys(event_id), args=[available, confirmed[event_id] or "0"]
+            )
+            if previous is not None and int(previous) != remaining:
+                drift[event_id] = remaining - int(previous)
+
+        missing = set(event_ids) - {row[0] for row in rows}
+        if missing:
+            pipe = self.redis.pipeline()
+            for event_id in missing:
+                pipe.delete(*self._keys(event_id))
+                pipe.srem(self.EVENTS_KEY, event_id)
+            pipe.execute()
+
+        return drift
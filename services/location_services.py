@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from models.location import CityModel, CountryModel
+from utils.pagination import KeysetPage
 
 
 class LocationServiceHandler:
@@ -36,7 +41,7 @@ class LocationServiceHandler:
         Returns:
             list: A list of all cities from the database.
         """
-        return self.db.query(CityModel).all()
+        return self.db.query(CityModel).options(joinedload(CityModel.country)).all()
     
     def create_country(self, country):
         """
@@ -72,6 +77,63 @@ class LocationServiceHandler:
         """
         db_city = CityModel(**city.dict())
         self.db.add(db_city)
+        self.db.flush()
+        city_id = db_city.id
         self.db.commit()
-        self.db.refresh(db_city)
-        return db_city
+        # Loaded with the city: `CityResponse` serializes its country
+        return (
+            self.db.query(CityModel)
+            .options(joinedload(CityModel.country))
+            .filter(CityModel.id == city_id)
+            .one()
+        )
+
+
+class AsyncLocationServiceHandler:
+    """
+    Handles the read-only location operations on an async database session.
+
+    Attributes:
+        db (AsyncSession): The async database session used to interact with the database.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initializes the location service handler with an async database session.
+
+        Args:
+            db (AsyncSession): The async database session used to interact with the database.
+        """
+        self.db = db
+
+    async def list_countries(self, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """
+        Retrieves a page of the countries, ordered by ID.
+
+        Args:
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every country.
+
+        Returns:
+            tuple: The countries of the page and the cursor of the next page.
+        """
+        page = KeysetPage([CountryModel.id], cursor, limit)
+        countries = await self.db.scalars(page.apply(select(CountryModel)))
+        return page.split(countries.all())
+
+    async def list_cities(self, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """
+        Retrieves a page of the cities, with their country loaded, ordered by ID.
+
+        Args:
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every city.
+
+        Returns:
+            tuple: The cities of the page and the cursor of the next page.
+        """
+        page = KeysetPage([CityModel.id], cursor, limit)
+        cities = await self.db.scalars(
+            page.apply(select(CityModel).options(joinedload(CityModel.country)))
+        )
+        return page.split(cities.all())
@@ -0,0 +1,366 @@
+import json
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from prometheus_client import Counter as MetricCounter
+from redis import Redis
+
+from utils.constants import TICKET_REQUEST_TTL
+from utils.enums import TicketRequestStatusEnum
+
+# Outcomes after which the client may retry with the same idempotency key
+RETRYABLE_OUTCOMES = frozenset({
+    TicketRequestStatusEnum.SOLD_OUT,
+    TicketRequestStatusEnum.NOT_FOUND,
+    TicketRequestStatusEnum.ERROR,
+})
+
+# Moves up to ARGV[1] requests from the head of the queue to the end of a processing list.
+# KEYS: the queue and the processing list. ARGV[2]: the TTL of the processing list.
+POP_BATCH_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], #items, -1)
+    redis.call('RPUSH', KEYS[2], unpack(items))
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+return items
+"""
+
+# Moves every request of a processing list back to the head of its queue, keeping their order.
+REQUEUE_SCRIPT = """
+local moved = 0
+while redis.call('RPOPLPUSH', KEYS[1], KEYS[2]) do
+    moved = moved + 1
+end
+return moved
+"""
+
+ticket_request_outcomes = MetricCounter(
+    "ticket_request_outcomes",
+    "Final outcomes of the ticket requests (created, waitlisted, sold_out, error...).",
+    ["outcome"],
+)
+
+
+class TicketRequestHandler:
+    """
+    Handles ticket purchase requests that are queued in Redis.
+
+    Every request gets an ID and a compact status hash that expires after
+    `TICKET_REQUEST_TTL` seconds, so clients can follow it without touching
+    Postgres. In batch mode, requests are also appended to a per-event FIFO list
+    that is drained in bulk by the `process_ticket_batch` Celery task. Drained
+    requests are moved to a processing list of the consumer until their outcome is
+    stored, so the requests of a consumer that dies are put back in the queue
+    instead of being lost. Client supplied idempotency keys map retried requests
+    back to the original one.
+
+    Attributes:
+        redis (Redis): The Redis client used to store queues and statuses.
+        _request_not_found (HTTPException): Exception raised when a request is unknown or expired.
+    """
+
+    def __init__(self, redis_client: Redis):
+        """
+        Initializes the ticket request handler with a Redis client.
+
+        Args:
+            redis_client (Redis): The Redis client used to store queues and statuses.
+        """
+        self.redis = redis_client
+        self._pop_batch = self.redis.register_script(POP_BATCH_SCRIPT)
+        self._requeue = self.redis.register_script(REQUEUE_SCRIPT)
+        self._request_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket request not found"
+        )
+
+    @staticmethod
+    def _queue_key(event_id: int):
+        return f"ticket:queue:{event_id}"
+
+    @staticmethod
+    def _processing_key(event_id: int, consumer: str):
+        return f"ticket:queue:processing:{consumer}:{event_id}"
+
+    @staticmethod
+    def _status_key(request_id: str):
+        return f"ticket:request:{request_id}"
+
+    @staticmethod
+    def _idempotency_key(user_id: int, idempotency_key: str):
+        return f"ticket:idempotency:{user_id}:{idempotency_key}"
+
+    def _set_status(self, pipe, request_id: str, fields: dict):
+        pipe.hset(self._status_key(request_id), mapping=fields)
+        pipe.expire(self._status_key(request_id), TICKET_REQUEST_TTL)
+
+    @staticmethod
+    def new_request_id():
+        """
+        Generates a new ticket request ID.
+
+        Returns:
+            str: A random request ID.
+        """
+        return str(uuid4())
+
+    def claim_idempotency_key(
+        self, event_id: int, user_id: int, idempotency_key: str, request_id: str
+    ) -> Optional[dict]:
+        """
+        Binds an idempotency key to a request, unless it already belongs to another one.
+
+        The check and the claim are a single `SET NX GET` command, so concurrent
+        retries of the same request can never both go through.
+
+        Args:
+            event_id (int): The ID of the event the ticket is requested for.
+            user_id (int): The ID of the user requesting the ticket.
+            idempotency_key (str): The key supplied by the client.
+            request_id (str): The ID of the new request.
+
+        Returns:
+            Optional[dict]: None if the key was claimed for `request_id`, otherwise the
+                request ID, event ID and status of the original request.
+        """
+        original_id = self.redis.set(
+            self._idempotency_key(user_id, idempotency_key),
+            request_id,
+            nx=True,
+            get=True,
+            ex=TICKET_REQUEST_TTL,
+        )
+        if original_id is None:
+            return None
+
+        fields = self.redis.hgetall(self._status_key(original_id))
+        return {
+            "request_id": original_id,
+            "event_id": int(fields.get("event_id", event_id)),
+            # The original request may still be registering its status
+            "status": fields.get("status", TicketRequestStatusEnum.PENDING.value),
+        }
+
+    def release_idempotency_key(self, user_id: int, idempotency_key: str):
+        """
+        Frees an idempotency key whose request was rejected or could not be queued, so it can be retried.
+
+        Args:
+            user_id (int): The ID of the user who made the request.
+            idempotency_key (str): The key supplied by the client.
+        """
+        self.redis.delete(self._idempotency_key(user_id, idempotency_key))
+
+    def register(
+        self,
+        event_id: int,
+        user_id: int,
+        initial_status: TicketRequestStatusEnum = TicketRequestStatusEnum.PENDING,
+        request_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ):
+        """
+        Registers a new ticket request and its initial status.
+
+        Args:
+            event_id (int): The ID of the event the ticket is requested for.
+            user_id (int): The ID of the user requesting the ticket.
+            initial_status (TicketRequestStatusEnum): The initial status of the request.
+                Defaults to PENDING.
+            request_id (Optional[str]): The ID to register. A new one is generated if omitted.
+            idempotency_key (Optional[str]): The key claimed for the request, released
+                by `record_outcomes` if the request is rejected.
+
+        Returns:
+            str: The request ID.
+        """
+        request_id = request_id or self.new_request_id()
+        pipe = self.redis.pipeline()
+        self._set_status(
+            pipe, request_id, self._initial_fields(initial_status, event_id, user_id, idempotency_key)
+        )
+        pipe.execute()
+        return request_id
+
+    @staticmethod
+    def _initial_fields(initial_status, event_id, user_id, idempotency_key):
+        fields = {"status": initial_status.value, "event_id": event_id, "user_id": user_id}
+        if idempotency_key:
+            fields["idempotency_key"] = idempotency_key
+        return fields
+
+    def enqueue(
+        self,
+        event_id: int,
+        user_id: int,
+        request_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Tuple[str, bool]:
+        """
+        Registers a ticket request and queues it for batch processing.
+
+        Args:
+            event_id (int): The ID of the event the ticket is requested for.
+            user_id (int): The ID of the user requesting the ticket.
+            request_id (Optional[str]): The ID to register. A new one is generated if omitted.
+            idempotency_key (Optional[str]): The key claimed for the request, released
+                by `record_outcomes` if the request is rejected.
+
+        Returns:
+            tuple: The request ID and a flag that is True when the queue was
+                empty, meaning a drain task has to be scheduled.
+        """
+        request_id = request_id or self.new_request_id()
+
+        pipe = self.redis.pipeline()
+        self._set_status(
+            pipe,
+            request_id,
+            self._initial_fields(TicketRequestStatusEnum.PENDING, event_id, user_id, idempotency_key),
+        )
+        pipe.rpush(self._queue_key(event_id), self._payload(request_id, user_id))
+        *_, queue_length = pipe.execute()
+        return request_id, queue_length == 1
+
+    @staticmethod
+    def _payload(request_id: str, user_id: int):
+        return json.dumps({"request_id": request_id, "user_id": user_id})
+
+    def dequeue(self, event_id: int, user_id: int, request_id: str):
+        """
+        Removes a request from an event queue when its drain task could not be scheduled.
+
+        Args:
+            event_id (int): The ID of the event the ticket is requested for.
+            user_id (int): The ID of the user requesting the ticket.
+            request_id (str): The ID of the request.
+        """
+        self.redis.lrem(self._queue_key(event_id), 1, self._payload(request_id, user_id))
+
+    def pop_batch(self, event_id: int, size: int, consumer: str) -> List[dict]:
+        """
+        Moves up to `size` pending requests from the head of an event queue to the
+        processing list of a consumer.
+
+        The requests stay in the processing list until `ack_batch` is called, so
+        they can be put back in the queue with `requeue` if the consumer dies
+        before storing their outcome.
+
+        Args:
+            event_id (int): The ID of the event whose queue is drained.
+            size (int): The maximum number of requests to remove.
+            consumer (str): The consumer processing the requests, e.g. `<hostname>:<task id>`.
+
+        Returns:
+            list: The removed requests, in arrival order.
+        """
+        items = self._pop_batch(
+            keys=[self._queue_key(event_id), self._processing_key(event_id, consumer)],
+            args=[size, TICKET_REQUEST_TTL],
+        )
+        return [json.loads(item) for item in items]
+
+    def ack_batch(self, event_id: int, consumer: str):
+        """
+        Drops the requests of a consumer once their outcome is stored.
+
+        Args:
+            event_id (int): The ID of the event whose queue is drained.
+            consumer (str): The consumer that processed the requests.
+        """
+        self.redis.delete(self._processing_key(event_id, consumer))
+
+    def requeue(self, hostname: str):
+        """
+        Puts the requests left in the processing lists of a host back at the head of their queues.
+
+        Meant to run when the worker of `hostname` starts, before it processes any
+        request, so every processing list found belongs to a consumer that died.
+        Requests whose tickets were committed right before the crash are processed
+        again and end up as ALREADY_ISSUED.
+
+        Args:
+            hostname (str): The hostname of the worker.
+
+        Returns:
+            dict: A mapping of event ID to the number of requests put back in its queue.
+        """
+        requeued = {}
+        for key in self.redis.scan_iter(match=self._processing_key("*", f"{hostname}:*")):
+            event_id = int(key.rsplit(":", 1)[1])
+            moved = self._requeue(keys=[key, self._queue_key(event_id)])
+            if moved:
+                requeued[event_id] = requeued.get(event_id, 0) + moved
+        return requeued
+
+    def record_outcomes(self, outcomes: Dict[str, TicketRequestStatusEnum]):
+        """
+        Stores the outcome of several requests in a single round trip.
+
+        The outcomes are also counted in `ticket_request_outcomes` once stored. The
+        idempotency keys of rejected requests (sold out, event not found or
+        failed) are released so the client can retry, which costs one more round trip.
+
+        Args:
+            outcomes (dict): A mapping of request ID to its final status.
+        """
+        rejected = [request_id for request_id, outcome in outcomes.items() if outcome in RETRYABLE_OUTCOMES]
+        if rejected:
+            self._release_idempotency_keys(rejected)
+
+        pipe = self.redis.pipeline(transaction=False)
+        for request_id, outcome in outcomes.items():
+            self._set_status(pipe, request_id, {"status": outcome.value})
+        pipe.execute()
+        for outcome, count in Counter(outcomes.values()).items():
+            ticket_request_outcomes.labels(outcome=outcome.value).inc(count)
+
+    def _release_idempotency_keys(self, request_ids: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for request_id in request_ids:
+            pipe.hmget(self._status_key(request_id), "user_id", "idempotency_key")
+        keys = [
+            self._idempotency_key(user_id, idempotency_key)
+            for user_id, idempotency_key in pipe.execute()
+            if idempotency_key
+        ]
+        if keys:
+            self.redis.delete(*keys)
+
+    def record_outcome(self, request_id: str, outcome: TicketRequestStatusEnum):
+        """
+        Stores the outcome of a single request.
+
+        Args:
+            request_id (str): The ID of the request.
+            outcome (TicketRequestStatusEnum): The final status of the request.
+        """
+        self.record_outcomes({request_id: outcome})
+
+    def get_status(self, request_id: str, user_id: int):
+        """
+        Retrieves the status of a ticket request owned by a user.
+
+        Args:
+            request_id (str): The ID of the request.
+            user_id (int): The ID of the user who made the request.
+
+        Returns:
+            dict: The request ID, event ID and status of the request.
+
+        Raises:
+            HTTPException: If the request is unknown, expired or owned by another user.
+        """
+        fields = self.redis.hgetall(self._status_key(request_id))
+        if not fields or fields.get("user_id") != str(user_id):
+            raise self._request_not_found
+
+        return {
+            "request_id": request_id,
+            "event_id": int(fields["event_id"]),
+            "status": fields["status"],
+        }
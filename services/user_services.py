@@ -1,22 +1,47 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models.user import UserModel
 from schemas.user import UserCreate, UserUpdate, UserUpdateAdmin
 from fastapi import Depends, HTTPException, status
-from services.auth_services import AuthServiceHandler
+from redis.exceptions import RedisError
+from db.redis import get_redis
+from services.auth_services import REFRESH_TOKEN_TYPE, AuthServiceHandler, TokenRevocationHandler
+from utils.auths import REVOCATION_UNAVAILABLE_EXCEPTION, decode_token
+from utils.constants import JWT_CLAIMS_ENABLED
+from utils.pagination import KeysetPage
+from utils.user_cache import user_cache
 
 
 auth = AuthServiceHandler()
 
 
+def issue_tokens(user: UserModel):
+    """
+    Issues the tokens returned by a login.
+
+    Args:
+        user (UserModel): The authenticated user.
+
+    Returns:
+        dict: The access token, the refresh token with `JWT_CLAIMS_ENABLED`, and the token type.
+    """
+    if JWT_CLAIMS_ENABLED:
+        return auth.create_token_pair(user)
+
+    access_token = auth.create_access_token(data={"sub": user.email})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
 class UserServiceHandler:
     """
-    Handles user-related operations including user creation, updating, deletion, authentication, and login.
+    Handles user-related operations including user creation, updating, deletion, and token refresh and revocation.
 
     Attributes:
         db (Session): The database session used to interact with the database.
         _credentials_exception (HTTPException): Exception raised for invalid credentials.
         _user_not_found (HTTPException): Exception raised when a user is not found.
-        _invalid_credentials (HTTPException): Exception raised for incorrect username or password.
         _no_has_permission (HTTPException): Exception raised when the user does not have permission.
         _email_already_exist (HTTPException): Exception raised when the email already exists in the database.
     """
@@ -37,11 +62,6 @@ class UserServiceHandler:
         self._user_not_found = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-        self._invalid_credentials = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
         self._no_has_permission = HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No has permission",
@@ -81,7 +101,7 @@ class UserServiceHandler:
             raise self._email_already_exist
         
         user_schema = user.model_dump()
-        user_schema["hashed_password"] = auth.get_password_hash(user_schema["password"])
+        user_schema["hashed_password"] = auth.get_password_hash_pooled(user_schema["password"])
         user_schema.pop("password")
         db_user = UserModel(**user_schema)
         self.db.add(db_user)
@@ -112,6 +132,10 @@ class UserServiceHandler:
         """
         Updates the user information based on the provided user data.
 
+        The user is dropped from `user_cache` and its self-contained tokens are
+        revoked, so a new role, email or active flag applies to the tokens
+        already issued.
+
         Args:
             user_id (int): The ID of the user to update.
             user (UserUpdate | UserUpdateAdmin): The updated user data.
@@ -123,13 +147,16 @@ class UserServiceHandler:
             HTTPException: If the user is not found.
         """
         db_user = self.get_user_by_id(user_id)
+        previous_email = db_user.email
 
         for key, value in user.model_dump().items():
             if value:
                 setattr(db_user, key, value)
 
+        self._revoke_tokens(user_id)
         self.db.commit()
         self.db.refresh(db_user)
+        user_cache.invalidate(previous_email, db_user.email)
         return db_user
 
     def delete_user(self, user_id: int):
@@ -146,67 +173,194 @@ class UserServiceHandler:
             HTTPException: If the user is not found.
         """
         db_user = self.get_user_by_id(user_id)
+        email = db_user.email
         self.db.delete(db_user)
+        self._revoke_tokens(user_id)
         self.db.commit()
+        user_cache.invalidate(email)
         return db_user
 
-    def _get_user_by_email(self, email: str):
+    def _revoke_tokens(self, user_id: int):
         """
-        Helper method to retrieve a user by their email.
+        Revokes the self-contained tokens of a user, when they are issued.
+
+        Called before the commit, so the change is not saved if Redis is down.
 
         Args:
-            email (str): The email of the user to retrieve.
+            user_id (int): The ID of the user.
+        """
+        if JWT_CLAIMS_ENABLED:
+            TokenRevocationHandler(get_redis()).revoke_user(user_id)
+
+    def refresh(self, refresh_token: str):
+        """
+        Issues a new token pair from a refresh token, and revokes the refresh token.
+
+        The refresh token is consumed atomically before anything is issued, so
+        concurrent refreshes with the same token cannot both get a new pair. The
+        user is loaded again, so the new access token carries its current role
+        and active flag.
+
+        Args:
+            refresh_token (str): The refresh token returned with the access token.
 
         Returns:
-            UserModel: The user with the specified email.
+            dict: A dictionary containing the access token, the refresh token and the token type.
 
         Raises:
-            HTTPException: If the user is not found.
+            HTTPException: If the token is not a valid refresh token, was revoked
+                or already used, its user no longer exists or is inactive, or the
+                revocation list is unreachable.
         """
-        db_user = self.db.query(UserModel).filter(UserModel.email == email).first()
-        if not db_user:
-            raise self._user_not_found
+        claims = decode_token(refresh_token)
+        if claims.get("type") != REFRESH_TOKEN_TYPE:
+            raise self._credentials_exception
 
-        return db_user
+        revocation = TokenRevocationHandler(get_redis())
+        try:
+            consumed = not revocation.is_revoked(claims) and revocation.revoke(claims)
+        except RedisError:
+            raise REVOCATION_UNAVAILABLE_EXCEPTION
+        if not consumed:
+            raise self._credentials_exception
+
+        user = self.db.query(UserModel).filter(UserModel.email == claims["sub"]).first()
+        if not user or user.id != claims["uid"] or not user.active:
+            raise self._credentials_exception
+
+        return auth.create_token_pair(user)
 
-    def _authenticate_user(self, email: str, password: str):
+    def logout(self, access_token: str, refresh_token: Optional[str] = None):
         """
-        Authenticates a user by verifying their email and password.
+        Revokes the self-contained tokens of a session until they expire.
+
+        Tokens with a subject only cannot be revoked and simply expire.
 
         Args:
-            email (str): The email of the user.
-            password (str): The password of the user.
+            access_token (str): The access token of the request.
+            refresh_token (Optional[str]): The refresh token issued with it, if any.
+
+        Raises:
+            HTTPException: If a token is invalid, the tokens belong to different users,
+                or the revocation list is unreachable.
+        """
+        tokens = [decode_token(token) for token in filter(None, [access_token, refresh_token])]
+        if any(claims["sub"] != tokens[0]["sub"] for claims in tokens):
+            raise self._credentials_exception
+
+        revocation = TokenRevocationHandler(get_redis())
+        try:
+            for claims in tokens:
+                if "jti" in claims:
+                    revocation.revoke(claims)
+        except RedisError:
+            raise REVOCATION_UNAVAILABLE_EXCEPTION
+
+
+class AsyncUserServiceHandler:
+    """
+    Handles the read-only user operations and the login on an async database session.
+
+    The login only writes to store a rehashed password. Other writes and the
+    token refresh stay on `UserServiceHandler`.
+
+    Attributes:
+        db (AsyncSession): The async database session used to interact with the database.
+        _user_not_found (HTTPException): Exception raised when a user is not found.
+        _invalid_credentials (HTTPException): Exception raised for incorrect username or password.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initializes the user service handler with an async database session.
+
+        Args:
+            db (AsyncSession): The async database session used to interact with the database.
+        """
+        self.db = db
+        self._user_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+        self._invalid_credentials = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    async def list_users(self, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """
+        Retrieves a page of the users in the database, ordered by ID.
+
+        Args:
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every user.
 
         Returns:
-            UserModel: The authenticated user.
+            tuple: The users of the page and the cursor of the next page.
+        """
+        page = KeysetPage([UserModel.id], cursor, limit)
+        users = await self.db.scalars(page.apply(select(UserModel)))
+        return page.split(users.all())
+
+    async def get_user_by_id(self, user_id: int):
+        """
+        Retrieves a user by its ID.
+
+        Args:
+            user_id (int): The ID of the user to retrieve.
+
+        Returns:
+            UserModel: The user with the specified ID.
 
         Raises:
-            HTTPException: If the credentials are invalid.
+            HTTPException: If the user is not found.
         """
-        try:
-            user = self._get_user_by_email(email)
-        except HTTPException:
-            raise self._invalid_credentials
+        db_user = await self.db.get(UserModel, user_id)
+        if not db_user:
+            raise self._user_not_found
 
-        if not auth.verify_password(password, user.hashed_password):
-            raise self._invalid_credentials
+        return db_user
+
+    async def get_user_by_email(self, email: str):
+        """
+        Retrieves a user by their email.
+
+        Args:
+            email (str): The email of the user to retrieve.
 
-        return user
+        Returns:
+            UserModel | None: The user with the specified email, or None if there is none.
+        """
+        return await self.db.scalar(select(UserModel).where(UserModel.email == email))
 
-    def login(self, email: str, password: str):
+    async def login(self, email: str, password: str):
         """
         Authenticates a user and returns an access token.
 
+        The password is verified on `password_pool`, so a burst of logins
+        neither holds the threads of the sync endpoints nor the event loop, and
+        is rehashed if its cost is not `BCRYPT_ROUNDS`.
+
         Args:
             email (str): The email of the user to log in.
             password (str): The password of the user to log in.
 
         Returns:
-            dict: A dictionary containing the access token and its type.
+            dict: A dictionary containing the access token, the refresh token if
+                any, and the token type.
 
         Raises:
-            HTTPException: If the credentials are invalid.
+            HTTPException: If the credentials are invalid, or if the password pool is saturated.
         """
-        user = self._authenticate_user(email, password)
-        access_token = auth.create_access_token(data={"sub": user.email})
-        return {"access_token": access_token, "token_type": "bearer"}
+        user = await self.get_user_by_email(email)
+        if not user:
+            raise self._invalid_credentials
+
+        valid, new_hash = await auth.verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
+            raise self._invalid_credentials
+        if new_hash:
+            user.hashed_password = new_hash
+            await self.db.commit()
+
+        return issue_tokens(user)
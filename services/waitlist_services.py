@@ -0,0 +1,221 @@
+from typing import List, Tuple
+
+from fastapi import HTTPException, status
+from redis import Redis
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.event import EventModel
+from models.user import UserModel
+from services.event_services import EventServiceHandler
+from services.ticket_services import TicketRequestHandler
+from utils.enums import TicketRequestStatusEnum
+
+
+class WaitlistHandler:
+    """
+    Handles the per-event waitlists of sold-out events.
+
+    Every waitlist is a Redis sorted set of user IDs scored by a per-event
+    sequence, so it behaves as a FIFO queue where joining, looking up a position
+    and popping the head are all O(log n). When seats free up, `promote` pops the
+    next users and issues their tickets in a single batched transaction; a
+    cancelled ticket goes straight to the head of the waitlist with `cancel_ticket`.
+
+    Attributes:
+        redis (Redis): The Redis client holding the waitlists.
+        db (Session): The database session used to issue the promoted tickets.
+        _not_waitlisted (HTTPException): Exception raised when the user is not on the waitlist.
+    """
+
+    def __init__(self, redis_client: Redis, db: Session):
+        """
+        Initializes the waitlist handler with a Redis client and a database session.
+
+        Args:
+            redis_client (Redis): The Redis client holding the waitlists.
+            db (Session): The database session used to issue the promoted tickets.
+        """
+        self.redis = redis_client
+        self.db = db
+        self._not_waitlisted = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User is not on the waitlist"
+        )
+
+    @staticmethod
+    def _keys(event_id: int):
+        return (
+            f"ticket:waitlist:{event_id}",
+            f"ticket:waitlist:seq:{event_id}",
+            f"ticket:waitlist:requests:{event_id}",
+        )
+
+    def join(self, event_id: int, entries: List[Tuple[int, str]]):
+        """
+        Appends users to the end of an event waitlist.
+
+        Users that are already waiting keep their original position.
+
+        Args:
+            event_id (int): The ID of the sold-out event.
+            entries (list): Pairs of user ID and the ID of the request that was sold out.
+        """
+        if not entries:
+            return
+
+        waitlist_key, seq_key, requests_key = self._keys(event_id)
+        last = self.redis.incrby(seq_key, len(entries))
+        first = last - len(entries) + 1
+
+        pipe = self.redis.pipeline()
+        pipe.zadd(
+            waitlist_key,
+            {user_id: first + i for i, (user_id, _) in enumerate(entries)},
+            nx=True,
+        )
+        for user_id, request_id in entries:
+            pipe.hsetnx(requests_key, user_id, request_id)
+        pipe.execute()
+
+    def position(self, event_id: int, user_id: int):
+        """
+        Retrieves the position of a user in an event waitlist.
+
+        Args:
+            event_id (int): The ID of the event.
+            user_id (int): The ID of the waiting user.
+
+        Returns:
+            dict: The event ID, the 1-based position of the user and the waitlist size.
+
+        Raises:
+            HTTPException: If the user is not on the waitlist.
+        """
+        waitlist_key, _, _ = self._keys(event_id)
+        pipe = self.redis.pipeline()
+        pipe.zrank(waitlist_key, user_id)
+        pipe.zcard(waitlist_key)
+        rank, size = pipe.execute()
+        if rank is None:
+            raise self._not_waitlisted
+
+        return {"event_id": event_id, "position": rank + 1, "size": size}
+
+    def promote(self, event_id: int):
+        """
+        Issues tickets to the head of an event waitlist while the event has free seats.
+
+        Each round pops as many users as there are free seats and issues their
+        tickets with `EventServiceHandler.issue_tickets`, a single transaction with a
+        multi-row insert. Users that could not be served go back to their original
+        position, and users that already hold a ticket of a one-ticket-per-user event
+        are dropped.
+
+        Args:
+            event_id (int): The ID of the event whose seats were freed.
+
+        Returns:
+            tuple: The promoted user IDs and the number of seats left afterwards,
+                which is None when the event no longer exists.
+        """
+        waitlist_key, _, requests_key = self._keys(event_id)
+        service = EventServiceHandler(self.db)
+        ticket_requests = TicketRequestHandler(self.redis)
+        promoted = []
+
+        remaining = self.db.execute(
+            select(EventModel.capacity - EventModel.tickets_sold).where(EventModel.id == event_id)
+        ).scalar()
+        while remaining and remaining > 0:
+            popped = self.redis.zpopmin(waitlist_key, remaining)
+            if not popped:
+                break
+
+            try:
+                winners, already_issued, remaining = service.issue_tickets(
+                    event_id, [int(user_id) for user_id, _ in popped]
+                )
+            except Exception:
+                self.db.rollback()
+                self.redis.zadd(waitlist_key, dict(popped), nx=True)
+                raise
+
+            served = set(winners) | already_issued
+            unserved = {user_id: score for user_id, score in popped if int(user_id) not in served}
+            if unserved:
+                self.redis.zadd(waitlist_key, unserved, nx=True)
+
+            if not served:
+                break
+            self._record_promotions(ticket_requests, requests_key, winners, already_issued - set(winners))
+            promoted.extend(winners)
+
+        return promoted, remaining
+
+    def cancel_ticket(self, event_id: int, current_user: UserModel):
+        """
+        Cancels the ticket of a user and hands its seat to the head of the event waitlist.
+
+        The cancellation and the ticket of the successor are a single transaction,
+        so a new request can never take the freed seat ahead of the waitlist. Users
+        at the head that already hold a ticket of a one-ticket-per-user event are
+        dropped, like in `promote`.
+
+        Args:
+            event_id (int): The ID of the event the ticket belongs to.
+            current_user (UserModel): The user who owns the ticket.
+
+        Returns:
+            tuple: The ID of the user who got the seat, None if the waitlist was
+                empty, and the number of seats left afterwards.
+
+        Raises:
+            HTTPException: If the user holds no ticket for the event.
+        """
+        waitlist_key, _, requests_key = self._keys(event_id)
+        service = EventServiceHandler(self.db)
+        ticket_requests = TicketRequestHandler(self.redis)
+
+        while True:
+            popped = self.redis.zpopmin(waitlist_key, 1)
+            if not popped:
+                return None, service.cancel_ticket(event_id, current_user)
+
+            successor_id = int(popped[0][0])
+            if successor_id == current_user.id:
+                # Joined the waitlist while holding the ticket being cancelled
+                self._record_promotions(ticket_requests, requests_key, [], {successor_id})
+                continue
+
+            try:
+                remaining = service.cancel_ticket(event_id, current_user, successor_id)
+            except IntegrityError:
+                # Got a ticket since joining the waitlist: drop it and try the next user
+                self._record_promotions(ticket_requests, requests_key, [], {successor_id})
+                continue
+            except Exception:
+                self.redis.zadd(waitlist_key, dict(popped), nx=True)
+                raise
+
+            self._record_promotions(ticket_requests, requests_key, [successor_id], set())
+            return successor_id, remaining
+
+    def _record_promotions(self, ticket_requests, requests_key, winners, already_issued):
+        served = [*winners, *already_issued]
+        pipe = self.redis.pipeline()
+        pipe.hmget(requests_key, served)
+        pipe.hdel(requests_key, *served)
+        request_ids, _ = pipe.execute()
+
+        winner_ids = set(winners)
+        ticket_requests.record_outcomes({
+            request_id: (
+                TicketRequestStatusEnum.CREATED
+                if user_id in winner_ids
+                else TicketRequestStatusEnum.ALREADY_ISSUED
+            )
+            for user_id, request_id in zip(served, request_ids)
+            if request_id
+        })
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries(*engines):
+    """
+    Records the SQL statements sent to the given engines inside the block.
+
+    Async engines are supported through their `sync_engine`.
+
+    Args:
+        *engines (Engine | AsyncEngine): The engines to watch.
+
+    Yields:
+        list: The statements executed so far, in order.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [getattr(engine, "sync_engine", engine) for engine in engines]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def assert_num_queries(expected: int, *engines):
+    """
+    Fails if the block does not send exactly `expected` statements to the engines.
+
+    Args:
+        expected (int): The number of statements the block is allowed to run.
+        *engines (Engine | AsyncEngine): The engines to watch.
+    """
+    with count_queries(*engines) as statements:
+        yield statements
+
+    assert len(statements) == expected, (
+        f"Expected {expected} queries, got {len(statements)}:\n" + "\n".join(statements)
+    )
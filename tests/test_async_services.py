@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from db.config import Base, to_async_url
+from models.category import CategoryModel
+from models.event import EventModel, SessionModel
+from models.location import CityModel, CountryModel
+from models.user import UserModel
+from services.category_services import AsyncCategoryServiceHandler
+from services.event_services import AsyncEventServiceHandler
+from services.location_services import AsyncLocationServiceHandler
+from services.user_services import AsyncUserServiceHandler
+
+pytest.importorskip("aiosqlite")
+
+# Ejecuta una corrutina contra una base SQLite en memoria con datos de ejemplo
+def run(test):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            db.add_all([
+                CountryModel(id=1, name="Colombia", code="CO"),
+                CityModel(id=1, name="Bogota", country_id=1),
+                CategoryModel(id=1, name="Music"),
+                UserModel(id=1, fullname="Owner", email="owner@test.com", role="OWNER", hashed_password="x"),
+                EventModel(
+                    id=1, name="Concert", description="d", date=datetime(2030, 1, 1), capacity=10,
+                    status="CREATED", location_id=1, category_id=1, owner_id=1,
+                ),
+                SessionModel(
+                    event_id=1, name="Opening", description="d", start_time=datetime(2030, 1, 1),
+                    end_time=datetime(2030, 1, 1), capacity=5, speaker="x",
+                ),
+            ])
+            await db.commit()
+
+        try:
+            async with Session() as db:
+                return await test(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+# Test para 'to_async_url': usa el driver asíncrono de cada base
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@h:5432/d").drivername == "postgresql+asyncpg"
+    assert to_async_url("postgresql+psycopg2://u:p@h/d").drivername == "postgresql+asyncpg"
+    assert to_async_url("sqlite:///app.db").drivername == "sqlite+aiosqlite"
+
+# Test para 'filter_events_with_related_names': carga la ubicación con su país
+def test_filter_events_loads_location():
+    async def test(db):
+        return await AsyncEventServiceHandler(db).filter_events_with_related_names(
+            location_name="bog", category_name="mus", status=None, offset=0, limit=10
+        )
+
+    events, next_cursor = run(test)
+
+    assert [event.name for event in events] == ["Concert"]
+    assert next_cursor is None
+    # La relación ya está cargada: no hace falta otra consulta
+    assert events[0].location.country.code == "CO"
+
+# Test para 'get_event_by_id' y 'list_sessions_by_event' cuando el evento no existe
+def test_event_not_found():
+    async def test(db):
+        service = AsyncEventServiceHandler(db)
+        event = await service.get_event_by_id(1)
+        sessions = await service.list_sessions_by_event(1)
+        with pytest.raises(HTTPException) as exc:
+            await service.get_event_by_id(99)
+        with pytest.raises(HTTPException):
+            await service.list_sessions_by_event(99)
+        return event, sessions, exc.value
+
+    event, sessions, error = run(test)
+
+    assert event.location.name == "Bogota"
+    assert [session.name for session in sessions] == ["Opening"]
+    assert error.status_code == 404
+
+# Test para los listados de ubicaciones, categorías y usuarios
+def test_list_related():
+    async def test(db):
+        cities, _ = await AsyncLocationServiceHandler(db).list_cities()
+        countries, _ = await AsyncLocationServiceHandler(db).list_countries()
+        categories = await AsyncCategoryServiceHandler(db).list_categories()
+        users = AsyncUserServiceHandler(db)
+        user = await users.get_user_by_email("owner@test.com")
+        with pytest.raises(HTTPException):
+            await users.get_user_by_id(99)
+        return cities, countries, categories, user, (await users.list_users())[0]
+
+    cities, countries, categories, user, users = run(test)
+
+    assert cities[0].country.name == "Colombia"
+    assert [country.code for country in countries] == ["CO"]
+    assert [category.name for category in categories] == ["Music"]
+    assert user.id == 1 and [u.id for u in users] == [1]
+
+# Test para 'filter_events_with_related_names': filtra por rango de fechas
+def test_filter_events_by_date_range():
+    async def test(db):
+        service = AsyncEventServiceHandler(db)
+        inside, _ = await service.filter_events_with_related_names(
+            min_date=datetime(2029, 12, 1), max_date=datetime(2030, 2, 1), offset=0, limit=10
+        )
+        outside, _ = await service.filter_events_with_related_names(
+            min_date=datetime(2030, 2, 1), offset=0, limit=10
+        )
+        return inside, outside
+
+    inside, outside = run(test)
+
+    assert [event.id for event in inside] == [1]
+    assert outside == []
+
+# Test para 'contains': los comodines de LIKE del término se buscan literalmente
+def test_name_filter_escapes_wildcards():
+    async def test(db):
+        db.add_all([
+            EventModel(
+                name=name, description="d", date=datetime(2030, 1, 1), capacity=10,
+                status="CREATED", location_id=1, category_id=1, owner_id=1,
+            )
+            for name in ["100% Rock", "1000 Rock", "Rock_Fest", "RockXFest"]
+        ])
+        await db.commit()
+
+        service = AsyncEventServiceHandler(db)
+        names = {}
+        for term in ["0%", "k_f", "rock"]:
+            events, _ = await service.filter_events_with_related_names(name=term, offset=0, limit=10)
+            names[term] = sorted(event.name for event in events)
+        return names
+
+    names = run(test)
+
+    assert names["0%"] == ["100% Rock"]
+    assert names["k_f"] == ["Rock_Fest"]
+    assert names["rock"] == ["100% Rock", "1000 Rock", "RockXFest", "Rock_Fest"]
+
+# Test para la paginación por cursor: recorre todos los eventos sin repetirlos
+def test_filter_events_cursor_pages():
+    async def test(db):
+        db.add_all([
+            EventModel(
+                name=f"Event {i}", description="d", date=datetime(2030, 1, 1 + i % 3), capacity=10,
+                status="CREATED", location_id=1, category_id=1, owner_id=1,
+            )
+            for i in range(6)
+        ])
+        await db.commit()
+
+        service = AsyncEventServiceHandler(db)
+        pages, cursor = [], None
+        while True:
+            events, cursor = await service.filter_events_with_related_names(cursor=cursor, limit=3)
+            pages.append([(event.date, event.id) for event in events])
+            if cursor is None:
+                return pages
+
+    pages = run(test)
+
+    keys = [key for page in pages for key in page]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    # Orden estable por (date, id), sin repetidos entre páginas
+    assert keys == sorted(keys) and len(set(keys)) == 7
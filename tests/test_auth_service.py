@@ -1,11 +1,14 @@
+import time
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from datetime import timedelta
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.testclient import TestClient
 from jose import JWTError, jwt
-from services.auth_services import AuthServiceHandler
-from utils.constants import ALGORITHM, SECRET_KEY
+from passlib.context import CryptContext
+from services.auth_services import AuthServiceHandler, TokenRevocationHandler
+from utils.constants import ALGORITHM, BCRYPT_ROUNDS, SECRET_KEY
+from utils.enums import RoleEnumInDB
 
 # Instanciamos el servicio de autenticación
 auth_service = AuthServiceHandler()
@@ -57,3 +60,52 @@ def test_get_password_hash():
     # Verificamos que el hash no sea igual a la contraseña original
     assert hashed_password != password
     assert auth_service.verify_password(password, hashed_password) is True
+
+# Test de creación del par de tokens autocontenidos
+def test_create_token_pair():
+    user = MagicMock(id=7, email="test@example.com", role=RoleEnumInDB.OWNER, active=True)
+
+    tokens = auth_service.create_token_pair(user)
+    access = jwt.decode(tokens["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    refresh = jwt.decode(tokens["refresh_token"], SECRET_KEY, algorithms=[ALGORITHM])
+
+    # El token de acceso lleva los datos con los que se autoriza la petición
+    assert (access["uid"], access["role"], access["active"], access["type"]) == (7, "owner", True, "access")
+    # El token de refresco solo identifica al usuario y dura más
+    assert refresh["type"] == "refresh" and "role" not in refresh
+    assert refresh["exp"] > access["exp"] and refresh["jti"] != access["jti"]
+
+# Test de la lista de revocación de tokens
+def test_token_revocation():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    revocation = TokenRevocationHandler(redis_client)
+    now = time.time()
+    claims = {"jti": "a", "uid": 7, "iat": now - 1, "exp": now + 60}
+
+    assert revocation.is_revoked(claims) is False
+
+    # Un token revocado expira de la lista junto con el token; solo la primera revocación lo consume
+    assert revocation.revoke(claims) is True
+    assert revocation.revoke(claims) is False
+    assert revocation.is_revoked(claims) is True
+    assert 0 < redis_client.ttl("auth:revoked:a") <= 61
+
+    # Revocar al usuario invalida sus tokens anteriores, no los nuevos
+    other = {"jti": "b", "uid": 7, "iat": now - 1, "exp": now + 60}
+    revocation.revoke_user(7)
+    assert revocation.is_revoked(other) is True
+    assert revocation.is_revoked({**other, "iat": time.time() + 1}) is False
+
+# Test de actualización del hash según el coste configurado
+def test_verify_and_update_password():
+    low_cost_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("password123")
+
+    # Un hash con otro coste se rehace con BCRYPT_ROUNDS al verificarlo
+    valid, new_hash = auth_service.verify_and_update_password("password123", low_cost_hash)
+    assert valid is True and new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+    # Un hash con el coste configurado no se rehace
+    assert auth_service.verify_and_update_password("password123", new_hash) == (True, None)
+    # Una contraseña incorrecta no devuelve un hash nuevo
+    assert auth_service.verify_and_update_password("wrong_password", low_cost_hash) == (False, None)
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.config import Base
+import models.category, models.event, models.location  # Tablas relacionadas con UserModel
+from models.user import UserModel
+from schemas.user import UserUpdateAdmin
+from services import user_services
+from services.user_services import UserServiceHandler, auth
+from tests.query_counter import assert_num_queries
+from utils import auths
+from utils.enums import RoleEnumInDB
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# Base SQLite con un owner, tokens autocontenidos activados y Redis falso
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(UserModel(
+            id=1, fullname="Owner", email="owner@test.com", role="OWNER",
+            hashed_password=auth.get_password_hash("secret"),
+        ))
+        db.commit()
+
+    server = fakeredis.FakeServer()
+    redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(user_services, "JWT_CLAIMS_ENABLED", True)
+    monkeypatch.setattr(user_services, "get_redis", lambda: redis_client)
+    monkeypatch.setattr(auths, "get_redis", lambda: redis_client)
+    monkeypatch.setattr(auths, "get_async_redis", lambda: async_redis_client)
+
+    with SessionLocal() as db:
+        yield UserServiceHandler(db), engine
+    engine.dispose()
+
+# Tokens del owner, como los emite el login
+def owner_tokens(service):
+    return user_services.issue_tokens(service.db.get(UserModel, 1))
+
+# Test para 'get_current_user': el token autocontenido se autoriza sin consultar la base
+def test_claims_token_skips_user_lookup(service):
+    service, engine = service
+    tokens = owner_tokens(service)
+
+    with assert_num_queries(0, engine):
+        user = auths.get_current_user_with_role(["owner"])(
+            current_user=auths.get_current_active_user(auths.get_current_user(db=None, token=tokens["access_token"]))
+        )
+
+    assert (user.id, user.email, user.role) == (1, "owner@test.com", RoleEnumInDB.OWNER)
+    # El token de refresco no sirve para autenticar peticiones
+    with pytest.raises(HTTPException) as exc:
+        auths.get_current_user(db=None, token=tokens["refresh_token"])
+    assert exc.value.status_code == 401
+
+# Test para 'refresh': rota el token de refresco y lee de nuevo el rol
+def test_refresh_rotates_tokens(service):
+    service, _ = service
+    tokens = owner_tokens(service)
+    service.db.query(UserModel).filter(UserModel.id == 1).update({"role": RoleEnumInDB.ADMIN})
+    service.db.commit()
+
+    renewed = service.refresh(tokens["refresh_token"])
+
+    assert auths.get_current_user(db=None, token=renewed["access_token"]).role == RoleEnumInDB.ADMIN
+    with pytest.raises(HTTPException):
+        service.refresh(tokens["refresh_token"])
+
+# Test para 'refresh': sin Redis no se puede consumir el token y responde 503
+def test_refresh_redis_down(service, monkeypatch):
+    service, _ = service
+    tokens = owner_tokens(service)
+    down = fakeredis.FakeServer()
+    down.connected = False
+    monkeypatch.setattr(user_services, "get_redis", lambda: fakeredis.FakeRedis(server=down))
+
+    with pytest.raises(HTTPException) as exc:
+        service.refresh(tokens["refresh_token"])
+    assert exc.value.status_code == 503
+
+# Test para 'logout': revoca los tokens de la sesión, también en las dependencias asíncronas
+def test_logout_revokes_tokens(service):
+    service, _ = service
+    tokens = owner_tokens(service)
+
+    service.logout(tokens["access_token"], tokens["refresh_token"])
+
+    with pytest.raises(HTTPException):
+        auths.get_current_user(db=None, token=tokens["access_token"])
+    with pytest.raises(HTTPException):
+        asyncio.run(auths.get_current_user_async(db=None, token=tokens["access_token"]))
+    with pytest.raises(HTTPException):
+        service.refresh(tokens["refresh_token"])
+
+# Test para 'update_user': revoca los tokens emitidos antes del cambio
+def test_update_user_revokes_tokens(service):
+    service, _ = service
+    tokens = owner_tokens(service)
+
+    service.update_user(1, UserUpdateAdmin(role="assistant"))
+
+    with pytest.raises(HTTPException):
+        auths.get_current_user(db=None, token=tokens["access_token"])
+    with pytest.raises(HTTPException):
+        service.refresh(tokens["refresh_token"])
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from services.capacity_services import CapacityBroadcaster, publish_remaining_capacity
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+# Test del stream: valor inicial, actualización publicada y una sola suscripción
+def test_stream_fans_out_updates(server):
+    publisher = fakeredis.FakeRedis(server=server, decode_responses=True)
+    broadcaster = CapacityBroadcaster("redis://fake")
+
+    async def scenario():
+        with patch(
+            "services.capacity_services.AsyncRedis.from_url",
+            return_value=fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        ):
+            first = broadcaster.stream(1, 10)
+            second = broadcaster.stream(1, 10)
+            initial = [await first.__anext__(), await second.__anext__()]
+
+            # Dos clientes comparten un único canal suscrito
+            assert list(broadcaster._queues) == ["event:capacity:1"]
+            assert len(broadcaster._queues["event:capacity:1"]) == 2
+
+            next_first = asyncio.ensure_future(first.__anext__())
+            next_second = asyncio.ensure_future(second.__anext__())
+            await asyncio.sleep(0.1)
+            publish_remaining_capacity(publisher, 1, 9)
+            updates = await asyncio.wait_for(asyncio.gather(next_first, next_second), 5)
+
+            await first.aclose()
+            await second.aclose()
+            await asyncio.sleep(0.1)
+            return initial, updates
+
+    initial, updates = asyncio.run(scenario())
+
+    assert initial[0] == 'event: capacity\ndata: {"event_id": 1, "remaining": 10}\n\n'
+    for frame in updates:
+        data = json.loads(frame.split("data: ")[1])
+        assert data == {"event_id": 1, "remaining": 9}
+    # Al desconectarse el último cliente se libera el canal
+    assert broadcaster._queues == {}
+
+# Test para 'publish_remaining_capacity': un fallo de Redis no se propaga tras el commit
+def test_publish_remaining_capacity_redis_down():
+    broken = fakeredis.FakeRedis(connected=False)
+
+    publish_remaining_capacity(broken, 1, 9)
+
+# Test para '_listen': tras una caída de Redis se reconecta y vuelve a suscribirse
+def test_stream_reconnects_after_redis_error(server, caplog):
+    publisher = fakeredis.FakeRedis(server=server, decode_responses=True)
+    broadcaster = CapacityBroadcaster("redis://fake")
+
+    async def scenario():
+        with patch(
+            "services.capacity_services.AsyncRedis.from_url",
+            side_effect=lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        ), patch("services.capacity_services.RECONNECT_INITIAL_DELAY_SECONDS", 0.05):
+            stream = broadcaster.stream(1, 10)
+            await stream.__anext__()
+            listener = broadcaster._listener
+
+            # Redis cae y vuelve: el listener sigue vivo
+            server.connected = False
+            await asyncio.sleep(0.3)
+            server.connected = True
+            await asyncio.sleep(0.3)
+            assert broadcaster._listener is listener and not listener.done()
+
+            next_frame = asyncio.ensure_future(stream.__anext__())
+            publish_remaining_capacity(publisher, 1, 9)
+            frame = await asyncio.wait_for(next_frame, 5)
+            await stream.aclose()
+            return frame
+
+    frame = asyncio.run(scenario())
+
+    assert "Capacity updates interrupted" in caplog.text
+    assert json.loads(frame.split("data: ")[1]) == {"event_id": 1, "remaining": 9}
@@ -0,0 +1,85 @@
+import asyncio
+import itertools
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+import db.config
+from db.config import Base, RoutingSession, create_pooled_async_engine, get_async_read_db, pool_options
+from models.category import CategoryModel
+
+pytest.importorskip("aiosqlite")
+
+# Crea una base en memoria con una categoría que identifica a la base
+async def make_engine(name):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(CategoryModel).values(name=name))
+    return engine
+
+# Ejecuta la prueba con un primario y dos réplicas simuladas
+def run(test, monkeypatch):
+    async def main():
+        primary = await make_engine("primary")
+        replicas = [await make_engine("replica-1"), await make_engine("replica-2")]
+        monkeypatch.setattr(db.config, "replica_engines", replicas)
+        monkeypatch.setattr(db.config, "_next_replica", itertools.cycle(replicas))
+        monkeypatch.setattr(
+            db.config,
+            "AsyncReadSessionLocal",
+            async_sessionmaker(primary, sync_session_class=RoutingSession, expire_on_commit=False),
+        )
+        try:
+            return await test(primary)
+        finally:
+            for engine in [primary, *replicas]:
+                await engine.dispose()
+
+    return asyncio.run(main())
+
+# Lee el nombre de la base a la que apunta una sesión de lectura
+async def read_from(consistency=None):
+    dependency = get_async_read_db(consistency)
+    session = await anext(dependency)
+    try:
+        return await session.scalar(select(CategoryModel.name).order_by(CategoryModel.id))
+    finally:
+        await dependency.aclose()
+
+# Test para 'get_async_read_db': rota las réplicas en orden
+def test_reads_round_robin(monkeypatch):
+    async def test(primary):
+        return [await read_from() for _ in range(3)]
+
+    assert run(test, monkeypatch) == ["replica-1", "replica-2", "replica-1"]
+
+# Test para 'get_async_read_db': la cabecera fuerza la lectura del primario
+def test_primary_consistency(monkeypatch):
+    async def test(primary):
+        return await read_from("primary")
+
+    assert run(test, monkeypatch) == "primary"
+
+# Test para 'RoutingSession': las escrituras van al primario
+def test_writes_go_to_primary(monkeypatch):
+    async def test(primary):
+        dependency = get_async_read_db(None)
+        session = await anext(dependency)
+        session.add(CategoryModel(name="written"))
+        await session.commit()
+        await dependency.aclose()
+
+        async with primary.connect() as conn:
+            return (await conn.execute(select(CategoryModel.name).order_by(CategoryModel.id))).scalars().all()
+
+    assert run(test, monkeypatch) == ["primary", "written"]
+
+# Test para 'pool_options': SQLite conserva el pool de su dialecto, que no acepta tamaño ni timeout
+def test_pool_options_sqlite():
+    assert "pool_size" not in pool_options("sqlite://")
+    assert "pool_timeout" not in pool_options("sqlite+aiosqlite:///app.db")
+    assert pool_options("postgresql+asyncpg://u:p@localhost/d")["pool_size"] == db.config.DB_POOL_SIZE
+
+    engine = create_pooled_async_engine("sqlite+aiosqlite://")
+    assert isinstance(engine.pool, StaticPool)
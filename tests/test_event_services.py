@@ -0,0 +1,312 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from db.config import Base
+from models.category import CategoryModel
+from models.event import EventModel, EventTicketModel, TicketHoldModel
+from models.location import CityModel, CountryModel
+from models.user import UserModel
+from schemas.event import EventUpdate
+from services.event_services import EventServiceHandler
+
+# Sesión de base de datos simulada
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    return db
+
+@pytest.fixture
+def event_service(mock_db):
+    return EventServiceHandler(db=mock_db)
+
+# Test para 'reserve_seats' cuando hay cupo
+def test_reserve_seats(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = (1,)
+
+    assert event_service.reserve_seats(1) == 1
+
+    # La reserva debe ser un único UPDATE condicional sobre el contador
+    stmt = str(mock_db.execute.call_args[0][0])
+    assert stmt.startswith("UPDATE event SET tickets_sold=(event.tickets_sold + ")
+    assert "event.tickets_sold + :tickets_sold_2 <= event.capacity" in stmt
+    assert "RETURNING" in stmt
+    mock_db.execute.assert_called_once()
+
+# Test para 'reserve_seats' cuando el evento está agotado
+def test_reserve_seats_sold_out(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = None
+
+    assert event_service.reserve_seats(1) is None
+    mock_db.commit.assert_not_called()
+
+# Test para 'create_ticket'
+def test_create_ticket(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = (1,)
+    user = UserModel(id=7)
+
+    ticket = event_service.create_ticket(1, user)
+
+    assert isinstance(ticket, EventTicketModel)
+    assert ticket.event_id == 1
+    assert ticket.user_id == 7
+    mock_db.add.assert_called_once_with(ticket)
+    mock_db.commit.assert_called_once()
+
+# Test para 'create_ticket' con el evento agotado
+def test_create_ticket_sold_out(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = None
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.create_ticket(1, UserModel(id=7))
+
+    assert exc.value.status_code == 409
+    mock_db.add.assert_not_called()
+    mock_db.rollback.assert_called_once()
+
+# Test para 'issue_tickets' con más solicitudes que cupos
+def test_issue_tickets_partial(event_service, mock_db):
+    # Evento sin límite por usuario y con 2 cupos disponibles: cada solicitud es un ticket
+    mock_db.execute.return_value.scalar.side_effect = [False, 2, 0]
+
+    winners, already_issued, remaining = event_service.issue_tickets(1, [10, 10, 12])
+
+    assert winners == [10, 10]
+    assert already_issued == set()
+    assert remaining == 0
+    # Marca del evento, SELECT ... FOR UPDATE, UPDATE del contador e INSERT multi-fila
+    assert mock_db.execute.call_count == 4
+    rows = mock_db.execute.call_args[0][1]
+    assert rows == [
+        {"event_id": 1, "user_id": 10, "one_per_user": False},
+        {"event_id": 1, "user_id": 10, "one_per_user": False},
+    ]
+    mock_db.commit.assert_called_once()
+
+# Test para 'issue_tickets' en un evento de un ticket por usuario con usuarios repetidos o que ya tienen ticket
+def test_issue_tickets_skips_duplicates(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value = [10]
+    mock_db.execute.return_value.scalar.side_effect = [True, 5, 3]
+
+    winners, already_issued, remaining = event_service.issue_tickets(1, [10, 11, 11, 12])
+
+    assert winners == [11, 12]
+    # Ni quien ya tenía ticket ni los ganadores pueden recibir otro
+    assert already_issued == {10, 11, 12}
+    assert remaining == 3
+    rows = mock_db.execute.call_args[0][1]
+    assert rows == [
+        {"event_id": 1, "user_id": 11, "one_per_user": True},
+        {"event_id": 1, "user_id": 12, "one_per_user": True},
+    ]
+
+# Test para 'issue_tickets' con el evento agotado
+def test_issue_tickets_sold_out(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value = []
+    mock_db.execute.return_value.scalar.return_value = 0
+
+    assert event_service.issue_tickets(1, [10, 11]) == ([], set(), 0)
+    # Sin cupo no hay UPDATE ni INSERT
+    assert mock_db.execute.call_count == 2
+
+# Test para 'create_ticket' cuando el usuario ya tiene ticket
+def test_create_ticket_already_issued(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = (1,)
+    mock_db.commit.side_effect = IntegrityError("INSERT", {}, Exception())
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.create_ticket(1, UserModel(id=7))
+
+    assert exc.value.status_code == 409
+    # El rollback deshace también la reserva del cupo
+    mock_db.rollback.assert_called_once()
+
+# Test para 'create_hold' cuando el usuario ya tiene ticket
+def test_create_hold_already_issued(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = (1,)
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.create_hold(1, UserModel(id=7))
+
+    assert exc.value.status_code == 409
+    # No se reserva ningún cupo
+    mock_db.execute.assert_called_once()
+    mock_db.add.assert_not_called()
+
+# Test para 'create_hold' con el evento agotado
+def test_create_hold_sold_out(event_service, mock_db):
+    mock_db.execute.return_value.first.side_effect = [None, None]
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.create_hold(1, UserModel(id=7))
+
+    assert exc.value.detail == "Event sold out"
+    mock_db.rollback.assert_called_once()
+
+# Test para 'confirm_hold' con una retención vencida o inexistente
+def test_confirm_hold_not_found(event_service, mock_db):
+    mock_db.execute.return_value.scalar.return_value = None
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.confirm_hold(1, UserModel(id=7))
+
+    assert exc.value.status_code == 404
+    mock_db.add.assert_not_called()
+
+# Test para 'release_expired_holds': libera todo en dos sentencias
+def test_release_expired_holds(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value = [1, 1, 2]
+    mock_db.execute.return_value.all.return_value = [(1, 2), (2, 1)]
+
+    assert event_service.release_expired_holds() == {1: 2, 2: 1}
+
+    # Un DELETE ... RETURNING y un único UPDATE para todos los eventos
+    assert mock_db.execute.call_count == 2
+    stmt = str(mock_db.execute.call_args[0][0])
+    assert stmt.startswith("UPDATE event SET tickets_sold=(event.tickets_sold - CASE event.id")
+    mock_db.commit.assert_called_once()
+
+# Test para 'release_expired_holds' sin retenciones vencidas
+def test_release_expired_holds_none(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value = []
+
+    assert event_service.release_expired_holds() == {}
+    mock_db.execute.assert_called_once()
+
+# Test para 'cancel_ticket' cuando el usuario no tiene ticket
+def test_cancel_ticket_not_found(event_service, mock_db):
+    mock_db.execute.return_value.first.return_value = None
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.cancel_ticket(1, UserModel(id=7))
+
+    assert exc.value.status_code == 404
+    mock_db.commit.assert_not_called()
+
+# Test para 'cancel_ticket' con sucesor: el cupo pasa al sucesor sin liberarse
+def test_cancel_ticket_to_successor(event_service, mock_db):
+    mock_db.execute.return_value.scalar.return_value = 0
+
+    assert event_service.cancel_ticket(1, UserModel(id=7), successor_id=8) == 0
+
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert statements[0].startswith("DELETE FROM event_ticket")
+    assert statements[1].startswith("INSERT INTO event_ticket")
+    # El contador tickets_sold no cambia
+    assert not any(stmt.startswith("UPDATE event") for stmt in statements)
+    mock_db.commit.assert_called_once()
+
+# Test para 'update_event' con una capacidad menor a los tickets vendidos
+def test_update_event_capacity_below_sold(event_service, mock_db):
+    mock_db.query.return_value.filter.return_value.first.return_value = EventModel(
+        id=1, owner_id=7, capacity=5, tickets_sold=3
+    )
+    mock_db.execute.return_value.first.return_value = None
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.update_event(1, EventUpdate(capacity=2), UserModel(id=7))
+
+    assert exc.value.status_code == 409
+    mock_db.commit.assert_not_called()
+
+# Test para 'register_sessions': una sola reserva y un INSERT multi-fila
+def test_register_sessions(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value.all.return_value = [1, 2]
+
+    assert event_service.register_sessions(1, [1, 2, 1], UserModel(id=7)) == [1, 2]
+
+    assert mock_db.execute.call_count == 2
+    rows = mock_db.execute.call_args[0][1]
+    assert rows == [{"session_id": 1, "user_id": 7}, {"session_id": 2, "user_id": 7}]
+    mock_db.commit.assert_called_once()
+
+# Test para 'register_sessions' cuando una de las sesiones está llena
+def test_register_sessions_full(event_service, mock_db):
+    mock_db.execute.return_value.scalars.return_value.all.return_value = [1]
+    mock_db.execute.return_value.scalar.return_value = 2
+
+    with pytest.raises(HTTPException) as exc:
+        event_service.register_sessions(1, [1, 2], UserModel(id=7))
+
+    assert exc.value.detail == "One or more sessions are full"
+    # No se registra ninguna sesión
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.assert_not_called()
+
+# Test para 'reserve_available_seats' cuando otra transacción cambió el contador
+def test_reserve_available_seats_retries(event_service, mock_db):
+    # Quedaban 2 cupos, pero el UPDATE condicional no aplica y al releer queda 1
+    mock_db.execute.return_value.scalar.side_effect = [2, None, 1, 0]
+
+    assert event_service.reserve_available_seats(1, 3) == (1, 0)
+    assert mock_db.execute.call_count == 4
+
+# Base SQLite con un owner y dos eventos de 5 cupos: el 1 de un ticket por usuario y el 2 sin límite
+@pytest.fixture
+def sqlite_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tickets.db'}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add_all([
+            CountryModel(id=1, name="Colombia", code="CO"),
+            CityModel(id=1, name="Bogota", country_id=1),
+            CategoryModel(id=1, name="Music"),
+            UserModel(id=1, fullname="Owner", email="owner@test.com", role="OWNER", hashed_password="x"),
+        ])
+        db.add_all([
+            EventModel(
+                id=event_id, name="Event", description="d", date=datetime(2030, 1, 1), capacity=5,
+                status="CREATED", location_id=1, category_id=1, owner_id=1, one_ticket_per_user=flag,
+            )
+            for event_id, flag in [(1, True), (2, False)]
+        ])
+        db.commit()
+
+    with SessionLocal() as db:
+        yield db
+    engine.dispose()
+
+# Test para el límite de un ticket por usuario: solo aplica a los eventos que lo activan
+def test_one_ticket_per_user(sqlite_db):
+    service = EventServiceHandler(sqlite_db)
+    user = sqlite_db.get(UserModel, 1)
+
+    assert service.create_ticket(1, user).one_per_user is True
+    with pytest.raises(HTTPException) as exc:
+        service.create_ticket(1, user)
+    assert exc.value.status_code == 409
+    assert service.issue_tickets(1, [1, 1]) == ([], {1}, 4)
+
+    # Sin el límite, cada compra es un ticket más y cancelar devuelve solo uno
+    service.create_ticket(2, user)
+    assert service.issue_tickets(2, [1, 1]) == ([1, 1], set(), 2)
+    assert service.cancel_ticket(2, user) == 3
+    tickets = sqlite_db.execute(
+        select(func.count()).where(EventTicketModel.event_id == 2, EventTicketModel.user_id == 1)
+    ).scalar()
+    assert tickets == 2
+
+# Test para las retenciones: el vencimiento se guarda y compara en UTC
+def test_hold_expiry(sqlite_db):
+    service = EventServiceHandler(sqlite_db)
+    user = sqlite_db.get(UserModel, 1)
+
+    hold, remaining = service.create_hold(1, user)
+    assert remaining == 4
+    assert service.release_expired_holds() == {}
+    assert service.confirm_hold(hold.id, user).event_id == 1
+    # Como en otra petición: la retención borrada no sigue en la sesión
+    sqlite_db.expunge(hold)
+
+    hold, _ = service.create_hold(2, user)
+    sqlite_db.execute(
+        update(TicketHoldModel)
+        .where(TicketHoldModel.id == hold.id)
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    sqlite_db.commit()
+    assert service.release_expired_holds() == {2: 5}
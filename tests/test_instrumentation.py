@@ -0,0 +1,110 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from db.instrumentation import QueryStats, install_query_counter, install_slow_query_log, request_query_stats
+from utils.middleware import QueryStatsMiddleware, RouteQueryStats
+
+# Motor SQLite en memoria para medir sentencias reales
+def make_engine(threshold_ms, sample_rate=1.0):
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine, threshold_ms, sample_rate)
+    return engine
+
+# Test para 'install_slow_query_log': registra las sentencias lentas
+def test_logs_slow_queries(caplog):
+    engine = make_engine(threshold_ms=0)
+
+    with caplog.at_level(logging.WARNING, logger="db.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT  1"))
+
+    record = caplog.records[-1]
+    assert record.statement == "SELECT 1"
+    assert record.duration_ms >= 0
+
+# Test para 'install_slow_query_log': ignora las sentencias rápidas
+def test_skips_fast_queries(caplog):
+    engine = make_engine(threshold_ms=60_000)
+
+    with caplog.at_level(logging.WARNING, logger="db.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    assert caplog.records == []
+
+# Test para 'install_slow_query_log' con muestreo desactivado
+def test_sampling(caplog):
+    engine = make_engine(threshold_ms=0, sample_rate=0)
+
+    with caplog.at_level(logging.WARNING, logger="db.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    assert caplog.records == []
+
+# Test para 'install_query_counter': solo cuenta las sentencias de una petición
+def test_query_counter_outside_request():
+    engine = create_engine("sqlite://")
+    install_query_counter(engine)
+    stats = QueryStats(track_statements=True)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        token = request_query_stats.set(stats)
+        try:
+            conn.execute(text("SELECT  2"))
+        finally:
+            request_query_stats.reset(token)
+
+    assert stats.count == 1
+    assert stats.statements == ["SELECT 2"]
+
+# App con un endpoint síncrono que ejecuta 'count' consultas
+def make_app(budget):
+    engine = create_engine("sqlite://")
+    install_query_counter(engine)
+    stats = RouteQueryStats()
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, budget=budget, stats=stats)
+
+    @app.get("/items/{count}")
+    def items(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text(f"SELECT {i}"))
+        return {}
+
+    return app, stats
+
+# Test para 'QueryStatsMiddleware': cabecera Server-Timing y totales por ruta
+def test_query_stats_middleware():
+    app, stats = make_app(budget=0)
+    client = TestClient(app)
+
+    response = client.get("/items/3")
+    client.get("/items/1")
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="3 queries"')
+    totals = stats.snapshot()["GET /items/{count}"]
+    assert totals["requests"] == 2 and totals["queries"] == 4 and totals["max_queries"] == 3
+
+    # Las URL sin ruta comparten una sola entrada
+    client.get("/missing/1")
+    client.get("/missing/2")
+    assert set(stats.snapshot()) == {"GET /items/{count}", "GET unmatched"}
+
+# Test para 'QueryStatsMiddleware': registra las peticiones que superan el presupuesto
+def test_query_budget_log(caplog):
+    app, _ = make_app(budget=2)
+    client = TestClient(app)
+
+    with caplog.at_level(logging.WARNING, logger="db.query_budget"):
+        client.get("/items/2")
+        client.get("/items/3")
+
+    [record] = caplog.records
+    assert record.route == "GET /items/{count}"
+    assert record.query_count == 3
+    assert record.statements == ["SELECT 0", "SELECT 1", "SELECT 2"]
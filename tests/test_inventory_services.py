@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from models.event import EventModel
+from services.inventory_services import TicketInventoryHandler
+
+# Los scripts Lua se ejecutan contra un Redis en memoria
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    # El evento tiene capacidad 3 y 1 ticket vendido
+    db.query.return_value.filter.return_value.first.return_value = EventModel(
+        id=1, capacity=3, tickets_sold=1
+    )
+    return db
+
+@pytest.fixture
+def inventory(redis_client, mock_db):
+    return TicketInventoryHandler(redis_client, mock_db)
+
+# Test para 'reserve': carga el inventario desde la base de datos la primera vez
+def test_reserve_loads_inventory(inventory, redis_client, mock_db):
+    inventory.reserve(1)
+
+    assert redis_client.get("ticket:inventory:1") == "1"
+    assert redis_client.get("ticket:inventory:pending:1") == "1"
+    assert redis_client.smembers(TicketInventoryHandler.EVENTS_KEY) == {"1"}
+
+    # La segunda reserva ya no consulta Postgres
+    inventory.reserve(1)
+    mock_db.query.assert_called_once()
+
+# Test para 'reserve' con el evento agotado
+def test_reserve_sold_out(inventory, redis_client):
+    inventory.reserve(1)
+    inventory.reserve(1)
+
+    with pytest.raises(HTTPException) as exc:
+        inventory.reserve(1)
+
+    assert exc.value.status_code == 409
+    assert redis_client.get("ticket:inventory:1") == "0"
+
+# Test para 'confirm' y 'release'
+def test_confirm_and_release(inventory, redis_client):
+    inventory.reserve(1)
+    inventory.reserve(1)
+
+    inventory.confirm(1)
+    inventory.release(1)
+
+    assert redis_client.get("ticket:inventory:1") == "1"
+    assert redis_client.get("ticket:inventory:pending:1") == "0"
+
+# Test para 'reconcile': descuenta las reservas pendientes de persistir
+def test_reconcile(inventory, redis_client, mock_db):
+    inventory.reserve(1)
+    redis_client.set("ticket:inventory:1", 5)
+    mock_db.execute.return_value.all.return_value = [(1, 2)]
+
+    drift = inventory.reconcile()
+
+    # 2 cupos libres en Postgres (capacity - tickets_sold) - 1 reserva pendiente
+    assert redis_client.get("ticket:inventory:1") == "1"
+    assert drift == {1: -4}
+
+# Test para 'reconcile': una reserva confirmada mientras se leía Postgres no sube el contador
+def test_reconcile_during_confirm(inventory, redis_client, mock_db):
+    inventory.reserve(1)
+    inventory.reserve(1)
+
+    def persist_during_read(*args):
+        # El ticket se persiste después de leer Postgres, que aún no lo cuenta
+        inventory.confirm(1)
+        result = MagicMock()
+        result.all.return_value = [(1, 2)]
+        return result
+
+    mock_db.execute.side_effect = persist_during_read
+    redis_client.set("ticket:inventory:1", 0)
+
+    # 2 cupos libres - 1 reserva pendiente daría un cupo que no existe
+    assert inventory.reconcile() == {}
+    assert redis_client.get("ticket:inventory:1") == "0"
+
+# Test para 'reconcile' con eventos eliminados
+def test_reconcile_drops_missing_events(inventory, redis_client, mock_db):
+    inventory.reserve(1)
+    mock_db.execute.return_value.all.return_value = []
+
+    assert inventory.reconcile() == {}
+    assert not redis_client.exists("ticket:inventory:1")
+    assert redis_client.smembers(TicketInventoryHandler.EVENTS_KEY) == set()
@@ -0,0 +1,99 @@
+import urllib.request
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from db.instrumentation import PoolMetrics, QueryStats
+from services.ticket_services import TicketRequestHandler
+from utils.enums import TicketRequestStatusEnum
+from utils.metrics import build_registry, start_metrics_server
+from utils.middleware import MetricsMiddleware, RouteQueryStats
+
+fakeredis = pytest.importorskip("fakeredis")
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+def outcome_count(outcome):
+    return REGISTRY.get_sample_value("ticket_request_outcomes_total", {"outcome": outcome}) or 0
+
+# Test para 'record_outcomes': cuenta los resultados de las solicitudes de tickets
+def test_record_outcomes_counts(redis_client):
+    ticket_requests = TicketRequestHandler(redis_client)
+    before = {outcome: outcome_count(outcome) for outcome in ["created", "waitlisted", "error"]}
+
+    ticket_requests.record_outcomes({
+        "a": TicketRequestStatusEnum.CREATED,
+        "b": TicketRequestStatusEnum.CREATED,
+        "c": TicketRequestStatusEnum.WAITLISTED,
+    })
+    ticket_requests.record_outcome("d", TicketRequestStatusEnum.ERROR)
+
+    assert outcome_count("created") - before["created"] == 2
+    assert outcome_count("waitlisted") - before["waitlisted"] == 1
+    assert outcome_count("error") - before["error"] == 1
+
+# Test para 'PoolMetrics': expone las conexiones en uso del pool
+def test_pool_metrics():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    registry = CollectorRegistry()
+    registry.register(PoolMetrics({"sync": engine}))
+
+    with engine.connect():
+        assert registry.get_sample_value("db_pool_size", {"engine": "sync"}) == 2
+        assert registry.get_sample_value("db_pool_checked_out", {"engine": "sync"}) == 1
+
+# Test para 'RouteQueryStats': expone las consultas de cada ruta como contadores
+def test_route_query_stats_collect():
+    stats = RouteQueryStats()
+    query_stats = QueryStats()
+    query_stats.count, query_stats.duration_ms = 3, 1500.0
+    stats.record("GET /api/event/{event_id}", query_stats)
+    registry = CollectorRegistry()
+    registry.register(stats)
+
+    labels = {"method": "GET", "route": "/api/event/{event_id}"}
+    assert registry.get_sample_value("db_queries_total", labels) == 3
+    assert registry.get_sample_value("db_query_seconds_total", labels) == 1.5
+
+# Test para 'MetricsMiddleware': mide la latencia por plantilla de ruta
+def test_metrics_middleware():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {}
+
+    TestClient(app).get("/items/7")
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) == 1
+
+# Test para 'build_registry': en modo multiproceso une las muestras de los procesos
+def test_build_registry_multiprocess(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    stats = RouteQueryStats()
+    stats.record("GET /items", QueryStats())
+
+    registry = build_registry(stats)
+
+    assert registry is not REGISTRY
+    assert registry.get_sample_value("db_queries_total", {"method": "GET", "route": "/items"}) == 0
+
+# Test para 'start_metrics_server': el worker expone las métricas por HTTP
+def test_metrics_server():
+    registry = CollectorRegistry()
+    Gauge("workers", "Workers.", registry=registry).set(2)
+    server = start_metrics_server(registry, port=0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+
+    assert "workers 2.0" in body
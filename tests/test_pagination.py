@@ -0,0 +1,44 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from models.event import EventModel
+from utils.pagination import KeysetPage, decode_cursor, encode_cursor
+
+# Test para 'encode_cursor' y 'decode_cursor': conservan los tipos de la clave
+def test_cursor_round_trip():
+    key = [datetime(2030, 1, 1, 20, 30), 42]
+    cursor = encode_cursor(key)
+
+    assert decode_cursor(cursor, [EventModel.date, EventModel.id]) == key
+
+# Test para 'decode_cursor' con cursores inválidos o de otra clave
+@pytest.mark.parametrize("cursor", ["zz", "bm90LWpzb24", encode_cursor([1]), encode_cursor(["x", "y"])])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, [EventModel.date, EventModel.id])
+
+    assert exc.value.status_code == 400
+
+# Test para 'KeysetPage.split': el cursor apunta a la última fila de la página
+def test_split_returns_next_cursor():
+    rows = [EventModel(id=i, date=datetime(2030, 1, i)) for i in range(1, 4)]
+    page = KeysetPage([EventModel.date, EventModel.id], limit=2)
+
+    items, cursor = page.split(rows)
+
+    assert items == rows[:2]
+    assert decode_cursor(cursor, page.columns) == [datetime(2030, 1, 2), 2]
+    assert page.split(rows[:2]) == (rows[:2], None)
+
+# Test para 'KeysetPage': un cursor no se combina con un offset
+def test_cursor_with_offset():
+    cursor = encode_cursor([datetime(2030, 1, 1), 1])
+
+    with pytest.raises(HTTPException) as exc:
+        KeysetPage([EventModel.date, EventModel.id], cursor, limit=2, offset=5)
+
+    assert exc.value.status_code == 400
+    # Sin cursor el offset se aplica a la primera página
+    query = KeysetPage([EventModel.date, EventModel.id], limit=2, offset=5).apply(select(EventModel))
+    assert "OFFSET" in str(query)
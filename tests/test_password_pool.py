@@ -0,0 +1,72 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from db.config import Base
+import models.category, models.event, models.location  # Tablas relacionadas con UserModel
+from models.user import UserModel
+from services.user_services import AsyncUserServiceHandler
+from utils.constants import BCRYPT_ROUNDS
+from utils.password_pool import PasswordPool, hash_password, pwd_context, verify_password
+
+# Pool de un proceso compartido por los tests
+@pytest.fixture(scope="module")
+def pool():
+    pool = PasswordPool(workers=1, max_pending=0)
+    yield pool
+    pool.shutdown()
+
+# Test para 'PasswordPool': hashea y verifica en otro proceso
+def test_password_pool_hash_and_verify(pool):
+    hashed = pool.run(hash_password, "secret")
+
+    assert pwd_context.verify("secret", hashed)
+    assert asyncio.run(pool.run_async(verify_password, "secret", hashed)) is True
+    assert asyncio.run(pool.run_async(verify_password, "wrong", hashed)) is False
+
+# Test para 'PasswordPool': rechaza con 503 cuando no quedan huecos y los libera al terminar
+def test_password_pool_fails_fast_when_saturated(pool):
+    running = pool.submit(time.sleep, 0.5)
+
+    with pytest.raises(HTTPException) as exc:
+        pool.submit(time.sleep, 0)
+    running.result()
+
+    assert exc.value.status_code == 503 and exc.value.headers == {"Retry-After": "1"}
+    assert pool.run(hash_password, "secret")
+
+# Test para 'AsyncUserServiceHandler.login': verifica la contraseña en el pool y actualiza su coste
+def test_async_login(monkeypatch, pool):
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setattr("services.auth_services.password_pool", pool)
+    low_cost_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def login():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with SessionLocal() as db:
+            db.add(UserModel(
+                fullname="Owner", email="owner@test.com", role="OWNER", hashed_password=low_cost_hash
+            ))
+            await db.commit()
+            service = AsyncUserServiceHandler(db)
+            tokens = await service.login("owner@test.com", "secret")
+            with pytest.raises(HTTPException) as exc:
+                await service.login("owner@test.com", "wrong")
+            with pytest.raises(HTTPException):
+                await service.login("nobody@test.com", "secret")
+            stored_hash = await db.scalar(select(UserModel.hashed_password))
+        await engine.dispose()
+        return tokens, exc.value, stored_hash
+
+    tokens, error, stored_hash = asyncio.run(login())
+
+    assert tokens["token_type"] == "bearer"
+    assert error.status_code == 401
+    assert stored_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$") and pwd_context.verify("secret", stored_hash)
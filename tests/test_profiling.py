@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from collections import Counter
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from utils.middleware import PROFILE_HEADER, ProfilingMiddleware
+from utils.profiling import ContinuousProfiler, ProfileStore, StackSampler
+
+# Trabajo de CPU que aparece en las muestras
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+# Test para 'StackSampler': muestrea los hilos en ejecución
+def test_stack_sampler():
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    worker = threading.Thread(target=busy, args=(0.1,))
+    worker.start()
+    worker.join()
+    sampler.stop()
+
+    stacks = sampler.drain()
+
+    assert any(";busy (tests/test_profiling.py:" in stack for stack in stacks)
+    assert sampler.drain() == Counter()
+
+# Test para 'ProfileStore': rechaza nombres fuera del directorio y conserva los más recientes
+def test_profile_store(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    for i in range(3):
+        store.save(f"request-{i}.collapsed", Counter({"main;busy": i + 1}))
+        os.utime(tmp_path / f"request-{i}.collapsed", (i, i))
+
+    store.prune("request-", keep=2)
+
+    assert store.list() == ["request-2.collapsed", "request-1.collapsed"]
+    assert store.read("request-2.collapsed") == "main;busy 3\n"
+    for name in ["../secret.collapsed", "request-0.collapsed"]:
+        with pytest.raises(HTTPException) as exc:
+            store.read(name)
+        assert exc.value.status_code == 404
+
+# App con el middleware de perfilado; solo el token "admin" puede perfilar
+def make_client(tmp_path):
+    async def authorize(request: Request):
+        if request.headers.get("authorization") != "Bearer admin":
+            raise HTTPException(status_code=403, detail="No has permission")
+
+    store = ProfileStore(str(tmp_path))
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, interval=0.001, authorize=authorize)
+
+    @app.get("/slow")
+    def slow():
+        busy(0.05)
+        return {}
+
+    return TestClient(app), store
+
+# Test para 'ProfilingMiddleware': guarda el perfil de la petición de un administrador
+def test_profiling_middleware(tmp_path):
+    client, store = make_client(tmp_path)
+
+    response = client.get("/slow", headers={"X-Profile": "1", "Authorization": "Bearer admin"})
+    profile = store.read(response.headers[PROFILE_HEADER])
+
+    assert response.status_code == 200
+    assert "slow (tests/test_profiling.py:" in profile
+    assert store.list() == [response.headers[PROFILE_HEADER]]
+
+# Test para 'ProfilingMiddleware': sin la marca o sin ser administrador se atiende sin perfilar
+def test_profiling_middleware_not_requested_or_forbidden(tmp_path):
+    client, store = make_client(tmp_path)
+
+    plain = client.get("/slow", headers={"Authorization": "Bearer admin"})
+    forbidden = client.get("/slow", params={"profile": "1"}, headers={"Authorization": "Bearer owner"})
+
+    assert plain.status_code == 200 and PROFILE_HEADER not in plain.headers
+    assert forbidden.status_code == 200 and PROFILE_HEADER not in forbidden.headers
+    assert store.list() == []
+
+# Test para 'ContinuousProfiler': escribe una ventana de pilas al detenerse
+def test_continuous_profiler(tmp_path):
+    profiler = ContinuousProfiler(ProfileStore(str(tmp_path)), interval=0.001, window=60, retained=1)
+    profiler.start()
+    busy(0.05)
+    profiler.stop()
+
+    [name] = profiler.store.list()
+
+    assert name.startswith(f"sampler-{os.getpid()}-")
+    assert ";busy (tests/test_profiling.py:" in profiler.store.read(name)
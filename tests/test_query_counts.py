@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from db.config import Base, get_async_db, get_async_read_db, get_db
+from main import app
+from models.category import CategoryModel
+from models.event import EventModel, SessionModel
+from models.location import CityModel, CountryModel
+from models.user import UserModel
+from services.event_services import EventServiceHandler
+from tests.query_counter import assert_num_queries, count_queries
+from utils.auths import get_current_active_user, get_current_active_user_async
+
+pytest.importorskip("aiosqlite")
+
+# Agrega eventos de la ciudad 1 a la base
+def add_events(SessionLocal, count):
+    with SessionLocal() as db:
+        db.add_all([
+            EventModel(
+                name=f"Event {i}", description="d", date=datetime(2030, 1, 1 + i % 28), capacity=10,
+                status="CREATED", location_id=1, category_id=1, owner_id=1,
+            )
+            for i in range(count)
+        ])
+        db.commit()
+
+# Cliente de la API sobre una base SQLite con datos de ejemplo, autenticado como owner
+@pytest.fixture
+def api(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url)
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(engine, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    with SessionLocal() as db:
+        db.add_all([
+            CountryModel(id=1, name="Colombia", code="CO"),
+            CityModel(id=1, name="Bogota", country_id=1),
+            CategoryModel(id=1, name="Music"),
+            UserModel(id=1, fullname="Owner", email="owner@test.com", role="OWNER", hashed_password="x"),
+        ])
+        db.commit()
+        owner = db.get(UserModel, 1)
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides.update({
+        get_db: override_get_db,
+        get_async_db: override_get_async_db,
+        get_async_read_db: override_get_async_db,
+        get_current_active_user: lambda: owner,
+        get_current_active_user_async: lambda: owner,
+    })
+    try:
+        with TestClient(app) as client:
+            yield client, SessionLocal, (engine, async_engine)
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+
+# Test para 'list_events': el número de consultas no depende del número de eventos
+def test_list_events_constant_queries(api):
+    client, SessionLocal, engines = api
+    counts = []
+    for added, count in [(10, 10), (90, 100)]:
+        add_events(SessionLocal, added)
+        with count_queries(*engines) as statements:
+            response = client.get("/api/event", params={"limit": 100})
+        assert response.status_code == 200
+        assert len(response.json()) == count
+        assert response.json()[0]["location"]["country"]["code"] == "CO"
+        counts.append(len(statements))
+
+    assert counts == [1, 1]
+
+# Test para los endpoints que devuelven eventos y ciudades con sus relaciones
+def test_event_endpoints_query_budget(api):
+    client, SessionLocal, engines = api
+    payload = {
+        "name": "Concert", "description": "d", "date": "2030-01-01T20:00:00", "capacity": 10,
+        "status": "created", "location_id": 1, "category_id": 1, "owner_id": 1,
+    }
+
+    # INSERT y la recarga del evento con su ubicación y país
+    with assert_num_queries(2, *engines):
+        created = client.post("/api/event", json=payload)
+    assert created.status_code == 200
+    event_id = created.json()["id"]
+
+    with assert_num_queries(1, *engines):
+        assert client.get(f"/api/event/{event_id}").status_code == 200
+
+    # SELECT del evento, UPDATE y la recarga
+    with assert_num_queries(3, *engines):
+        updated = client.patch(f"/api/event/{event_id}", json={"name": "Festival"})
+    assert updated.json()["location"]["country"]["name"] == "Colombia"
+
+    # SELECT, DELETE y el refresco de la ubicación, expirada por el commit
+    with assert_num_queries(3, *engines):
+        deleted = client.delete(f"/api/event/{event_id}")
+    assert deleted.json()["location"]["name"] == "Bogota"
+
+    with assert_num_queries(2, *engines):
+        city = client.post("/api/location/city", json={"name": "Cali", "country_id": 1})
+    assert city.json()["country"]["code"] == "CO"
+
+    with assert_num_queries(1, *engines):
+        assert len(client.get("/api/location/city").json()) == 2
+
+# Test para 'list_sessions_by_event': consulta las sesiones sin cargar la relación
+def test_list_sessions_by_event_without_lazy_load(api):
+    _, SessionLocal, _ = api
+    add_events(SessionLocal, 1)
+    with SessionLocal() as db:
+        db.add(SessionModel(
+            event_id=1, name="Opening", description="d", start_time=datetime(2030, 1, 1),
+            end_time=datetime(2030, 1, 1), capacity=5, speaker="x",
+        ))
+        db.commit()
+
+        sessions = EventServiceHandler(db).list_sessions_by_event(1)
+
+    assert [session.name for session in sessions] == ["Opening"]
@@ -0,0 +1,82 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from jose import jwt
+from starlette.datastructures import Headers
+from utils.constants import ALGORITHM, SECRET_KEY
+from utils.rate_limit import InMemorySlidingWindow, RateLimiter, retry_after_ms, token_subject_or_ip
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# App con un endpoint limitado; 'work' registra las peticiones que llegan a las dependencias del endpoint
+def make_client(limiter):
+    app = FastAPI()
+    work = []
+
+    def expensive_dependency():
+        work.append(1)
+
+    @app.post("/login", dependencies=[Depends(limiter)])
+    def login(_=Depends(expensive_dependency)):
+        return {}
+
+    return TestClient(app), work
+
+# Test para 'RateLimiter': responde 429 al superar el límite sin ejecutar el endpoint
+def test_rate_limiter_redis():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    client, work = make_client(RateLimiter("login", 3, 60, redis_getter=lambda: redis_client))
+
+    responses = [client.post("/login") for _ in range(4)]
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert 1 <= int(responses[-1].headers["Retry-After"]) <= 60
+    assert len(work) == 3
+
+# Test para 'RateLimiter': sin Redis cuenta las peticiones en memoria
+def test_rate_limiter_falls_back_to_memory():
+    broken = fakeredis.aioredis.FakeRedis(connected=False)
+    client, work = make_client(RateLimiter("login", 2, 60, redis_getter=lambda: broken))
+
+    statuses = [client.post("/login").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+
+# Test para 'InMemorySlidingWindow': la ventana anterior pesa según el tiempo que sigue dentro
+def test_sliding_window_weights_previous_window():
+    window = InMemorySlidingWindow(limit=2, window_ms=1000)
+
+    assert window.hit("a", 0, 0)[0] and window.hit("a", 0, 500)[0]
+    assert window.hit("a", 0, 900) == (False, 2, 0)
+    # Al empezar la ventana siguiente la anterior aún cuenta entera
+    assert window.hit("a", 1, 0) == (False, 0, 2)
+    # A mitad de la ventana cuenta la mitad: 2 * 0.5 + 0 < 2
+    assert window.hit("a", 1, 500) == (True, 1, 2)
+    # Otra clave tiene su propio contador
+    assert window.hit("b", 1, 500)[0]
+
+# Test para 'retry_after_ms': espera hasta que 'previous * weight + current' baje del límite
+def test_retry_after_ms():
+    # 2 * weight + 1 < 2 cuando weight < 0.5: a los 500 ms de la ventana, 400 ms después
+    assert retry_after_ms(2, 1000, 100, 1, 2) == 401
+    # Con la ventana actual llena se espera a la siguiente y a que su peso baje de 2 / 4
+    assert retry_after_ms(2, 1000, 100, 4, 0) == 900 + 501
+    # Con la ventana actual justo en el límite basta con empezar la siguiente
+    assert retry_after_ms(2, 1000, 100, 2, 5) == 901
+
+    window = InMemorySlidingWindow(limit=2, window_ms=1000)
+    window.hit("a", 0, 0), window.hit("a", 0, 0)
+    wait = retry_after_ms(2, 1000, 0, *window.hit("a", 1, 0)[1:])
+    assert not window.hit("a", 1, wait - 1)[0] and window.hit("a", 1, wait)[0]
+
+# Test para 'token_subject_or_ip': limita por usuario del token o por IP sin un token válido
+def test_token_subject_or_ip():
+    def request(authorization=None):
+        headers = Headers({"authorization": authorization} if authorization else {})
+        return Request({"type": "http", "headers": headers.raw, "client": ("203.0.113.7", 1234)})
+
+    token = jwt.encode({"sub": "owner@test.com"}, SECRET_KEY, algorithm=ALGORITHM)
+
+    assert token_subject_or_ip(request(f"Bearer {token}")) == "user:owner@test.com"
+    assert token_subject_or_ip(request("Bearer invalid")) == "ip:203.0.113.7"
+    assert token_subject_or_ip(request()) == "ip:203.0.113.7"
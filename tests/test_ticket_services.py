@@ -0,0 +1,118 @@
+import pytest
+from fastapi import HTTPException
+from services.ticket_services import TicketRequestHandler
+from utils.enums import TicketRequestStatusEnum
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+@pytest.fixture
+def ticket_requests(redis_client):
+    return TicketRequestHandler(redis_client)
+
+# Test para 'register' y 'get_status'
+def test_register_and_get_status(ticket_requests, redis_client):
+    request_id = ticket_requests.register(1, 7)
+
+    status = ticket_requests.get_status(request_id, 7)
+
+    assert status == {"request_id": request_id, "event_id": 1, "status": "pending"}
+    # El estado expira para no crecer sin límite
+    assert redis_client.ttl(f"ticket:request:{request_id}") > 0
+
+# Test para 'get_status' con una solicitud de otro usuario
+def test_get_status_other_user(ticket_requests):
+    request_id = ticket_requests.register(1, 7)
+
+    with pytest.raises(HTTPException) as exc:
+        ticket_requests.get_status(request_id, 8)
+
+    assert exc.value.status_code == 404
+
+# Test para 'get_status' con una solicitud desconocida
+def test_get_status_unknown(ticket_requests):
+    with pytest.raises(HTTPException) as exc:
+        ticket_requests.get_status("unknown", 7)
+
+    assert exc.value.status_code == 404
+
+# Test para 'enqueue', 'pop_batch' y 'record_outcomes'
+def test_enqueue_and_pop_batch(ticket_requests):
+    first_id, first_drain = ticket_requests.enqueue(1, 7)
+    second_id, second_drain = ticket_requests.enqueue(1, 8)
+
+    # Solo la primera solicitud de la ráfaga programa la tarea de drenado
+    assert first_drain is True
+    assert second_drain is False
+
+    batch = ticket_requests.pop_batch(1, 10, "worker@a:task-1")
+    assert batch == [
+        {"request_id": first_id, "user_id": 7},
+        {"request_id": second_id, "user_id": 8},
+    ]
+    assert ticket_requests.pop_batch(1, 10, "worker@a:task-1") == []
+
+    ticket_requests.record_outcomes({
+        first_id: TicketRequestStatusEnum.CREATED,
+        second_id: TicketRequestStatusEnum.SOLD_OUT,
+    })
+    assert ticket_requests.get_status(first_id, 7)["status"] == "created"
+    assert ticket_requests.get_status(second_id, 8)["status"] == "sold_out"
+
+# Test para 'requeue': los lotes sin confirmar de un worker caído vuelven al inicio de la cola
+def test_requeue_unacked_batches(ticket_requests):
+    ids = [ticket_requests.enqueue(1, user_id)[0] for user_id in (7, 8, 9)]
+    ticket_requests.pop_batch(1, 2, "worker@a:task-1")
+    ticket_requests.pop_batch(1, 1, "worker@b:task-2")
+    ticket_requests.ack_batch(1, "worker@b:task-2")
+
+    # Solo se recuperan los lotes del worker que arranca
+    assert ticket_requests.requeue("worker@b") == {}
+    assert ticket_requests.requeue("worker@a") == {1: 2}
+
+    batch = ticket_requests.pop_batch(1, 10, "worker@a:task-3")
+    assert [r["request_id"] for r in batch] == ids[:2]
+
+# Test para 'claim_idempotency_key': los reintentos devuelven la solicitud original
+def test_claim_idempotency_key(ticket_requests):
+    request_id = ticket_requests.new_request_id()
+    assert ticket_requests.claim_idempotency_key(1, 7, "key-1", request_id) is None
+    ticket_requests.register(1, 7, request_id=request_id)
+    ticket_requests.record_outcome(request_id, TicketRequestStatusEnum.CREATED)
+
+    retry_id = ticket_requests.new_request_id()
+    original = ticket_requests.claim_idempotency_key(1, 7, "key-1", retry_id)
+
+    assert original == {"request_id": request_id, "event_id": 1, "status": "created"}
+    # La misma clave de otro usuario es independiente
+    assert ticket_requests.claim_idempotency_key(1, 8, "key-1", retry_id) is None
+
+# Test para 'release_idempotency_key'
+def test_release_idempotency_key(ticket_requests):
+    request_id = ticket_requests.new_request_id()
+    ticket_requests.claim_idempotency_key(1, 7, "key-1", request_id)
+
+    ticket_requests.release_idempotency_key(7, "key-1")
+
+    assert ticket_requests.claim_idempotency_key(1, 7, "key-1", request_id) is None
+
+# Test para 'record_outcomes': libera la clave de idempotencia solo de las solicitudes rechazadas
+def test_record_outcomes_releases_rejected_keys(ticket_requests):
+    created_id, rejected_id = ticket_requests.new_request_id(), ticket_requests.new_request_id()
+    ticket_requests.claim_idempotency_key(1, 7, "key-1", created_id)
+    ticket_requests.register(1, 7, request_id=created_id, idempotency_key="key-1")
+    ticket_requests.claim_idempotency_key(2, 7, "key-2", rejected_id)
+    ticket_requests.enqueue(2, 7, rejected_id, "key-2")
+
+    ticket_requests.record_outcomes({
+        created_id: TicketRequestStatusEnum.CREATED,
+        rejected_id: TicketRequestStatusEnum.NOT_FOUND,
+    })
+
+    retry_id = ticket_requests.new_request_id()
+    assert ticket_requests.claim_idempotency_key(1, 7, "key-1", retry_id)["request_id"] == created_id
+    assert ticket_requests.claim_idempotency_key(2, 7, "key-2", retry_id) is None
@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from db.config import Base
+import models.category, models.event, models.location  # Tablas relacionadas con UserModel
+from models.user import UserModel
+from schemas.user import UserUpdateAdmin
+from services.user_services import UserServiceHandler
+from tests.query_counter import assert_num_queries
+from utils import auths, user_cache as user_cache_module
+from utils.enums import RoleEnumInDB
+from utils.user_cache import TTLCache, UserCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# Token de acceso firmado con la configuración de la app
+def make_token(email):
+    return jwt.encode({"sub": email}, auths.SECRET_KEY, algorithm=auths.ALGORITHM)
+
+# Base SQLite con un owner y una caché vacía en lugar de la global
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(UserModel(id=1, fullname="Owner", email="owner@test.com", role="OWNER", hashed_password="x"))
+        db.commit()
+
+    cache = UserCache(ttl=60, max_size=10)
+    monkeypatch.setattr(auths, "user_cache", cache)
+    monkeypatch.setattr("services.user_services.user_cache", cache)
+    yield SessionLocal, engine
+    engine.dispose()
+
+# Test para 'TTLCache': las entradas expiran y se descarta la menos usada
+def test_ttl_cache(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    now[0] = 10
+    assert cache.get("a") is None
+
+# Test para 'get_current_user': la segunda petición no consulta la base
+def test_get_current_user_cached(users):
+    SessionLocal, engine = users
+    token = make_token("owner@test.com")
+
+    with SessionLocal() as db:
+        with assert_num_queries(1, engine):
+            auths.get_current_user(db=db, token=token)
+        with assert_num_queries(0, engine):
+            user = auths.get_current_user_with_role(["owner"])(
+                current_user=auths.get_current_active_user(auths.get_current_user(db=db, token=token))
+            )
+
+    assert (user.id, user.email, user.role) == (1, "owner@test.com", RoleEnumInDB.OWNER)
+    assert user.hashed_password is None
+
+# Test para 'update_user' y 'delete_user': invalidan la caché del usuario
+def test_user_changes_invalidate_cache(users):
+    SessionLocal, engine = users
+    token = make_token("owner@test.com")
+
+    with SessionLocal() as db:
+        auths.get_current_user(db=db, token=token)
+        UserServiceHandler(db).update_user(1, UserUpdateAdmin(role="assistant"))
+        assert auths.get_current_user(db=db, token=token).role == RoleEnumInDB.ASSISTANT
+
+        UserServiceHandler(db).update_user(1, UserUpdateAdmin(email="new@test.com"))
+        with pytest.raises(HTTPException) as exc:
+            auths.get_current_user(db=db, token=token)
+        assert exc.value.status_code == 401
+
+        auths.get_current_user(db=db, token=make_token("new@test.com"))
+        UserServiceHandler(db).delete_user(1)
+        with pytest.raises(HTTPException):
+            auths.get_current_user(db=db, token=make_token("new@test.com"))
+
+# Test para 'UserCache': Redis comparte los usuarios entre procesos y una caída usa la base
+def test_redis_tier_shared_and_optional():
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    loads = []
+
+    def load(email):
+        loads.append(email)
+        return UserModel(id=1, fullname="Owner", email=email, active=True, role=RoleEnumInDB.ADMIN)
+
+    api_worker, other_worker = (UserCache(60, 10, redis_ttl=60, redis_getter=lambda: redis_client) for _ in range(2))
+    api_worker.get_user("admin@test.com", load)
+    user = other_worker.get_user("admin@test.com", load)
+
+    assert loads == ["admin@test.com"] and user.role == RoleEnumInDB.ADMIN
+    assert redis_client.ttl("user:principal:admin@test.com") == 60
+
+    api_worker.invalidate("admin@test.com")
+    assert redis_client.get("user:principal:admin@test.com") is None
+
+    broken = UserCache(60, 10, redis_ttl=60, redis_getter=lambda: fakeredis.FakeRedis(connected=False))
+    assert broken.get_user("admin@test.com", load).email == "admin@test.com"
+
+# Test para 'get_current_user_async': usa la misma caché sobre una sesión asíncrona
+def test_get_current_user_async_cached(users, tmp_path):
+    pytest.importorskip("aiosqlite")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    token = make_token("owner@test.com")
+
+    async def authenticate():
+        async with AsyncSessionLocal() as db:
+            with assert_num_queries(1, async_engine):
+                await auths.get_current_user_async(db=db, token=token)
+            with assert_num_queries(0, async_engine):
+                return await auths.get_current_user_async(db=db, token=token)
+
+    try:
+        user = asyncio.run(authenticate())
+    finally:
+        asyncio.run(async_engine.dispose())
+
+    assert user.id == 1
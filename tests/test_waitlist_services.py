@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from models.user import UserModel
+from services.waitlist_services import WaitlistHandler
+
+# La lista de espera se guarda en un Redis en memoria
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+@pytest.fixture
+def waitlist(redis_client, mock_db):
+    return WaitlistHandler(redis_client, mock_db)
+
+# Test para 'join' y 'position': la lista respeta el orden de llegada
+def test_join_keeps_fifo_order(waitlist):
+    waitlist.join(1, [(10, "a"), (11, "b")])
+    waitlist.join(1, [(12, "c"), (10, "d")])
+
+    assert waitlist.position(1, 10) == {"event_id": 1, "position": 1, "size": 3}
+    assert waitlist.position(1, 12)["position"] == 3
+
+# Test para 'position' de un usuario que no está en la lista
+def test_position_not_waitlisted(waitlist):
+    with pytest.raises(HTTPException) as exc:
+        waitlist.position(1, 10)
+
+    assert exc.value.status_code == 404
+
+# Test para 'promote': entrega los cupos libres a la cabeza de la lista
+def test_promote(waitlist, redis_client, mock_db):
+    waitlist.join(1, [(10, "a"), (11, "b"), (12, "c")])
+    mock_db.execute.return_value.scalar.return_value = 2
+
+    with patch("services.waitlist_services.EventServiceHandler") as service:
+        # El usuario 10 ya tenía ticket y el 11 obtiene el único cupo real
+        service.return_value.issue_tickets.side_effect = [([11], {10}, 0)]
+        promoted, remaining = waitlist.promote(1)
+
+    assert promoted == [11]
+    assert remaining == 0
+    service.return_value.issue_tickets.assert_called_once_with(1, [10, 11])
+    # El usuario 12 conserva su lugar en la lista
+    assert redis_client.zrange("ticket:waitlist:1", 0, -1) == ["12"]
+    assert redis_client.hget("ticket:request:b", "status") == "created"
+    assert redis_client.hget("ticket:request:a", "status") == "already_issued"
+
+# Test para 'promote' cuando falla la emisión de tickets
+def test_promote_restores_waitlist_on_error(waitlist, redis_client, mock_db):
+    waitlist.join(1, [(10, "a"), (11, "b")])
+    mock_db.execute.return_value.scalar.return_value = 1
+
+    with patch("services.waitlist_services.EventServiceHandler") as service:
+        service.return_value.issue_tickets.side_effect = RuntimeError()
+        with pytest.raises(RuntimeError):
+            waitlist.promote(1)
+
+    assert redis_client.zrange("ticket:waitlist:1", 0, -1) == ["10", "11"]
+    mock_db.rollback.assert_called_once()
+
+# Test para 'cancel_ticket': el cupo cancelado pasa a la cabeza de la lista en la misma transacción
+def test_cancel_ticket_hands_seat_to_head(waitlist, redis_client):
+    user = UserModel(id=7)
+    waitlist.join(1, [(10, "a"), (11, "b"), (12, "c")])
+
+    with patch("services.waitlist_services.EventServiceHandler") as service:
+        # El usuario 10 obtuvo un ticket después de entrar en la lista
+        service.return_value.cancel_ticket.side_effect = [IntegrityError(None, None, Exception()), 0]
+        successor_id, remaining = waitlist.cancel_ticket(1, user)
+
+    assert (successor_id, remaining) == (11, 0)
+    service.return_value.cancel_ticket.assert_called_with(1, user, 11)
+    assert redis_client.zrange("ticket:waitlist:1", 0, -1) == ["12"]
+    assert redis_client.hget("ticket:request:b", "status") == "created"
+    assert redis_client.hget("ticket:request:a", "status") == "already_issued"
+
+# Test para 'cancel_ticket' con la lista vacía: el cupo vuelve al evento
+def test_cancel_ticket_empty_waitlist(waitlist):
+    user = UserModel(id=7)
+
+    with patch("services.waitlist_services.EventServiceHandler") as service:
+        service.return_value.cancel_ticket.return_value = 1
+        assert waitlist.cancel_ticket(1, user) == (None, 1)
+
+    service.return_value.cancel_ticket.assert_called_once_with(1, user)
@@ -1,10 +1,17 @@
 from typing import List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from db.config import get_db
+from db.config import get_async_db, get_db
+from db.redis import get_async_redis, get_redis
 from models.user import UserModel
+from services.auth_services import ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE, TokenRevocationHandler
 from utils.constants import ALGORITHM, SECRET_KEY
+from utils.enums import RoleEnumInDB
+from utils.user_cache import user_cache
 from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # OAuth2 password bearer for token management
@@ -25,12 +32,22 @@ NO_HAS_PERMISSION_EXCEPTION = HTTPException(
     detail="No has permission",
     headers={"WWW-Authenticate": "Bearer"}
 )
+# Self-contained tokens are refused while their revocation cannot be checked
+REVOCATION_UNAVAILABLE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Could not check the token revocation",
+)
 
 
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
     """
     Retrieves the current user based on the provided JWT token.
 
+    Self-contained access tokens are authorized from their claims once checked
+    against the revocation list. For tokens with a subject only, the user is
+    looked up in `user_cache` first, so most requests authenticate without a
+    query. Either way the user is not attached to `db`, unless it was loaded.
+
     Args:
         db (Session): The database session to query the user model.
         token (str): The JWT token passed from the client.
@@ -39,21 +56,124 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
         UserModel: The user model of the authenticated user.
 
     Raises:
-        HTTPException: If the token is invalid or if the user is not found.
+        HTTPException: If the token is invalid or revoked, or if the user is not found.
+    """
+    claims = _get_access_claims(token)
+    if claims.get("type") == ACCESS_TOKEN_TYPE:
+        try:
+            revoked = TokenRevocationHandler(get_redis()).is_revoked(claims)
+        except RedisError:
+            raise REVOCATION_UNAVAILABLE_EXCEPTION
+        return _get_claims_user(claims, revoked)
+
+    user = user_cache.get_user(
+        claims["sub"], lambda email: db.query(UserModel).filter(UserModel.email == email).first()
+    )
+    if not user:
+        raise CREDENTIALS_EXCEPTION
+
+    return user
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+):
+    """
+    Retrieves the current user based on the provided JWT token, on an async session.
+
+    Self-contained access tokens and the users of the other tokens are
+    resolved like in `get_current_user`.
+
+    Args:
+        db (AsyncSession): The async database session to query the user model.
+        token (str): The JWT token passed from the client.
+
+    Returns:
+        UserModel: The user model of the authenticated user.
+
+    Raises:
+        HTTPException: If the token is invalid or revoked, or if the user is not found.
+    """
+    claims = _get_access_claims(token)
+    if claims.get("type") == ACCESS_TOKEN_TYPE:
+        try:
+            revoked = await TokenRevocationHandler(get_async_redis()).is_revoked_async(claims)
+        except RedisError:
+            raise REVOCATION_UNAVAILABLE_EXCEPTION
+        return _get_claims_user(claims, revoked)
+
+    user = await user_cache.get_user_async(
+        claims["sub"], lambda email: db.scalar(select(UserModel).where(UserModel.email == email))
+    )
+    if not user:
+        raise CREDENTIALS_EXCEPTION
+
+    return user
+
+
+def decode_token(token: str):
+    """
+    Decodes a JWT token and returns its verified claims.
+
+    Args:
+        token (str): The JWT token passed from the client.
+
+    Returns:
+        dict: The claims of the token, with the email of the user in `sub`.
+
+    Raises:
+        HTTPException: If the token is invalid or has no subject.
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise CREDENTIALS_EXCEPTION
     except JWTError:
         raise CREDENTIALS_EXCEPTION
-    
-    user = db.query(UserModel).filter(UserModel.email == email).first()
-    if not user:
+    if payload.get("sub") is None:
         raise CREDENTIALS_EXCEPTION
 
-    return user
+    return payload
+
+
+def _get_access_claims(token: str):
+    """
+    Decodes a token sent to authenticate a request.
+
+    Args:
+        token (str): The JWT token passed from the client.
+
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        HTTPException: If the token is invalid or is a refresh token.
+    """
+    claims = decode_token(token)
+    if claims.get("type") == REFRESH_TOKEN_TYPE:
+        raise CREDENTIALS_EXCEPTION
+
+    return claims
+
+
+def _get_claims_user(claims: dict, revoked: bool):
+    """
+    Builds the user of a self-contained access token from its claims.
+
+    Args:
+        claims (dict): The verified claims of the token.
+        revoked (bool): Whether the token is in the revocation list.
+
+    Returns:
+        UserModel: A user not attached to any session, with its id, email, role and active flag.
+
+    Raises:
+        HTTPException: If the token was revoked.
+    """
+    if revoked:
+        raise CREDENTIALS_EXCEPTION
+
+    return UserModel(
+        id=claims["uid"], email=claims["sub"], role=RoleEnumInDB(claims["role"]), active=claims["active"]
+    )
 
 
 def get_current_active_user(current_user: UserModel = Depends(get_current_user)):
@@ -74,6 +194,24 @@ def get_current_active_user(current_user: UserModel = Depends(get_current_user))
     return current_user
 
 
+async def get_current_active_user_async(current_user: UserModel = Depends(get_current_user_async)):
+    """
+    Async counterpart of `get_current_active_user`, for endpoints on async sessions.
+
+    Args:
+        current_user (UserModel): The authenticated user.
+
+    Returns:
+        UserModel: The authenticated active user.
+
+    Raises:
+        HTTPException: If the user is inactive.
+    """
+    if not current_user.active:
+        raise USER_INACTIVE_EXCEPTION
+    return current_user
+
+
 def has_role(current_user: UserModel, roles: List[str]):
     """
     Checks if the current user has one of the specified roles.
@@ -106,3 +244,26 @@ def get_current_user_with_role(roles: List[str]):
             raise NO_HAS_PERMISSION_EXCEPTION
         return current_user
     return dependency
+
+
+def get_current_user_with_role_async(roles: List[str]):
+    """
+    Async counterpart of `get_current_user_with_role`, for endpoints on async sessions.
+
+    The user is loaded on the event loop, so the endpoint does not need a thread
+    of the pool just to authenticate.
+
+    Args:
+        roles (List[str]): A list of roles to check against the current user's role.
+
+    Returns:
+        function: A FastAPI dependency function that checks if the user has the required role.
+
+    Raises:
+        HTTPException: If the user does not have the required role.
+    """
+    async def dependency(current_user: UserModel = Depends(get_current_active_user_async)):
+        if not has_role(current_user, roles):
+            raise NO_HAS_PERMISSION_EXCEPTION
+        return current_user
+    return dependency
@@ -10,8 +10,85 @@ DB_PASSWORD = os.getenv('PSQL_PASSWORD')
 DB_HOST = os.getenv('PSQL_HOST')
 DB_PORT = os.getenv('PSQL_PORT')
 DB_NAME = os.getenv('PSQL_DB')
-DATABASE_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# A full URL (e.g. a scratch database for benchmarks) takes precedence over the PSQL_* settings
+DATABASE_URL = (
+    os.getenv("DATABASE_URL")
+    or f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+# Async endpoints use the same database through asyncpg unless another URL is given
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+# Comma-separated read replicas of DATABASE_URL for the read-only endpoints (none by default)
+DATABASE_REPLICA_URLS: Final[list] = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_POOL_SIZE: Final[int] = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW: Final[int] = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT: Final[float] = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE: Final[int] = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING: Final[bool] = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Logs every statement; meant for local debugging only
+DB_ECHO: Final[bool] = os.getenv("DB_ECHO", "false").lower() == "true"
+# Statements slower than this are logged (0 disables the slow query log)
+DB_SLOW_QUERY_MS: Final[float] = float(os.getenv("DB_SLOW_QUERY_MS", "0"))
+DB_SLOW_QUERY_SAMPLE_RATE: Final[float] = float(os.getenv("DB_SLOW_QUERY_SAMPLE_RATE", "1.0"))
+# Counts the queries of each request into the Server-Timing header and the per-route stats
+DB_QUERY_STATS_ENABLED: Final[bool] = os.getenv("DB_QUERY_STATS_ENABLED", "true").lower() == "true"
+# Requests issuing more queries than this are logged with their statements (0 disables it)
+DB_QUERY_BUDGET: Final[int] = int(os.getenv("DB_QUERY_BUDGET", "0"))
 
 # JWT
 SECRET_KEY: Final[str] = os.getenv("SECRET_KEY")
 ALGORITHM: Final[str] = os.getenv("ALGORITHM")
+# Opt-in access tokens carrying the user id, role and active flag, authorized without a user lookup.
+# They are short-lived and renewed with a refresh token; logout and user updates revoke them in Redis
+JWT_CLAIMS_ENABLED: Final[bool] = os.getenv("JWT_CLAIMS_ENABLED", "false").lower() == "true"
+CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES: Final[int] = int(os.getenv("CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES", "5"))
+REFRESH_TOKEN_EXPIRE_DAYS: Final[int] = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Cost of the bcrypt hashes (2^rounds iterations); stored hashes of another cost are rehashed on login.
+# `python -m benchmarks.bcrypt_rounds --target-ms 250` recommends a value for the host
+BCRYPT_ROUNDS: Final[int] = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes hashing and verifying passwords (bcrypt), one per core by default
+PASSWORD_POOL_WORKERS: Final[int] = int(os.getenv("PASSWORD_POOL_WORKERS", "0")) or os.cpu_count() or 1
+# Passwords waiting for a free process; beyond this, logins and sign-ups fail fast with a 503
+PASSWORD_POOL_MAX_PENDING: Final[int] = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "64"))
+# Users resolved from a token are cached in each worker for this long (0 disables the cache)
+USER_CACHE_TTL_SECONDS: Final[float] = float(os.getenv("USER_CACHE_TTL_SECONDS", "5"))
+USER_CACHE_MAX_SIZE: Final[int] = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+# Shared tier of the user cache in Redis, invalidated on every user update (0 disables it)
+USER_CACHE_REDIS_TTL_SECONDS: Final[int] = int(os.getenv("USER_CACHE_REDIS_TTL_SECONDS", "0"))
+
+# Redis / Celery
+CELERY_BROKER_URL: Final[str] = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+CELERY_BACKEND_URL: Final[str] = os.getenv("CELERY_BACKEND_URL", CELERY_BROKER_URL)
+REDIS_URL: Final[str] = os.getenv("REDIS_URL", CELERY_BROKER_URL)
+# Port of the /metrics server of the Celery worker (0 disables it)
+CELERY_METRICS_PORT: Final[int] = int(os.getenv("CELERY_METRICS_PORT", "0"))
+
+# Profiling
+PROFILE_DIR: Final[str] = os.getenv("PROFILE_DIR", "/tmp/profiles")
+# Always-on sampler writing a collapsed stacks file per window of PROFILER_WINDOW_SECONDS
+PROFILER_ENABLED: Final[bool] = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_INTERVAL_SECONDS: Final[float] = float(os.getenv("PROFILER_INTERVAL_SECONDS", "0.01"))
+PROFILER_WINDOW_SECONDS: Final[float] = float(os.getenv("PROFILER_WINDOW_SECONDS", "60"))
+# Sampling interval of the requests profiled with `X-Profile: 1` or `?profile=1`
+PROFILER_REQUEST_INTERVAL_SECONDS: Final[float] = float(os.getenv("PROFILER_REQUEST_INTERVAL_SECONDS", "0.001"))
+# Profiles of each kind (sampler windows, requests) kept on disk
+PROFILER_RETAINED_FILES: Final[int] = int(os.getenv("PROFILER_RETAINED_FILES", "100"))
+
+# Rate limiting: requests allowed per sliding window, counted in Redis (in each worker if it is down).
+# A limit of 0 disables it; logins are counted per client IP, ticket requests per user
+RATE_LIMIT_ENABLED: Final[bool] = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_RATE_LIMIT: Final[int] = int(os.getenv("LOGIN_RATE_LIMIT", "10"))
+LOGIN_RATE_LIMIT_WINDOW_SECONDS: Final[float] = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", "60"))
+TICKET_RATE_LIMIT: Final[int] = int(os.getenv("TICKET_RATE_LIMIT", "5"))
+TICKET_RATE_LIMIT_WINDOW_SECONDS: Final[float] = float(os.getenv("TICKET_RATE_LIMIT_WINDOW_SECONDS", "10"))
+
+# Tickets
+TICKET_BATCH_ENABLED: Final[bool] = os.getenv("TICKET_BATCH_ENABLED", "false").lower() == "true"
+TICKET_BATCH_SIZE: Final[int] = int(os.getenv("TICKET_BATCH_SIZE", "500"))
+TICKET_REQUEST_TTL: Final[int] = int(os.getenv("TICKET_REQUEST_TTL", "3600"))
+TICKET_INVENTORY_ENABLED: Final[bool] = os.getenv("TICKET_INVENTORY_ENABLED", "false").lower() == "true"
+TICKET_INVENTORY_RECONCILE_SECONDS: Final[int] = int(os.getenv("TICKET_INVENTORY_RECONCILE_SECONDS", "60"))
+CAPACITY_STREAM_HEARTBEAT_SECONDS: Final[int] = int(os.getenv("CAPACITY_STREAM_HEARTBEAT_SECONDS", "15"))
+TICKET_HOLD_MINUTES: Final[int] = int(os.getenv("TICKET_HOLD_MINUTES", "10"))
+TICKET_HOLD_SWEEP_SECONDS: Final[int] = int(os.getenv("TICKET_HOLD_SWEEP_SECONDS", "30"))
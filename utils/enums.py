@@ -38,3 +38,27 @@ class RoleEnumInDB(str, Enum):
     ADMIN = "admin"
     OWNER = "owner"
     ASSISTANT = "assistant"
+
+
+class TicketRequestStatusEnum(str, Enum):
+    """
+    Enum representing the possible statuses of a ticket purchase request.
+
+    Attributes:
+        PENDING: The request is queued and waiting to be processed.
+        RESERVED: A seat was reserved and the ticket is waiting to be persisted.
+        CREATED: The ticket was issued.
+        SOLD_OUT: The event had no capacity left.
+        WAITLISTED: The event had no capacity left and the user joined its waitlist.
+        ALREADY_ISSUED: The user already holds a ticket for the event.
+        NOT_FOUND: The event does not exist.
+        ERROR: The request failed unexpectedly.
+    """
+    PENDING = "pending"
+    RESERVED = "reserved"
+    CREATED = "created"
+    SOLD_OUT = "sold_out"
+    WAITLISTED = "waitlisted"
+    ALREADY_ISSUED = "already_issued"
+    NOT_FOUND = "not_found"
+    ERROR = "error"
@@ -0,0 +1,74 @@
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess, start_http_server
+
+# Directory where each process writes its samples in multiprocess mode, e.g. the
+# prefork children of the Celery worker. Wiped before the processes start
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+def multiprocess_enabled():
+    """
+    Tells whether the metrics are in the multiprocess mode of `prometheus_client`.
+
+    Returns:
+        bool: True if `PROMETHEUS_MULTIPROC_DIR` is set.
+    """
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def build_registry(*collectors):
+    """
+    Builds the registry a process exposes, once at startup.
+
+    The counters, gauges and histograms of the app are defined on the default
+    registry. In multiprocess mode each process writes their samples to
+    `PROMETHEUS_MULTIPROC_DIR` instead, and they are merged at scrape time.
+    `collectors` read the state of the exposing process when scraped, such as
+    its connection pools, and are exposed in both modes.
+
+    Args:
+        *collectors: The custom collectors of the process.
+
+    Returns:
+        CollectorRegistry: The registry to expose.
+    """
+    if not multiprocess_enabled():
+        for collector in collectors:
+            REGISTRY.register(collector)
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def start_metrics_server(registry: CollectorRegistry, port: int, host: str = "0.0.0.0"):
+    """
+    Serves the metrics of a registry on `/metrics` from a daemon thread.
+
+    Meant for processes without an HTTP server, such as the Celery worker.
+
+    Args:
+        registry (CollectorRegistry): The metrics to expose.
+        port (int): The port to listen on.
+        host (str): The address to listen on. Defaults to every interface.
+
+    Returns:
+        WSGIServer: The running server.
+    """
+    server, _ = start_http_server(port, addr=host, registry=registry)
+    return server
+
+
+def mark_process_dead(pid: int):
+    """
+    Drops the live gauges of a process that exited, in multiprocess mode.
+
+    Args:
+        pid (int): The ID of the process.
+    """
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
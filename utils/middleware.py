@@ -0,0 +1,362 @@
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict
+from uuid import uuid4
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.config import get_async_read_db
+from db.instrumentation import QueryStats, request_query_stats
+from utils.auths import (
+    get_current_active_user_async,
+    get_current_user_async,
+    get_current_user_with_role_async,
+    oauth2_scheme,
+)
+from utils.constants import PROFILER_REQUEST_INTERVAL_SECONDS, PROFILER_RETAINED_FILES
+from utils.profiling import ProfileStore, StackSampler, profile_store
+
+# Dedicated logger, so requests over the query budget can be routed independently of the app logs
+query_budget_logger = logging.getLogger("db.query_budget")
+
+
+class RouteQueryStats:
+    """
+    Totals of the queries issued by each route, aggregated in the worker process.
+
+    Routes are keyed by method and path template (e.g. `GET /api/event/{event_id}`),
+    so the number of entries is bounded by the number of routes.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty totals.
+        """
+        self._routes: Dict[str, dict] = {}
+
+    def record(self, route: str, stats: QueryStats):
+        """
+        Adds the queries of a request to the totals of its route.
+
+        Args:
+            route (str): The method and path template of the route.
+            stats (QueryStats): The queries of the request.
+        """
+        totals = self._routes.setdefault(
+            route, {"requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0}
+        )
+        totals["requests"] += 1
+        totals["queries"] += stats.count
+        totals["db_ms"] += stats.duration_ms
+        totals["max_queries"] = max(totals["max_queries"], stats.count)
+
+    def snapshot(self):
+        """
+        Returns a copy of the totals of every route.
+
+        Returns:
+            Dict[str, dict]: The `requests`, `queries`, `db_ms` and `max_queries` of each route.
+        """
+        return {route: dict(totals) for route, totals in self._routes.items()}
+
+    def collect(self):
+        """
+        Exposes the totals as the `db_queries_total` and `db_query_seconds_total` counters.
+
+        Yields:
+            CounterMetricFamily: Each counter, labelled by method and route.
+        """
+        queries = CounterMetricFamily(
+            "db_queries", "Database queries issued by each route.", labels=["method", "route"]
+        )
+        seconds = CounterMetricFamily(
+            "db_query_seconds", "Database time spent by each route.", labels=["method", "route"]
+        )
+        for route, totals in self.snapshot().items():
+            labels = route.split(" ", 1)
+            queries.add_metric(labels, totals["queries"])
+            seconds.add_metric(labels, totals["db_ms"] / 1000)
+        yield queries
+        yield seconds
+
+
+route_query_stats = RouteQueryStats()
+
+# Summed across the API worker processes in multiprocess mode
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests being served.", multiprocess_mode="livesum"
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests, until the last byte of the body is sent.",
+    ["method", "route", "status"],
+)
+
+
+def route_name(scope: Scope):
+    """
+    Builds the key of the route that served a request.
+
+    Args:
+        scope (Scope): The ASGI scope of the request, after routing.
+
+    Returns:
+        str: The method and path template, or `unmatched` if no route matched, so
+            unknown URLs cannot create an entry each.
+    """
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else 'unmatched'}"
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the queries and database time of each request.
+
+    The totals are returned in a `Server-Timing` header (`db;dur=...;desc="N queries"`),
+    aggregated per route in `route_query_stats`, and requests issuing more than
+    `budget` queries are logged with their statements. The header is sent with
+    the response head, so queries issued while a streaming body is sent are not
+    included.
+
+    Attributes:
+        app (ASGIApp): The wrapped application.
+        budget (int): The maximum number of queries of a request, 0 to disable the check.
+        stats (RouteQueryStats): The per-route totals to update.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int = 0, stats: RouteQueryStats = route_query_stats):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            budget (int): The maximum number of queries of a request, 0 to disable the check.
+            stats (RouteQueryStats): The per-route totals to update. Defaults to `route_query_stats`.
+        """
+        self.app = app
+        self.budget = budget
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(track_statements=self.budget > 0)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = request_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_query_stats.reset(token)
+            self.record(scope, stats)
+
+    def record(self, scope: Scope, stats: QueryStats):
+        """
+        Aggregates the queries of a request and logs it if it went over the budget.
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+            stats (QueryStats): The queries of the request.
+        """
+        route = route_name(scope)
+        self.stats.record(route, stats)
+        if not self.budget or stats.count <= self.budget:
+            return
+
+        query_budget_logger.warning(
+            "Query budget exceeded on %s: %d queries (budget %d, %.1f ms)\n%s",
+            route,
+            stats.count,
+            self.budget,
+            stats.duration_ms,
+            "\n".join(stats.statements),
+            extra={
+                "route": route,
+                "query_count": stats.count,
+                "query_budget": self.budget,
+                "duration_ms": round(stats.duration_ms, 1),
+                "statements": stats.statements,
+            },
+        )
+
+
+class MetricsMiddleware:
+    """
+    Measures the in-flight requests and the latency of each route.
+
+    Streaming responses, such as the capacity stream, are measured until the
+    stream ends.
+
+    Attributes:
+        app (ASGIApp): The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            method, route = route_name(scope).split(" ", 1)
+            http_request_duration_seconds.labels(method=method, route=route, status=status).observe(
+                time.perf_counter() - started
+            )
+
+
+# Response header with the name of the profile of a profiled request
+PROFILE_HEADER = "X-Profile-Name"
+
+# Role check of the users allowed to profile their requests
+profiling_role_check = get_current_user_with_role_async(["admin"])
+
+
+def profiling_requested(request: Request):
+    """
+    Tells whether a request asks to be profiled, with `X-Profile: 1` or `?profile=1`.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        bool: True if the request asks to be profiled.
+    """
+    flag = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+    return flag.lower() in ("1", "true")
+
+
+async def authorize_profiling(request: Request):
+    """
+    Checks that a request to profile comes from an active administrator.
+
+    Middlewares run outside of the dependency injection, so this chains the
+    same functions as `get_current_user_with_role_async(["admin"])`. The user
+    is read from a replica, when there is one, rather than the primary.
+
+    Args:
+        request (Request): The request to profile.
+
+    Raises:
+        HTTPException: If the token is missing or invalid, the user is inactive
+            or the user is not an administrator.
+    """
+    token = await oauth2_scheme(request)
+    async for db in get_async_read_db(None):
+        user = await get_current_user_async(db=db, token=token)
+    await profiling_role_check(current_user=await get_current_active_user_async(current_user=user))
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests of administrators that ask for it.
+
+    A request sent with `X-Profile: 1` or `?profile=1` runs under a
+    `StackSampler`; its collapsed stacks are stored as `request-<id>.collapsed`
+    and the name is returned in the `X-Profile-Name` header, to download from
+    `GET /api/admin/profiles/{name}`. Requests of other users asking for a
+    profile are served as usual, without a profile: the flag is ignored rather
+    than turned into an error. Every thread is sampled, so requests served
+    concurrently also show up in the profile.
+
+    Attributes:
+        app (ASGIApp): The wrapped application.
+        store (ProfileStore): Where the profiles are stored.
+        interval (float): The time between two samples, in seconds.
+        retained (int): The number of request profiles kept on disk.
+        authorize (Callable): Raises an HTTPException if a request cannot be profiled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore = profile_store,
+        interval: float = PROFILER_REQUEST_INTERVAL_SECONDS,
+        retained: int = PROFILER_RETAINED_FILES,
+        authorize: Callable[[Request], Awaitable[None]] = authorize_profiling,
+    ):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            store (ProfileStore): Where the profiles are stored. Defaults to `profile_store`.
+            interval (float): The time between two samples, in seconds.
+            retained (int): The number of request profiles kept on disk.
+            authorize (Callable): Raises an HTTPException if a request cannot be
+                profiled. Defaults to `authorize_profiling`.
+        """
+        self.app = app
+        self.store = store
+        self.interval = interval
+        self.retained = retained
+        self.authorize = authorize
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not profiling_requested(Request(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(Request(scope))
+        except HTTPException:
+            await self.app(scope, receive, send)
+            return
+
+        name = f"request-{uuid4().hex}.collapsed"
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_HEADER, name)
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sampler.stop()
+            await run_in_threadpool(self.save, name, sampler.drain())
+
+    def save(self, name: str, stacks: Counter):
+        """
+        Stores the profile of a request and prunes the oldest ones.
+
+        Args:
+            name (str): The file name of the profile.
+            stacks (Counter): The number of samples of each collapsed stack.
+        """
+        self.store.save(name, stacks)
+        self.store.prune("request-", self.retained)
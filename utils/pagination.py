@@ -0,0 +1,166 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, literal, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+INVALID_CURSOR_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid cursor",
+)
+
+CURSOR_WITH_OFFSET_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="cursor and offset cannot be combined",
+)
+
+
+class KeysetPage:
+    """
+    Keyset (cursor) pagination over a unique sort key, e.g. `(date, id)`.
+
+    Instead of skipping `offset` rows, each page continues right after the sort
+    key of the last row of the previous one, so any page costs the same as the
+    first one as long as the key is indexed, and rows inserted meanwhile do not
+    shift the pages. The key is handed to clients as an opaque cursor.
+
+    Attributes:
+        columns (Sequence[Column]): The columns of the sort key, ending with a unique one.
+        cursor (Optional[str]): The cursor of the requested page, None for the first one.
+        limit (Optional[int]): The page size, None to return every remaining row.
+        offset (int): The rows skipped from the first page, for clients that still page by offset.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ):
+        """
+        Initializes the page and validates its cursor.
+
+        Args:
+            columns (Sequence[Column]): The columns of the sort key, ending with a unique one.
+            cursor (Optional[str]): The cursor of the requested page, None for the first one.
+            limit (Optional[int]): The page size, None to return every remaining row.
+            offset (int): The rows skipped from the first page. Defaults to 0.
+
+        Raises:
+            HTTPException: If the cursor is malformed, does not match the sort key,
+                or is combined with an offset.
+        """
+        if cursor and offset:
+            raise CURSOR_WITH_OFFSET_EXCEPTION
+
+        self.columns = list(columns)
+        self.cursor = cursor
+        self.limit = limit
+        self.offset = offset
+        self._after = decode_cursor(cursor, self.columns) if cursor else None
+
+    def apply(self, query: Select):
+        """
+        Orders the query by the sort key and restricts it to the requested page.
+
+        One extra row is fetched to know whether there is a next page.
+
+        Args:
+            query (Select): The query to paginate.
+
+        Returns:
+            Select: The query of the page.
+        """
+        query = query.order_by(*self.columns)
+        if self._after is not None:
+            query = query.where(
+                tuple_(*self.columns)
+                > tuple_(*(literal(value, column.type) for value, column in zip(self._after, self.columns)))
+            )
+        if self.offset:
+            query = query.offset(self.offset)
+        if self.limit is not None:
+            query = query.limit(self.limit + 1)
+        return query
+
+    def split(self, rows: Sequence):
+        """
+        Separates the rows of the page from the extra row fetched by `apply`.
+
+        Args:
+            rows (Sequence): The rows returned by the query of `apply`.
+
+        Returns:
+            tuple: The rows of the page and the cursor of the next page, which is
+                None on the last page.
+        """
+        rows = list(rows)
+        if self.limit is None or len(rows) <= self.limit:
+            return rows, None
+
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return rows, encode_cursor([getattr(last, column.key) for column in self.columns])
+
+
+def encode_cursor(values: Sequence):
+    """
+    Encodes the sort key of a row as an opaque cursor.
+
+    Args:
+        values (Sequence): The values of the sort key.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence):
+    """
+    Decodes a cursor into the values of the sort key.
+
+    Args:
+        cursor (str): A cursor returned by `encode_cursor`.
+        columns (Sequence[Column]): The columns of the sort key.
+
+    Returns:
+        list: The values of the sort key, converted to the types of the columns.
+
+    Raises:
+        HTTPException: If the cursor is malformed or does not match the sort key.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for value, column in zip(values, columns)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise INVALID_CURSOR_EXCEPTION
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    """
+    Returns the cursor of the next page in the `X-Next-Cursor` header.
+
+    Args:
+        response (Response): The response of the endpoint.
+        cursor (Optional[str]): The cursor of the next page, None on the last page.
+    """
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from utils.constants import BCRYPT_ROUNDS, PASSWORD_POOL_MAX_PENDING, PASSWORD_POOL_WORKERS
+
+POOL_SATURATED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many logins in progress, try again shortly",
+    headers={"Retry-After": "1"},
+)
+
+# Password hashing context, shared by `AuthServiceHandler` and the worker processes.
+# Hashes of any other cost than BCRYPT_ROUNDS, higher or lower, report `needs_update`
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+def hash_password(password: str):
+    """
+    Hashes a password; submitted to `password_pool` to run in a worker process.
+
+    Args:
+        password (str): The plain password.
+
+    Returns:
+        str: The hashed password.
+    """
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    """
+    Verifies a password against its hash; submitted to `password_pool` to run in a worker process.
+
+    Args:
+        plain_password (str): The plain password entered by the user.
+        hashed_password (str): The hashed password stored in the database.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verifies a password and rehashes it if its hash does not follow the cost policy.
+
+    Args:
+        plain_password (str): The plain password entered by the user.
+        hashed_password (str): The hashed password stored in the database.
+
+    Returns:
+        tuple: Whether the password matches, and the new hash to store or None.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordPool:
+    """
+    Runs password hashing in a dedicated, size-limited pool of processes.
+
+    bcrypt holds the calling thread for its whole cost, so running it on the
+    threadpool of the sync endpoints lets a burst of logins starve every other
+    endpoint, and the GIL keeps it to about one core. The pool runs it in
+    `workers` processes instead, started with `spawn` so they do not inherit
+    the connections of the app, when the first password is submitted.
+
+    At most `max_pending` passwords wait for a free process; beyond that,
+    `submit` fails fast with a 503 instead of letting the queue grow.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        max_pending (int): The number of passwords allowed to wait for a process.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Initializes the pool; the processes are started on first use.
+
+        Args:
+            workers (int): The number of worker processes.
+            max_pending (int): The number of passwords allowed to wait for a process.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args):
+        """
+        Queues a call on the pool.
+
+        Args:
+            fn (Callable): A module-level function, e.g. `verify_password`.
+            *args: The arguments of the call.
+
+        Returns:
+            Future: The result of the call.
+
+        Raises:
+            HTTPException: If `max_pending` calls are already waiting.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise POOL_SATURATED_EXCEPTION
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        """
+        Runs a call on the pool, blocking the calling thread until it is done.
+
+        Args:
+            fn (Callable): A module-level function, e.g. `hash_password`.
+            *args: The arguments of the call.
+
+        Returns:
+            The result of the call.
+        """
+        future = self.submit(fn, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._discard_executor()
+            raise
+
+    async def run_async(self, fn: Callable, *args):
+        """
+        Runs a call on the pool without blocking the event loop.
+
+        Args:
+            fn (Callable): A module-level function, e.g. `verify_password`.
+            *args: The arguments of the call.
+
+        Returns:
+            The result of the call.
+        """
+        future = asyncio.wrap_future(self.submit(fn, *args))
+        try:
+            return await future
+        except BrokenProcessPool:
+            self._discard_executor()
+            raise
+
+    def shutdown(self):
+        """
+        Stops the worker processes, waiting for the calls in progress.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self):
+        # A worker died (e.g. OOM killed); the next call starts a new pool
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Pool of the API process, shut down with the app
+password_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_PENDING)
@@ -0,0 +1,289 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import suppress
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from utils.constants import (
+    PROFILE_DIR,
+    PROFILER_INTERVAL_SECONDS,
+    PROFILER_RETAINED_FILES,
+    PROFILER_WINDOW_SECONDS,
+)
+
+# Names of the stored profiles; anything else is rejected before touching the disk
+PROFILE_NAME_PATTERN = re.compile(r"^[\w-]+\.collapsed$")
+
+PROFILE_NOT_FOUND_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Profile not found",
+)
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str):
+    # Strip the longest sys.path entry, e.g. `.../site-packages/sqlalchemy/orm/query.py` -> `sqlalchemy/orm/query.py`
+    prefixes = [path for path in sys.path if path and filename.startswith(path.rstrip(os.sep) + os.sep)]
+    return filename[len(max(prefixes, key=len).rstrip(os.sep)) + 1:] if prefixes else filename
+
+
+def collapse_stack(frame):
+    """
+    Formats the stack of a frame as a line of the collapsed stacks format.
+
+    Args:
+        frame (FrameType): The innermost frame of the stack.
+
+    Returns:
+        str: The frames from the outermost to `frame`, separated by `;`, e.g.
+            `run (asyncio/runners.py:86);list_events (api/event.py:52)`.
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def format_collapsed(stacks: Counter):
+    """
+    Renders sampled stacks in the collapsed format read by flamegraph.pl and speedscope.
+
+    Args:
+        stacks (Counter): The number of samples of each collapsed stack.
+
+    Returns:
+        str: One `stack count` line per stack, the most sampled first.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """
+    Statistical profiler that samples the stacks of every thread of the process.
+
+    A daemon thread reads `sys._current_frames()` every `interval` seconds, so
+    the cost is bounded by the sampling rate instead of growing with the number
+    of calls like cProfile, and the threads of the pool running sync endpoints
+    are sampled as well as the event loop.
+
+    Attributes:
+        interval (float): The time between two samples, in seconds.
+        stacks (Counter): The number of samples of each collapsed stack.
+    """
+
+    def __init__(self, interval: float):
+        """
+        Initializes the sampler, stopped.
+
+        Args:
+            interval (float): The time between two samples, in seconds.
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts sampling in a daemon thread.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and waits for the sampling thread to exit.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def drain(self):
+        """
+        Returns the stacks sampled so far and starts over.
+
+        Returns:
+            Counter: The number of samples of each collapsed stack.
+        """
+        with self._lock:
+            stacks, self.stacks = self.stacks, Counter()
+        return stacks
+
+    def sample(self):
+        """
+        Takes one sample of every thread but the calling one.
+        """
+        current = threading.get_ident()
+        stacks = [collapse_stack(frame) for thread_id, frame in sys._current_frames().items() if thread_id != current]
+        with self._lock:
+            self.stacks.update(stacks)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+class ProfileStore:
+    """
+    Stores collapsed stacks profiles as files in a directory.
+
+    Attributes:
+        directory (str): The directory of the profiles.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initializes the store.
+
+        Args:
+            directory (str): The directory of the profiles, created on the first save.
+        """
+        self.directory = directory
+
+    def save(self, name: str, stacks: Counter):
+        """
+        Writes a profile.
+
+        Args:
+            name (str): The file name of the profile, ending with `.collapsed`.
+            stacks (Counter): The number of samples of each collapsed stack.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), "w") as file:
+            file.write(format_collapsed(stacks))
+
+    def list(self):
+        """
+        Lists the stored profiles.
+
+        Returns:
+            List[str]: The file names of the profiles, the most recent first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for name in filter(PROFILE_NAME_PATTERN.match, os.listdir(self.directory)):
+            # Another worker may prune the file meanwhile
+            with suppress(FileNotFoundError):
+                profiles.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+        return [name for _, name in sorted(profiles, reverse=True)]
+
+    def read(self, name: str):
+        """
+        Reads a profile.
+
+        Args:
+            name (str): The file name of the profile.
+
+        Returns:
+            str: The collapsed stacks.
+
+        Raises:
+            HTTPException: If the name is not a profile name or the profile does not exist.
+        """
+        path = os.path.join(self.directory, name)
+        if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(path):
+            raise PROFILE_NOT_FOUND_EXCEPTION
+
+        with open(path) as file:
+            return file.read()
+
+    def prune(self, prefix: str, keep: int):
+        """
+        Deletes the oldest profiles of a kind beyond the most recent `keep`.
+
+        Args:
+            prefix (str): The prefix of the file names of the kind, e.g. `sampler-`.
+            keep (int): The number of profiles to keep.
+        """
+        for name in [name for name in self.list() if name.startswith(prefix)][keep:]:
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(self.directory, name))
+
+
+class ContinuousProfiler:
+    """
+    Always-on sampler that writes a collapsed stacks file per time window.
+
+    Each window is written to `sampler-<pid>-<unix time>.collapsed`, so every
+    uvicorn worker writes its own files, and only the most recent `retained`
+    windows of all the workers are kept.
+
+    Attributes:
+        sampler (StackSampler): The sampler of the process.
+        store (ProfileStore): Where the windows are written.
+        window (float): The length of a window, in seconds.
+        retained (int): The number of windows kept on disk.
+    """
+
+    def __init__(self, store: ProfileStore, interval: float, window: float, retained: int):
+        """
+        Initializes the profiler, stopped.
+
+        Args:
+            store (ProfileStore): Where the windows are written.
+            interval (float): The time between two samples, in seconds.
+            window (float): The length of a window, in seconds.
+            retained (int): The number of windows kept on disk.
+        """
+        self.sampler = StackSampler(interval)
+        self.store = store
+        self.window = window
+        self.retained = retained
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts sampling and writing windows.
+        """
+        self._stopped.clear()
+        self.sampler.start()
+        self._thread = threading.Thread(target=self._run, name="profile-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and writes the last, partial window.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sampler.stop()
+        self.flush()
+
+    def flush(self):
+        """
+        Writes the stacks sampled since the last window, if any.
+        """
+        stacks = self.sampler.drain()
+        if stacks:
+            self.store.save(f"sampler-{os.getpid()}-{int(time.time())}.collapsed", stacks)
+            self.store.prune("sampler-", self.retained)
+
+    def _run(self):
+        while not self._stopped.wait(self.window):
+            self.flush()
+
+
+
+# Store of the profiles of this deployment, read by the admin endpoints
+profile_store = ProfileStore(PROFILE_DIR)
+
+# Always-on sampler, started with the app when PROFILER_ENABLED is set
+continuous_profiler = ContinuousProfiler(
+    profile_store, PROFILER_INTERVAL_SECONDS, PROFILER_WINDOW_SECONDS, PROFILER_RETAINED_FILES
+)
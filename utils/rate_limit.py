@@ -0,0 +1,288 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from db.redis import get_async_redis
+from utils.auths import decode_token
+from utils.constants import (
+    LOGIN_RATE_LIMIT,
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    RATE_LIMIT_ENABLED,
+    TICKET_RATE_LIMIT,
+    TICKET_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+rate_limit_logger = logging.getLogger("rate_limit")
+
+# Time Redis is left alone after a failure, so requests do not wait on it while it is down
+REDIS_RETRY_SECONDS = 5
+
+# Counts a request in a sliding window made of the current fixed window and the
+# previous one, weighted by the part of it still inside the sliding window.
+# KEYS: the counters of the current and the previous window.
+# ARGV: the limit, the window length and the time elapsed in the current window, in ms.
+# Returns {allowed, current count, previous count}; allowed is 1 when the
+# request is under the limit and counted, 0 when it is over the limit.
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local window = tonumber(ARGV[2])
+local weight = (window - tonumber(ARGV[3])) / window
+if previous * weight + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], 2 * window)
+return {1, current + 1, previous}
+"""
+
+
+def retry_after_ms(limit: int, window_ms: int, elapsed_ms: int, current: int, previous: int):
+    """
+    Computes the time until a rejected client is under the limit again.
+
+    That is the first moment at which `previous * weight + current < limit`:
+    within the current window while the weight of the previous one decays, or
+    else in the next window, where the current count becomes the previous one.
+
+    Args:
+        limit (int): The requests allowed per window.
+        window_ms (int): The length of the window, in milliseconds.
+        elapsed_ms (int): The time elapsed in the current window, in milliseconds.
+        current (int): The requests counted in the current window.
+        previous (int): The requests counted in the previous window.
+
+    Returns:
+        int: The time to wait, in milliseconds.
+    """
+    if current < limit:
+        # The weight must fall below (limit - current) / previous
+        return math.floor(window_ms - elapsed_ms - window_ms * (limit - current) / previous) + 1
+    # In the next window the weight of the current count must fall below limit / current
+    return window_ms - elapsed_ms + math.floor(window_ms * (1 - limit / current)) + 1
+
+
+def client_ip(request: Request):
+    """
+    Keys a request by the IP address of the client.
+
+    Behind a proxy, uvicorn must run with `--proxy-headers` for this to be the
+    address of the client rather than the one of the proxy.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        str: e.g. `ip:203.0.113.7`.
+    """
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def token_subject_or_ip(request: Request):
+    """
+    Keys a request by the user of its bearer token, or by IP address without a valid one.
+
+    The token is only decoded, the user is not loaded: authentication still
+    happens in the dependencies of the endpoint, after the limit is checked.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        str: e.g. `user:owner@example.com`, or `ip:203.0.113.7`.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_token(token)['sub']}"
+        except HTTPException:
+            pass
+    return client_ip(request)
+
+
+class InMemorySlidingWindow:
+    """
+    Sliding window counters kept in the memory of the worker process.
+
+    Used while Redis is unreachable, so each worker enforces the limit on its
+    own. Only the counters of the current and previous windows are kept, and
+    at most `max_keys` clients are tracked.
+
+    Attributes:
+        limit (int): The requests allowed per window.
+        window_ms (int): The length of the window, in milliseconds.
+        max_keys (int): The number of clients tracked.
+    """
+
+    def __init__(self, limit: int, window_ms: int, max_keys: int = 10000):
+        """
+        Initializes empty counters.
+
+        Args:
+            limit (int): The requests allowed per window.
+            window_ms (int): The length of the window, in milliseconds.
+            max_keys (int): The number of clients tracked.
+        """
+        self.limit = limit
+        self.window_ms = window_ms
+        self.max_keys = max_keys
+        # Client key -> (index of the current window, current count, previous count)
+        self._windows: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, index: int, elapsed_ms: int):
+        """
+        Counts a request, if it is under the limit.
+
+        Args:
+            key (str): The key of the client.
+            index (int): The index of the current fixed window.
+            elapsed_ms (int): The time elapsed in the current window, in milliseconds.
+
+        Returns:
+            Tuple[bool, int, int]: Whether the request is allowed, and the current and previous counts.
+        """
+        with self._lock:
+            stored_index, current, previous = self._windows.get(key, (index, 0, 0))
+            if stored_index == index - 1:
+                current, previous = 0, current
+            elif stored_index != index:
+                current, previous = 0, 0
+
+            weight = (self.window_ms - elapsed_ms) / self.window_ms
+            if previous * weight + current >= self.limit:
+                return False, current, previous
+
+            self._windows[key] = (index, current + 1, previous)
+            if len(self._windows) > self.max_keys:
+                self._prune(index)
+            return True, current + 1, previous
+
+    def _prune(self, index: int):
+        self._windows = {key: entry for key, entry in self._windows.items() if entry[0] >= index - 1}
+        # Still full of active clients: forget the ones seen first
+        while len(self._windows) > self.max_keys:
+            del self._windows[next(iter(self._windows))]
+
+
+class RateLimiter:
+    """
+    Route dependency that answers `429 Too Many Requests` over a sliding-window limit.
+
+    Attached with `dependencies=[Depends(limiter)]`, it runs before the
+    dependencies of the endpoint parameters, so a rejected request never opens
+    a database connection or hashes a password. Requests are counted in Redis
+    by `SLIDING_WINDOW_SCRIPT`, a single atomic round trip shared by every
+    worker; the script object is built once and run by its SHA. While Redis is unreachable, each worker counts them in an
+    `InMemorySlidingWindow`.
+
+    Attributes:
+        name (str): The name of the limit, part of the Redis keys.
+        limit (int): The requests allowed per window, 0 to disable the limit.
+        window_ms (int): The length of the window, in milliseconds.
+        key_func (Callable): Returns the key of the client of a request.
+        redis_getter (Callable): Returns the async Redis client holding the counters.
+        fallback (InMemorySlidingWindow): The counters used while Redis is unreachable.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        window: float,
+        key_func: Callable[[Request], str] = client_ip,
+        redis_getter: Callable = get_async_redis,
+    ):
+        """
+        Initializes the limiter.
+
+        Args:
+            name (str): The name of the limit, part of the Redis keys.
+            limit (int): The requests allowed per window, 0 to disable the limit.
+            window (float): The length of the window, in seconds.
+            key_func (Callable): Returns the key of the client of a request. Defaults to `client_ip`.
+            redis_getter (Callable): Returns the async Redis client holding the counters.
+        """
+        self.name = name
+        self.limit = limit
+        self.window_ms = max(int(window * 1000), 1)
+        self.key_func = key_func
+        self.redis_getter = redis_getter
+        self.fallback = InMemorySlidingWindow(limit, self.window_ms)
+        # Not bound to a client: it runs on the one `redis_getter` returns at each call
+        self._script = AsyncScript(None, SLIDING_WINDOW_SCRIPT.encode())
+        self._redis_retry_at = 0.0
+
+    async def __call__(self, request: Request):
+        """
+        Counts the request against the limit of its client.
+
+        Args:
+            request (Request): The request.
+
+        Raises:
+            HTTPException: If the client is over the limit, with a `Retry-After` header.
+        """
+        if self.limit <= 0:
+            return
+
+        key = self.key_func(request)
+        index, elapsed_ms = divmod(int(time.time() * 1000), self.window_ms)
+        result = await self._hit_redis(key, index, elapsed_ms)
+        if result is None:
+            result = self.fallback.hit(key, index, elapsed_ms)
+        allowed, current, previous = result
+        if not allowed:
+            wait_ms = retry_after_ms(self.limit, self.window_ms, elapsed_ms, current, previous)
+            retry_after = max(math.ceil(wait_ms / 1000), 1)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    async def _hit_redis(self, key: str, index: int, elapsed_ms: int):
+        """
+        Counts the request in Redis.
+
+        Args:
+            key (str): The key of the client.
+            index (int): The index of the current fixed window.
+            elapsed_ms (int): The time elapsed in the current window, in milliseconds.
+
+        Returns:
+            Tuple[bool, int, int] | None: Whether the request is allowed and the current
+                and previous counts, or None if Redis is unreachable.
+        """
+        if time.monotonic() < self._redis_retry_at:
+            return None
+
+        prefix = f"ratelimit:{self.name}:{key}"
+        try:
+            allowed, current, previous = await self._script(
+                keys=[f"{prefix}:{index}", f"{prefix}:{index - 1}"],
+                args=[self.limit, self.window_ms, elapsed_ms],
+                client=self.redis_getter(),
+            )
+        except RedisError as exc:
+            rate_limit_logger.warning(
+                "Rate limit %s counted in memory for %ss: %s", self.name, REDIS_RETRY_SECONDS, exc
+            )
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return None
+        return bool(allowed), int(current), int(previous)
+
+
+# Limits of the routes bots hammer first: bcrypt on login and the ticket queue
+login_rate_limit = RateLimiter(
+    "login", LOGIN_RATE_LIMIT if RATE_LIMIT_ENABLED else 0, LOGIN_RATE_LIMIT_WINDOW_SECONDS, client_ip
+)
+ticket_rate_limit = RateLimiter(
+    "ticket", TICKET_RATE_LIMIT if RATE_LIMIT_ENABLED else 0, TICKET_RATE_LIMIT_WINDOW_SECONDS, token_subject_or_ip
+)
@@ -0,0 +1,245 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
+
+from db.redis import get_async_redis, get_redis
+from models.user import UserModel
+from utils.constants import USER_CACHE_MAX_SIZE, USER_CACHE_REDIS_TTL_SECONDS, USER_CACHE_TTL_SECONDS
+from utils.enums import RoleEnumInDB
+
+user_cache_logger = logging.getLogger("auth.user_cache")
+
+# Columns kept for each user; the password hash is left out, so it never reaches Redis
+CACHED_COLUMNS = ("id", "fullname", "email", "active", "role")
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+
+    Attributes:
+        ttl (float): The lifetime of an entry, in seconds.
+        max_size (int): The number of entries kept, the least recently used are evicted first.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl (float): The lifetime of an entry, in seconds.
+            max_size (int): The number of entries kept.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Returns the value of a key, if it has not expired.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            The value, or None if the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        """
+        Sets the value of a key, evicting the least recently used entry when full.
+
+        Args:
+            key (str): The key.
+            value: The value.
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """
+        Removes a key, if present.
+
+        Args:
+            key (str): The key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class UserCache:
+    """
+    Caches the users resolved from the subject (email) of the access tokens.
+
+    Lookups go through an in-process `TTLCache` and then, if `redis_ttl` is set,
+    through Redis, which is shared by every worker, before loading the user from
+    the database. `invalidate` is called when a user is updated or deleted: it
+    clears Redis and the local tier of the calling worker, the local tier of the
+    other workers expires within `ttl` seconds.
+
+    Only the columns in `CACHED_COLUMNS` are kept. A cache hit returns a new
+    `UserModel`, not attached to any session, so the cached values are never
+    shared between requests.
+
+    Attributes:
+        local (TTLCache): The in-process tier.
+        redis_ttl (int): The lifetime of the Redis entries, in seconds, 0 to skip Redis.
+        redis_getter (Callable): Returns the Redis client of the sync lookups.
+        async_redis_getter (Callable): Returns the Redis client of the async lookups.
+    """
+
+    KEY_PREFIX = "user:principal:"
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        redis_ttl: int = 0,
+        redis_getter: Callable = get_redis,
+        async_redis_getter: Callable = get_async_redis,
+    ):
+        """
+        Initializes the cache.
+
+        Args:
+            ttl (float): The lifetime of the in-process entries, in seconds, 0 to disable them.
+            max_size (int): The number of users kept in each process.
+            redis_ttl (int): The lifetime of the Redis entries, in seconds, 0 to skip Redis.
+            redis_getter (Callable): Returns the Redis client of the sync lookups.
+            async_redis_getter (Callable): Returns the Redis client of the async lookups.
+        """
+        self.local = TTLCache(ttl, max_size)
+        self.redis_ttl = redis_ttl
+        self.redis_getter = redis_getter
+        self.async_redis_getter = async_redis_getter
+
+    def get_user(self, email: str, load: Callable[[str], Optional[UserModel]]):
+        """
+        Returns the user with an email, from the cache or from `load`.
+
+        Args:
+            email (str): The subject of the token.
+            load (Callable): Loads the user from the database, returning None if there is none.
+
+        Returns:
+            UserModel | None: The user, or None if there is none.
+        """
+        values = self.local.get(email)
+        if values is None and self.redis_ttl:
+            try:
+                values = self._decode(self.redis_getter().get(self._key(email)))
+            except RedisError as exc:
+                user_cache_logger.warning("Could not read the user cache: %s", exc)
+            if values is not None:
+                self.local.set(email, values)
+        if values is not None:
+            return self._to_user(values)
+
+        user = load(email)
+        if user is not None:
+            values = self._values(user)
+            self.local.set(email, values)
+            if self.redis_ttl:
+                try:
+                    self.redis_getter().set(self._key(email), json.dumps(values), ex=self.redis_ttl)
+                except RedisError as exc:
+                    user_cache_logger.warning("Could not write the user cache: %s", exc)
+        return user
+
+    async def get_user_async(self, email: str, load: Callable[[str], Awaitable[Optional[UserModel]]]):
+        """
+        Async counterpart of `get_user`, for the dependencies on async sessions.
+
+        Args:
+            email (str): The subject of the token.
+            load (Callable): Coroutine function loading the user from the database.
+
+        Returns:
+            UserModel | None: The user, or None if there is none.
+        """
+        values = self.local.get(email)
+        if values is None and self.redis_ttl:
+            try:
+                values = self._decode(await self.async_redis_getter().get(self._key(email)))
+            except RedisError as exc:
+                user_cache_logger.warning("Could not read the user cache: %s", exc)
+            if values is not None:
+                self.local.set(email, values)
+        if values is not None:
+            return self._to_user(values)
+
+        user = await load(email)
+        if user is not None:
+            values = self._values(user)
+            self.local.set(email, values)
+            if self.redis_ttl:
+                try:
+                    await self.async_redis_getter().set(self._key(email), json.dumps(values), ex=self.redis_ttl)
+                except RedisError as exc:
+                    user_cache_logger.warning("Could not write the user cache: %s", exc)
+        return user
+
+    def invalidate(self, *emails: str):
+        """
+        Drops users from the cache, after they were updated or deleted.
+
+        Args:
+            *emails (str): The emails the users had and have, as tokens are issued to either.
+        """
+        for email in emails:
+            self.local.delete(email)
+        if self.redis_ttl:
+            try:
+                self.redis_getter().delete(*[self._key(email) for email in emails])
+            except RedisError as exc:
+                # The entries expire after `redis_ttl` seconds anyway
+                user_cache_logger.warning("Could not invalidate the user cache: %s", exc)
+
+    def _key(self, email: str):
+        return f"{self.KEY_PREFIX}{email}"
+
+    @staticmethod
+    def _decode(raw: Optional[str]):
+        return json.loads(raw) if raw is not None else None
+
+    @staticmethod
+    def _values(user: UserModel):
+        values = {column: getattr(user, column) for column in CACHED_COLUMNS}
+        values["role"] = RoleEnumInDB(values["role"]).value
+        return values
+
+    @staticmethod
+    def _to_user(values: dict):
+        return UserModel(**{**values, "role": RoleEnumInDB(values["role"])})
+
+
+# Users of the access tokens, read by the `get_current_user*` dependencies
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE, USER_CACHE_REDIS_TTL_SECONDS)